@@ -0,0 +1,137 @@
+"""Hot/cold archival of finished bookings and classes.
+
+Completed and cancelled rows that ended more than `archive_after_days` ago
+are moved from bookings/classes to bookings_archive/classes_archive, in
+batches of `archive_batch_size` rows, each batch in its own short
+transaction. The hot tables then only hold what conflict checks and
+availability look at, plus recent history.
+
+Reporting reads through `booking_history()` / `class_history()`, the same
+UNION ALL as the bookings_all / classes_all database views, so archived
+rows keep counting.
+
+Run it with `python -m app.archive`, or periodically from the app by
+setting ARCHIVE_INTERVAL_MINUTES.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, cast, delete, insert, literal, null, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .database import SessionLocal
+from .scheduler import PeriodicJob
+
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+
+def _history(model, archive_model, name: str):
+    table, archive = model.__table__, archive_model.__table__
+    columns = [column.name for column in table.columns]
+    return union_all(
+        select(*[table.c[column] for column in columns], cast(null(), DateTime).label("archived_at")),
+        select(*[archive.c[column] for column in columns], archive.c.archived_at),
+    ).subquery(name)
+
+
+def booking_history():
+    """bookings plus bookings_archive, with the columns of bookings and
+    archived_at (NULL for hot rows)"""
+    return _history(models.Booking, models.BookingArchive, "bookings_all")
+
+
+def class_history():
+    """classes plus classes_archive, with the columns of classes and
+    archived_at (NULL for hot rows)"""
+    return _history(models.Class, models.ClassArchive, "classes_all")
+
+
+def archive_rows(db: Session, model, archive_model, cutoff: datetime, batch_size: int,
+                 max_batches: Optional[int] = None) -> int:
+    """Move finished rows of `model` that ended before `cutoff`, one batch
+    per transaction. Returns the number of rows moved."""
+    table, archive = model.__table__, archive_model.__table__
+    columns = [column.name for column in table.columns]
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.execute(
+            select(table.c.id).where(
+                table.c.status.in_(ARCHIVED_STATUSES),
+                table.c.end_time < cutoff,
+                # Ids reused before the hot tables got AUTOINCREMENT stay put
+                # instead of blocking every later batch
+                ~select(archive.c.id).where(archive.c.id == table.c.id).exists()
+            ).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        try:
+            db.execute(insert(archive).from_select(
+                columns + ["archived_at"],
+                select(*[table.c[column] for column in columns], literal(datetime.now()))
+                .where(table.c.id.in_(ids))
+            ))
+            db.execute(delete(table).where(table.c.id.in_(ids)))
+            db.commit()
+        except IntegrityError:
+            # Another process archived the same batch first
+            db.rollback()
+            break
+        moved += len(ids)
+        batches += 1
+    return moved
+
+
+def run_archive(db: Session, older_than_days: Optional[int] = None,
+                batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> dict:
+    """Archive bookings and classes, returning what was moved and how long
+    it took"""
+    older_than_days = settings.archive_after_days if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    started = time.perf_counter()
+    bookings = archive_rows(db, models.Booking, models.BookingArchive, cutoff, batch_size, max_batches)
+    classes = archive_rows(db, models.Class, models.ClassArchive, cutoff, batch_size, max_batches)
+    return {
+        "cutoff": cutoff.isoformat(),
+        "bookings": bookings,
+        "classes": classes,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def scheduled_job() -> Optional[PeriodicJob]:
+    """The periodic archive run, or None when it is not enabled"""
+    if settings.archive_interval_minutes <= 0:
+        return None
+
+    def run():
+        with SessionLocal() as db:
+            return run_archive(db)
+
+    return PeriodicJob("archive", settings.archive_interval_minutes * 60, run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move old completed/cancelled bookings and classes to the archive tables"
+    )
+    parser.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop after this many batches per table")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        report = run_archive(db, args.older_than_days, args.batch_size, args.max_batches)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Read-heavy crud functions for an AsyncSession.
+
+Plain lookups are written as select() statements. Availability and the
+class listing reuse the sync implementations (occupancy bitmaps, caches,
+recurrence expansion) in two halves: the database half goes through
+AsyncSession.run_sync, over the same async connection, and the CPU half
+(building slots, expanding series) runs in the threadpool, so a large
+request never stalls the event loop.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from . import crud, models
+from .pagination import Page, after, page
+
+
+async def get_room(db: AsyncSession, room_id: int):
+    return await db.get(models.Room, room_id)
+
+async def get_rooms(db: AsyncSession, skip: int = 0, limit: int = 100, active_only: bool = True):
+    query = select(models.Room)
+    if active_only:
+        query = query.where(models.Room.is_active == True)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_user_bookings(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100,
+                            cursor: Optional[str] = None) -> Page:
+    """The user's bookings with their room loaded, since lazy loading is not
+    available on an AsyncSession"""
+    query = (
+        select(models.Booking)
+        .where(models.Booking.user_id == user_id)
+        .options(joinedload(models.Booking.room))
+        .order_by(*crud.BOOKING_ORDER)
+    )
+    if cursor:
+        query = query.where(after(crud.BOOKING_ORDER, cursor))
+    elif skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
+    return page(result.scalars().all(), crud.BOOKING_ORDER, limit)
+
+async def get_classes_by_room(db: AsyncSession, room_id: int, start_date: datetime = None,
+                              end_date: datetime = None):
+    rows = await db.run_sync(
+        lambda session: crud.load_classes_by_room(session, room_id, start_date, end_date)
+    )
+    return await run_in_threadpool(crud.expand_classes, rows, start_date, end_date)
+
+async def get_available_slots_with_classes(db: AsyncSession, room_id: int, date: datetime,
+                                           duration_minutes: int = 60,
+                                           step_minutes: Optional[int] = None):
+    rooms = await get_availability_for_rooms(
+        db, [room_id], date, date, duration_minutes, step_minutes
+    )
+    return rooms[0].slots if rooms else None
+
+async def get_availability_for_rooms(db: AsyncSession, room_ids: List[int], start_date: datetime,
+                                     end_date: datetime, duration_minutes: int = 60,
+                                     step_minutes: Optional[int] = None):
+    plan = await db.run_sync(
+        lambda session: crud.plan_availability(
+            session, room_ids, start_date, end_date, duration_minutes, step_minutes
+        )
+    )
+    return await run_in_threadpool(crud.build_availability, plan)
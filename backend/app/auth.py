@@ -1,12 +1,17 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from .database import get_db
+from .database import get_async_read_db, get_db
 from .models import User
 from .config import settings
 
@@ -62,24 +67,134 @@ def authenticate_user(
     return user
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+class UserCache:
+    """TTL cache of the users behind access tokens, keyed by the token's
+    subject (the email).
+
+    Entries hold column values, not ORM objects: every hit builds a fresh
+    transient User, never shared between requests or bound to a session.
+    The password hash is left out. crud.update_user invalidates the user's
+    entry; the TTL bounds how long another worker process can keep
+    authenticating a user deactivated elsewhere.
+    """
+
+    COLUMNS = [column.key for column in User.__table__.columns if column.key != "hashed_password"]
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._invalidated_at: Dict[str, float] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        """Captured before querying the user and handed back to `put`, so a
+        row read before a concurrent update is discarded"""
+        with self._lock:
+            return self._generation
+
+    def get(self, email: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+        return User(**entry[1])
+
+    def put(self, user: User, generation: int):
+        if self.max_entries <= 0:
+            return
+        values = {key: getattr(user, key) for key in self.COLUMNS}
+        with self._lock:
+            if self._generation != generation:
+                return
+            self._entries[user.email] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidated_within(self, email: str, seconds: float) -> bool:
+        """Whether the user was invalidated in the last `seconds`"""
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(email)
+        return invalidated_at is not None and time.monotonic() - invalidated_at < seconds
+
+    def invalidate(self, email: str):
+        now = time.monotonic()
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.pop(email, None)
+            self._invalidated_at[email] = now
+            if len(self._invalidated_at) > 1024:
+                # Only recent invalidations matter to replica reads
+                self._invalidated_at = {
+                    key: at for key, at in self._invalidated_at.items()
+                    if now - at < settings.read_replica_max_lag_seconds
+                }
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._invalidated_at.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(
+    max_entries=settings.user_cache_size, ttl_seconds=settings.user_cache_ttl_seconds
+)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    credentials_exception = _credentials_exception()
+
     token = credentials.credentials
     username = verify_token(token)
     if username is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == username).first()
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        generation = user_cache.generation()
+        user = db.query(User).filter(User.email == username).first()
+        if user is None:
+            raise credentials_exception
+        user_cache.put(user, generation)
 
     return user
 
@@ -92,6 +207,41 @@ def get_current_active_user(
     return current_user
 
 
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> User:
+    """get_current_user for async endpoints, looked up on an AsyncSession"""
+    credentials_exception = _credentials_exception()
+
+    username = verify_token(credentials.credentials)
+    if username is None:
+        raise credentials_exception
+
+    user = user_cache.get(username)
+    if user is None:
+        generation = user_cache.generation()
+        result = await db.execute(select(User).where(User.email == username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        # A lagging replica may still return the row from before an update
+        if not (db.info.get("replica") and user_cache.invalidated_within(
+            username, settings.read_replica_max_lag_seconds
+        )):
+            user_cache.put(user, generation)
+
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
 def get_admin_user(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
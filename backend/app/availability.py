@@ -0,0 +1,140 @@
+"""Availability engine.
+
+Occupied periods (bookings, classes, student schedules) are either merged
+into a sorted list of disjoint intervals and walked in a single linear pass,
+or looked up in a room's materialized occupancy bitmap (see occupancy.py),
+instead of re-checking every occupant for every slot.
+"""
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from . import schemas
+
+Interval = Tuple[datetime, datetime]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge the overlapping/touching ones"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        # Empty or inverted intervals never block anything
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_slots(
+    room_id: int,
+    start_of_day: datetime,
+    end_of_day: datetime,
+    duration_minutes: int,
+    occupied: Iterable[Interval],
+) -> List[schemas.TimeSlot]:
+    """Generate back-to-back slots between the business hours, flagging the
+    ones that overlap any occupied interval"""
+    merged = merge_intervals(occupied)
+    slot_duration = timedelta(minutes=duration_minutes)
+
+    slots = []
+    index = 0
+    current_time = start_of_day
+    while current_time + slot_duration <= end_of_day:
+        slot_end = current_time + slot_duration
+
+        # Skip intervals that end before this slot starts; since slots only
+        # move forward they can never block a later slot either
+        while index < len(merged) and merged[index][1] <= current_time:
+            index += 1
+        is_available = index == len(merged) or merged[index][0] >= slot_end
+
+        slots.append(schemas.TimeSlot(
+            start_time=current_time,
+            end_time=slot_end,
+            is_available=is_available,
+            room_id=room_id
+        ))
+        current_time = slot_end
+
+    return slots
+
+
+def build_slots_from_mask(
+    room_id: int,
+    start_of_day: datetime,
+    end_of_day: datetime,
+    duration_minutes: int,
+    mask: int,
+    step_minutes: Optional[int] = None,
+) -> List[schemas.TimeSlot]:
+    """Generate slots starting every `step_minutes` (defaults to back-to-back)
+    and check them against a minute-resolution occupancy bitmap (bit n =
+    minute n after midnight).
+
+    A prefix sum of occupied minutes over the opening window makes every
+    candidate an O(1) check, however much the candidates overlap.
+    """
+    step_minutes = step_minutes or duration_minutes
+    if duration_minutes <= 0 or step_minutes <= 0:
+        raise ValueError("Slot duration and step must be positive")
+    midnight = start_of_day.replace(hour=0, minute=0, second=0, microsecond=0)
+    first = int((start_of_day - midnight).total_seconds()) // 60
+    last = int((end_of_day - midnight).total_seconds()) // 60
+
+    # busy[i] = occupied minutes in [first, first + i)
+    busy = [0]
+    busy.extend(accumulate((mask >> minute) & 1 for minute in range(first, last)))
+
+    slots = []
+    offset = 0
+    while first + offset + duration_minutes <= last:
+        slot_start = start_of_day + timedelta(minutes=offset)
+        slots.append(schemas.TimeSlot(
+            start_time=slot_start,
+            end_time=slot_start + timedelta(minutes=duration_minutes),
+            is_available=busy[offset + duration_minutes] == busy[offset],
+            room_id=room_id
+        ))
+        offset += step_minutes
+
+    return slots
+
+
+def free_slots(
+    windows: Iterable[Interval],
+    occupied: List[Interval],
+    duration_minutes: int,
+    limit: int,
+) -> List[Interval]:
+    """Find up to `limit` free slots of `duration_minutes` inside the sorted
+    opening `windows`, walking the gaps between the merged, sorted `occupied`
+    intervals. Slots start at the beginning of each gap and follow each other
+    back-to-back while the gap lasts."""
+    slot_duration = timedelta(minutes=duration_minutes)
+    found: List[Interval] = []
+    index = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        while cursor + slot_duration <= window_end:
+            # Skip intervals that are over before the cursor
+            while index < len(occupied) and occupied[index][1] <= cursor:
+                index += 1
+            if index < len(occupied) and occupied[index][0] <= cursor:
+                # Inside an occupied interval: jump to its end
+                cursor = occupied[index][1]
+                continue
+            gap_end = window_end
+            if index < len(occupied):
+                gap_end = min(gap_end, occupied[index][0])
+            while cursor + slot_duration <= gap_end:
+                found.append((cursor, cursor + slot_duration))
+                if len(found) >= limit:
+                    return found
+                cursor += slot_duration
+            cursor = gap_end
+    return found
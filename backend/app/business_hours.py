@@ -0,0 +1,95 @@
+"""In-memory business-hours calendar.
+
+The weekly opening hours (`business_hours` table) and closed dates
+(`calendar_blackouts` table) are loaded once into dictionaries, so "when is
+the school open on date D" is a couple of dict lookups instead of a query.
+Admin edits reload it right away; other worker processes pick the change
+up after `business_calendar_ttl_seconds`.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+# Used while no opening hours have been configured:
+# Monday to Thursday 09:00-21:00, Saturday 09:00-13:00, closed Friday and Sunday
+DEFAULT_WEEKLY_HOURS: Dict[int, Tuple[Tuple[int, int], ...]] = {
+    0: ((9 * 60, 21 * 60),),
+    1: ((9 * 60, 21 * 60),),
+    2: ((9 * 60, 21 * 60),),
+    3: ((9 * 60, 21 * 60),),
+    4: (),
+    5: ((9 * 60, 13 * 60),),
+    6: (),
+}
+
+Window = Tuple[datetime, datetime]
+
+
+class BusinessCalendar:
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._weekly: Dict[int, Tuple[Tuple[int, int], ...]] = dict(DEFAULT_WEEKLY_HOURS)
+        self._blackouts: FrozenSet[date] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        """(Re)load opening hours and blackout dates from the database"""
+        rows = db.query(
+            models.BusinessHours.weekday,
+            models.BusinessHours.open_min,
+            models.BusinessHours.close_min
+        ).order_by(models.BusinessHours.weekday, models.BusinessHours.open_min).all()
+        blackouts = db.query(models.CalendarBlackout.date).all()
+
+        if rows:
+            weekly = {weekday: [] for weekday in range(7)}
+            for row in rows:
+                weekly[row.weekday].append((row.open_min, row.close_min))
+            weekly = {weekday: tuple(windows) for weekday, windows in weekly.items()}
+        else:
+            weekly = dict(DEFAULT_WEEKLY_HOURS)
+
+        with self._lock:
+            self._weekly = weekly
+            self._blackouts = frozenset(row.date for row in blackouts)
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        """Load on first use, and again once the TTL has passed"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds:
+            self.load(db)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def weekly_hours(self) -> Dict[int, Tuple[Tuple[int, int], ...]]:
+        return dict(self._weekly)
+
+    def open_windows(self, day: datetime) -> List[Window]:
+        """Opening windows of the date of `day`, as datetimes"""
+        if day.date() in self._blackouts:
+            return []
+        midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return [
+            (midnight + timedelta(minutes=open_min), midnight + timedelta(minutes=close_min))
+            for open_min, close_min in self._weekly[day.weekday()]
+        ]
+
+    def is_open(self, start_time: datetime, end_time: datetime) -> bool:
+        """Whether [start_time, end_time) fits inside a single opening window"""
+        return any(
+            window_start <= start_time and end_time <= window_end
+            for window_start, window_end in self.open_windows(start_time)
+        )
+
+
+business_calendar = BusinessCalendar(ttl_seconds=settings.business_calendar_ttl_seconds)
@@ -0,0 +1,145 @@
+"""In-process LRU cache for computed availability.
+
+Entries are keyed by (room_id, date, duration, step) and hold the list of
+TimeSlot objects computed for that day. Write paths in crud invalidate the
+affected room/dates after committing; a TTL bounds how long a worker can
+serve data changed by another worker process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import settings
+
+CacheKey = Tuple[int, date, int, int]
+
+
+class AvailabilityCache:
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, list]]" = OrderedDict()
+        self._by_day: Dict[Tuple[int, date], Set[CacheKey]] = {}
+        self._generations: Dict[int, int] = {}
+        self._written_at: Dict[int, float] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, room_id: int) -> Tuple[int, int]:
+        """Current write generation of a room.
+
+        Readers capture it before querying the database and hand it back to
+        `put`, so a result computed before a concurrent write is discarded.
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(room_id, 0)
+
+    def written_within(self, room_id: int, seconds: float) -> bool:
+        """Whether the room was invalidated by a write in the last `seconds`"""
+        with self._lock:
+            written_at = self._written_at.get(room_id)
+        return written_at is not None and time.monotonic() - written_at < seconds
+
+    def get(self, room_id: int, day: date, duration: int, step: int) -> Optional[list]:
+        key = (room_id, day, duration, step)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, room_id: int, day: date, duration: int, step: int, slots: List,
+            generation: Tuple[int, int]):
+        if self.max_entries <= 0:
+            return
+        key = (room_id, day, duration, step)
+        with self._lock:
+            if (self._epoch, self._generations.get(room_id, 0)) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, list(slots))
+            self._by_day.setdefault((room_id, day), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, room_id: int, days: Iterable[date]):
+        """Drop the entries of a room for the given dates"""
+        with self._lock:
+            self._bump(room_id)
+            for day in days:
+                for key in list(self._by_day.get((room_id, day), ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def invalidate_weekday(self, room_id: int, weekday: int):
+        """Drop every entry of a room falling on a weekday (0=Mon)"""
+        with self._lock:
+            self._bump(room_id)
+            for room, day in list(self._by_day):
+                if room == room_id and day.weekday() == weekday:
+                    for key in list(self._by_day.get((room, day), ())):
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def invalidate_room(self, room_id: int):
+        """Drop every entry of a room"""
+        with self._lock:
+            self._bump(room_id)
+            for room, day in list(self._by_day):
+                if room == room_id:
+                    for key in list(self._by_day.get((room, day), ())):
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_day.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _bump(self, room_id: int):
+        self._generations[room_id] = self._generations.get(room_id, 0) + 1
+        self._written_at[room_id] = time.monotonic()
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        day_key = key[:2]
+        keys = self._by_day.get(day_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_day[day_key]
+
+
+availability_cache = AvailabilityCache(
+    max_entries=settings.availability_cache_size,
+    ttl_seconds=settings.availability_cache_ttl_seconds,
+)
@@ -1,12 +1,48 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./drumschool.db"
+    async_database_url: Optional[str] = None  # Defaults to database_url with an async driver
+    schema_check: bool = True  # Refuse to start unless the database is at the latest migration
+    # Read replica for GET traffic (for SQLite, the same file works as a WAL
+    # reader); unset = everything on the primary
+    read_replica_url: Optional[str] = None
+    read_routing_enabled: bool = True
+    read_replica_max_lag_seconds: float = 5  # A client's reads stay on the primary this long after it writes
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1  # Seconds before a connection is replaced, -1 = never
+    db_pool_pre_ping: bool = False
+    # SQLite tuning profile, applied to every connection when enabled
+    sqlite_tuning: bool = False
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000  # Negative = KiB, i.e. ~64 MB
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_temp_store: str = "MEMORY"
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     admin_email: str = "admin@drumschool.com"
     admin_password: str = "admin123"
+    availability_cache_size: int = 2048
+    availability_cache_ttl_seconds: int = 300
+    business_calendar_ttl_seconds: int = 300
+    recurrence_cache_size: int = 4096
+    write_batch_size: int = 32
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+    # Archival of finished bookings/classes (python -m app.archive)
+    archive_after_days: int = 365
+    archive_batch_size: int = 500
+    archive_interval_minutes: int = 0  # 0 = only when run from the CLI
+    # Marking ended bookings/classes completed (python -m app.sweeper)
+    status_sweep_batch_size: int = 500
+    status_sweep_interval_minutes: int = 15  # 0 = only when run from the CLI
     
     class Config:
         env_file = ".env"
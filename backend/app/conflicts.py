@@ -0,0 +1,207 @@
+"""Conflict checks for room writes.
+
+`find_conflicts` answers "what blocks [start_time, end_time) in this room"
+with a single UNION ALL query over confirmed bookings, scheduled classes and
+the weekly slots of active students, the same occupants the availability
+views consider. Recurring classes are expanded for the checked interval.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import (
+    DateTime, Integer, String, and_, case, cast, func, literal, null, or_, select, union_all
+)
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .occupancy import MINUTES_PER_DAY, days_of
+from .recurrence import expansion_cache
+
+
+def overlaps(model, start_time: datetime, end_time: datetime):
+    """Rows of `model` (Booking or Class) overlapping [start_time, end_time).
+
+    Kept as two plain range comparisons so the (room_id, status, start_time,
+    end_time) indexes can serve it.
+    """
+    return and_(model.start_time < end_time, model.end_time > start_time)
+
+
+def _day_ranges(start_time: datetime, end_time: datetime) -> List[Tuple[datetime, int, int]]:
+    """(midnight, start_min, end_min) of each day touched by the interval,
+    rounded outwards to whole minutes"""
+    ranges = []
+    for day in days_of(start_time, end_time):
+        midnight = datetime.combine(day, datetime.min.time())
+        start = max((start_time - midnight).total_seconds(), 0)
+        end = min((end_time - midnight).total_seconds(), MINUTES_PER_DAY * 60)
+        if end > start:
+            ranges.append((midnight, int(start // 60), math.ceil(end / 60)))
+    return ranges
+
+
+def _blocking_rows(
+    db: Session,
+    room_id: int,
+    range_start: datetime,
+    range_end: datetime,
+    day_ranges: List[Tuple[datetime, int, int]],
+    exclude_booking_id: Optional[int] = None,
+    exclude_class_id: Optional[int] = None,
+):
+    """Run the UNION ALL over bookings and classes overlapping
+    [range_start, range_end), recurring classes started before it ends and
+    student slots overlapping any day range"""
+    no_time = cast(null(), DateTime)
+    no_minute = cast(null(), Integer)
+    no_rule = cast(null(), String)
+
+    bookings = select(
+        literal("booking").label("kind"),
+        models.Booking.id.label("id"),
+        models.Booking.start_time.label("start_time"),
+        models.Booking.end_time.label("end_time"),
+        no_minute.label("weekday"),
+        no_minute.label("start_min"),
+        no_minute.label("end_min"),
+        no_rule.label("recurrence"),
+    ).where(
+        models.Booking.room_id == room_id,
+        models.Booking.status == "confirmed",
+        overlaps(models.Booking, range_start, range_end),
+    )
+    if exclude_booking_id is not None:
+        bookings = bookings.where(models.Booking.id != exclude_booking_id)
+
+    classes = select(
+        literal("class"),
+        models.Class.id,
+        models.Class.start_time,
+        models.Class.end_time,
+        no_minute,
+        no_minute,
+        no_minute,
+        case(
+            (models.Class.is_recurring.is_(True), func.coalesce(models.Class.recurrence_pattern, "")),
+            else_=no_rule
+        ),
+    ).where(
+        models.Class.room_id == room_id,
+        models.Class.status == "scheduled",
+        models.Class.start_time < range_end,
+        or_(models.Class.end_time > range_start, models.Class.is_recurring.is_(True)),
+    )
+    if exclude_class_id is not None:
+        classes = classes.where(models.Class.id != exclude_class_id)
+
+    # One term per distinct (weekday, minutes) pair
+    terms = {
+        (midnight.weekday(), start_min, end_min)
+        for midnight, start_min, end_min in day_ranges
+    }
+    students = select(
+        literal("student"),
+        models.Student.id,
+        no_time,
+        no_time,
+        models.Student.weekday,
+        models.Student.start_min,
+        models.Student.end_min,
+        no_rule,
+    ).where(
+        models.Student.room_id == room_id,
+        models.Student.is_active.is_(True),
+        or_(*[
+            and_(
+                models.Student.weekday == weekday,
+                models.Student.start_min < end_min,
+                models.Student.end_min > start_min
+            )
+            for weekday, start_min, end_min in sorted(terms)
+        ]),
+    )
+
+    return db.execute(union_all(bookings, classes, students)).all()
+
+
+def _matching(rows, start_time: datetime, end_time: datetime) -> List[schemas.Conflict]:
+    """The rows blocking [start_time, end_time), sorted by start.
+
+    Student slots and recurring classes are reported as their first
+    occurrence inside the interval.
+    """
+    day_ranges = _day_ranges(start_time, end_time)
+    found = []
+    for row in rows:
+        if row.kind == "student":
+            # First day of the interval where the weekly slot overlaps it
+            midnight = next((
+                midnight for midnight, start_min, end_min in day_ranges
+                if midnight.weekday() == row.weekday
+                and row.start_min < end_min and row.end_min > start_min
+            ), None)
+            if midnight is None:
+                continue
+            row_start = midnight + timedelta(minutes=row.start_min)
+            row_end = midnight + timedelta(minutes=row.end_min)
+        elif row.recurrence is not None:
+            expanded = expansion_cache.expand(
+                row.id, row.start_time, row.end_time, row.recurrence or None,
+                start_time, end_time
+            )
+            if not expanded:
+                continue
+            row_start, row_end = expanded[0]
+        else:
+            if not (row.start_time < end_time and row.end_time > start_time):
+                continue
+            row_start, row_end = row.start_time, row.end_time
+        found.append(schemas.Conflict(
+            kind=row.kind, id=row.id, start_time=row_start, end_time=row_end
+        ))
+    found.sort(key=lambda conflict: (conflict.start_time, conflict.kind, conflict.id))
+    return found
+
+
+def find_conflicts(
+    db: Session,
+    room_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_booking_id: Optional[int] = None,
+    exclude_class_id: Optional[int] = None,
+) -> List[schemas.Conflict]:
+    """Everything blocking [start_time, end_time) in a room, sorted by start"""
+    day_ranges = _day_ranges(start_time, end_time)
+    if not day_ranges:
+        return []
+    rows = _blocking_rows(
+        db, room_id, start_time, end_time, day_ranges,
+        exclude_booking_id=exclude_booking_id, exclude_class_id=exclude_class_id
+    )
+    return _matching(rows, start_time, end_time)
+
+
+def find_series_conflicts(
+    db: Session,
+    room_id: int,
+    intervals: List[Tuple[datetime, datetime]],
+    exclude_class_id: Optional[int] = None,
+) -> List[List[schemas.Conflict]]:
+    """What blocks each of `intervals` in a room, fetched with a single
+    query spanning all of them"""
+    day_ranges = [
+        day_range for start_time, end_time in intervals
+        for day_range in _day_ranges(start_time, end_time)
+    ]
+    if not day_ranges:
+        return [[] for _ in intervals]
+    rows = _blocking_rows(
+        db, room_id,
+        min(start_time for start_time, _ in intervals),
+        max(end_time for _, end_time in intervals),
+        day_ranges,
+        exclude_class_id=exclude_class_id
+    )
+    return [_matching(rows, start_time, end_time) for start_time, end_time in intervals]
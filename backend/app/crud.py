@@ -1,10 +1,16 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, insert, or_
+import math
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, NamedTuple, Optional
 
-from . import models, schemas
-from .auth import get_password_hash
+from . import models, schemas, availability, conflicts, occupancy, recurrence, utilization
+from .pagination import Page, paginate
+from .business_hours import business_calendar
+from .cache import availability_cache
+from .config import settings
+from .write_queue import lock_room, room_writes
+from .auth import get_password_hash, user_cache
 
 # User CRUD operations
 
@@ -17,8 +23,14 @@ def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+# Sort keys of the paginated lists
+USER_ORDER = (models.User.id,)
+BOOKING_ORDER = (models.Booking.start_time, models.Booking.id)
+CLASS_ORDER = (models.Class.start_time, models.Class.id)
+STUDENT_ORDER = (models.Student.id,)
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    return paginate(db.query(models.User), USER_ORDER, cursor, skip, limit)
 
 
 def create_user(db: Session, user: schemas.UserCreate):
@@ -41,6 +53,7 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
         for field, value in update_data.items():
             setattr(db_user, field, value)
         db.commit()
+        user_cache.invalidate(db_user.email)
         db.refresh(db_user)
     return db_user
 
@@ -80,336 +93,623 @@ def delete_room(db: Session, room_id: int):
         return True
     return False
 
+# Availability bookkeeping
+def _refresh_occupancy(db: Session, room_id: int, start_time: datetime, end_time: datetime):
+    """Rebuild the occupancy bitmaps touched by a write, before committing"""
+    db.flush()
+    occupancy.refresh(db, room_id, start_time, end_time)
+
+def _invalidate_availability(room_id: int, start_time: datetime, end_time: datetime):
+    """Drop cached availability touched by a write, after committing"""
+    availability_cache.invalidate(room_id, occupancy.days_of(start_time, end_time))
+
 # Booking CRUD operations
 def get_booking(db: Session, booking_id: int):
     return db.query(models.Booking).filter(models.Booking.id == booking_id).first()
 
-def get_user_bookings(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Booking).filter(
+def get_user_bookings(db: Session, user_id: int, skip: int = 0, limit: int = 100,
+                      cursor: Optional[str] = None) -> Page:
+    query = db.query(models.Booking).filter(
         models.Booking.user_id == user_id
-    ).offset(skip).limit(limit).all()
-
-def get_bookings(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Booking).offset(skip).limit(limit).all()
+    ).options(joinedload(models.Booking.room))
+    return paginate(query, BOOKING_ORDER, cursor, skip, limit)
+
+def get_bookings(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    """Bookings with the room and user the admin listing shows, joined in the
+    same query"""
+    query = db.query(models.Booking).options(
+        joinedload(models.Booking.room), joinedload(models.Booking.user)
+    )
+    return paginate(query, BOOKING_ORDER, cursor, skip, limit)
 
 def create_booking(db: Session, booking: schemas.BookingCreate, user_id: int):
-    # Check for conflicts
-    conflicts = db.query(models.Booking).filter(
-        and_(
-            models.Booking.room_id == booking.room_id,
-            models.Booking.status == "confirmed",
-            or_(
-                and_(
-                    models.Booking.start_time <= booking.start_time,
-                    models.Booking.end_time > booking.start_time
-                ),
-                and_(
-                    models.Booking.start_time < booking.end_time,
-                    models.Booking.end_time >= booking.end_time
-                ),
-                and_(
-                    models.Booking.start_time >= booking.start_time,
-                    models.Booking.end_time <= booking.end_time
-                )
-            )
-        )
-    ).first()
-    
-    if conflicts:
-        return None  # Conflict found
+    """Book a room, or return None when the interval is taken.
+
+    Goes through the room's write queue, so concurrent bookings of one room
+    are checked one after the other and committed in batches.
+    """
+    return room_writes.submit(
+        db, booking.room_id,
+        lambda session: _stage_booking(session, booking, user_id),
+        _booking_committed
+    )
+
+def _stage_booking(db: Session, booking: schemas.BookingCreate, user_id: int):
+    # The occupancy bitmap answers most checks without touching bookings;
+    # only fall back to the conflict query when it is busy or not materialized
+    if not occupancy.is_free(db, booking.room_id, booking.start_time, booking.end_time):
+        if conflicts.find_conflicts(db, booking.room_id, booking.start_time, booking.end_time):
+            return None  # Conflict found
     
     db_booking = models.Booking(
         **booking.dict(),
         user_id=user_id
     )
     db.add(db_booking)
-    db.commit()
-    db.refresh(db_booking)
+    _refresh_occupancy(db, db_booking.room_id, db_booking.start_time, db_booking.end_time)
     return db_booking
 
+def _booking_committed(db: Session, db_booking: models.Booking):
+    _invalidate_availability(db_booking.room_id, db_booking.start_time, db_booking.end_time)
+
+def create_booking_series(db: Session, series: schemas.BookingSeriesCreate, user_id: int,
+                          skipped: Optional[dict] = None):
+    """Book every occurrence of a weekly series that is free, in one transaction.
+
+    All occurrences are checked with a single conflict query and the free
+    ones are inserted together. `skipped` maps occurrence start times the
+    caller already rejected to a reason; they are reported, not booked.
+    Returns the created bookings and the collisions.
+    """
+    skipped = skipped or {}
+    duration = series.end_time - series.start_time
+    step = timedelta(weeks=series.interval_weeks)
+    occurrences = [
+        (series.start_time + n * step, series.start_time + n * step + duration)
+        for n in range(series.occurrences)
+    ]
+    candidates = [interval for interval in occurrences if interval[0] not in skipped]
+    
+    lock_room(db, series.room_id)
+    blocking = dict(zip(
+        candidates, conflicts.find_series_conflicts(db, series.room_id, candidates)
+    ))
+    
+    collisions = []
+    rows = []
+    for start_time, end_time in occurrences:
+        if start_time in skipped:
+            collisions.append(schemas.SeriesCollision(
+                start_time=start_time, end_time=end_time, reason=skipped[start_time]
+            ))
+        elif blocking[(start_time, end_time)]:
+            collisions.append(schemas.SeriesCollision(
+                start_time=start_time, end_time=end_time, reason="conflict",
+                blocking=blocking[(start_time, end_time)]
+            ))
+        else:
+            rows.append({
+                "room_id": series.room_id, "start_time": start_time, "end_time": end_time,
+                "notes": series.notes, "user_id": user_id, "status": "confirmed",
+                "created_at": datetime.now(),
+            })
+    
+    if not rows:
+        db.rollback()  # Release the room lock
+        return [], collisions
+    
+    # One executemany; the room lock keeps the new rows identifiable below
+    db.execute(insert(models.Booking), rows)
+    days = [
+        day for row in rows
+        for day in occupancy.days_of(row["start_time"], row["end_time"])
+    ]
+    occupancy.refresh_days(db, series.room_id, days)
+    db.commit()
+    availability_cache.invalidate(series.room_id, days)
+    
+    created = db.query(models.Booking).filter(
+        models.Booking.room_id == series.room_id,
+        models.Booking.user_id == user_id,
+        models.Booking.status == "confirmed",
+        models.Booking.start_time.in_([row["start_time"] for row in rows])
+    ).order_by(models.Booking.start_time).all()
+    return created, collisions
+
 def update_booking(db: Session, booking_id: int, booking_update: schemas.BookingUpdate):
     db_booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
     if db_booking:
+        previous = (db_booking.room_id, db_booking.start_time, db_booking.end_time)
         update_data = booking_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_booking, field, value)
+        if db_booking.status == "confirmed" and update_data.keys() & {"start_time", "end_time", "status"}:
+            lock_room(db, db_booking.room_id)
+            if conflicts.find_conflicts(
+                db, db_booking.room_id, db_booking.start_time, db_booking.end_time,
+                exclude_booking_id=db_booking.id
+            ):
+                db.rollback()  # Drop the changes and release the room lock
+                return None
+        _refresh_occupancy(db, *previous)
+        _refresh_occupancy(db, db_booking.room_id, db_booking.start_time, db_booking.end_time)
         db.commit()
         db.refresh(db_booking)
+        _invalidate_availability(*previous)
+        _invalidate_availability(db_booking.room_id, db_booking.start_time, db_booking.end_time)
     return db_booking
 
 def delete_booking(db: Session, booking_id: int):
     db_booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
     if db_booking:
+        previous = (db_booking.room_id, db_booking.start_time, db_booking.end_time)
         db.delete(db_booking)
+        _refresh_occupancy(db, *previous)
         db.commit()
+        _invalidate_availability(*previous)
         return True
     return False
 
 def get_available_slots(db: Session, room_id: int, date: datetime, duration_minutes: int = 60):
     """Get available time slots for a specific room and date"""
-    
-    # Check if it's Sunday (weekday 6) or Friday (weekday 4) - no availability on these days
-    if date.weekday() == 6 or date.weekday() == 4:  # Sunday or Friday
+    business_calendar.ensure_loaded(db)
+    windows = business_calendar.open_windows(date)
+    if not windows:
         return []
     
-    # Define business hours based on day of week
-    start_of_day = date.replace(hour=9, minute=0, second=0, microsecond=0)
-    
-    # Saturday closes at 1 PM (13:00), other days at 9 PM (21:00)
-    if date.weekday() == 5:  # Saturday
-        end_of_day = date.replace(hour=13, minute=0, second=0, microsecond=0)
-    else:  # Monday to Thursday
-        end_of_day = date.replace(hour=21, minute=0, second=0, microsecond=0)
-    
     # Get existing bookings for the day
-    existing_bookings = db.query(models.Booking).filter(
+    existing_bookings = db.query(
+        models.Booking.start_time, models.Booking.end_time
+    ).filter(
         and_(
             models.Booking.room_id == room_id,
-            models.Booking.start_time >= start_of_day,
-            models.Booking.start_time < end_of_day + timedelta(days=1),
+            models.Booking.start_time < windows[-1][1],
+            models.Booking.end_time > windows[0][0],
             models.Booking.status == "confirmed"
         )
-    ).order_by(models.Booking.start_time).all()
-    
-    # Generate available slots
-    available_slots = []
-    current_time = start_of_day
-    slot_duration = timedelta(minutes=duration_minutes)
-    
-    while current_time + slot_duration <= end_of_day:
-        slot_end = current_time + slot_duration
-        
-        # Check if this slot conflicts with any booking
-        is_available = True
-        for booking in existing_bookings:
-            if (current_time < booking.end_time and slot_end > booking.start_time):
-                is_available = False
-                break
-        
-        available_slots.append(schemas.TimeSlot(
-            start_time=current_time,
-            end_time=slot_end,
-            is_available=is_available,
-            room_id=room_id
-        ))
-        
-        current_time += slot_duration
+    ).all()
     
-    return available_slots
+    occupied = [(b.start_time, b.end_time) for b in existing_bookings]
+    slots = []
+    for start_of_day, end_of_day in windows:
+        slots += availability.build_slots(
+            room_id, start_of_day, end_of_day, duration_minutes, occupied
+        )
+    return slots
 
 # Class CRUD operations
 def get_class(db: Session, class_id: int):
-    return db.query(models.Class).filter(models.Class.id == class_id).first()
+    return db.query(models.Class).filter(
+        models.Class.id == class_id
+    ).options(joinedload(models.Class.room)).first()
 
-def get_classes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Class).offset(skip).limit(limit).all()
+def get_classes(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    query = db.query(models.Class).options(joinedload(models.Class.room))
+    return paginate(query, CLASS_ORDER, cursor, skip, limit)
 
 def get_classes_by_room(db: Session, room_id: int, start_date: datetime = None, end_date: datetime = None):
+    """Classes of a room inside [start_date, end_date].
+
+    When both bounds are given, recurring classes are listed once per
+    occurrence inside the range; the occurrences are generated on the fly
+    and share the id of the stored class.
+    """
+    return expand_classes(
+        load_classes_by_room(db, room_id, start_date, end_date), start_date, end_date
+    )
+
+def load_classes_by_room(db: Session, room_id: int, start_date: datetime = None,
+                         end_date: datetime = None) -> List[models.Class]:
+    """The database half of get_classes_by_room: stored classes of a room
+    that are, or may have occurrences, inside the range"""
     query = db.query(models.Class).filter(models.Class.room_id == room_id)
-    if start_date:
-        query = query.filter(models.Class.start_time >= start_date)
-    if end_date:
-        query = query.filter(models.Class.end_time <= end_date)
+    if start_date and end_date:
+        # Recurring classes that started earlier may have occurrences in range
+        query = query.filter(or_(
+            and_(models.Class.start_time >= start_date, models.Class.end_time <= end_date),
+            and_(models.Class.is_recurring.is_(True), models.Class.start_time <= end_date)
+        ))
+    else:
+        if start_date:
+            query = query.filter(models.Class.start_time >= start_date)
+        if end_date:
+            query = query.filter(models.Class.end_time <= end_date)
+    
     return query.order_by(models.Class.start_time).all()
 
+def expand_classes(rows: List[models.Class], start_date: datetime = None, end_date: datetime = None):
+    """The CPU half of get_classes_by_room: recurring classes expanded into
+    their occurrences inside [start_date, end_date]. Needs no session."""
+    classes = []
+    for db_class in rows:
+        if not (db_class.is_recurring and start_date and end_date):
+            classes.append(db_class)
+            continue
+        stored = schemas.Class.model_validate(db_class)
+        for start_time, end_time in recurrence.expansion_cache.expand(
+            db_class.id, db_class.start_time, db_class.end_time,
+            db_class.recurrence_pattern, start_date, end_date
+        ):
+            if start_time >= start_date and end_time <= end_date:
+                classes.append(stored.model_copy(update={"start_time": start_time, "end_time": end_time}))
+    classes.sort(key=lambda item: item.start_time)
+    return classes
+
+def _class_occurrences(start_time: datetime, end_time: datetime, pattern: Optional[str]):
+    """Occurrences of a recurring class checked for conflicts on write"""
+    return recurrence.occurrences(
+        start_time, end_time, recurrence.parse_rule(pattern),
+        start_time, start_time + recurrence.CHECK_HORIZON
+    )
+
+def _refresh_class_occupancy(db: Session, room_id: int, start_time: datetime, end_time: datetime,
+                             is_recurring: bool):
+    if is_recurring:
+        # A series touches every future day, so rebuild those lazily
+        db.flush()
+        occupancy.discard_from(db, room_id, start_time.date())
+    else:
+        _refresh_occupancy(db, room_id, start_time, end_time)
+
+def _invalidate_class_availability(room_id: int, start_time: datetime, end_time: datetime,
+                                   is_recurring: bool):
+    if is_recurring:
+        availability_cache.invalidate_room(room_id)
+    else:
+        _invalidate_availability(room_id, start_time, end_time)
+
 def create_class(db: Session, class_data: schemas.ClassCreate):
-    # Check for conflicts with existing bookings and classes
-    conflicts = db.query(models.Booking).filter(
-        and_(
-            models.Booking.room_id == class_data.room_id,
-            models.Booking.status == "confirmed",
-            or_(
-                and_(
-                    models.Booking.start_time <= class_data.start_time,
-                    models.Booking.end_time > class_data.start_time
-                ),
-                and_(
-                    models.Booking.start_time < class_data.end_time,
-                    models.Booking.end_time >= class_data.end_time
-                ),
-                and_(
-                    models.Booking.start_time >= class_data.start_time,
-                    models.Booking.end_time <= class_data.end_time
-                )
-            )
-        )
-    ).first()
+    lock_room(db, class_data.room_id)
     
-    if conflicts:
-        return None  # Conflict with booking found
-    
-    # Check for conflicts with existing classes
-    class_conflicts = db.query(models.Class).filter(
-        and_(
-            models.Class.room_id == class_data.room_id,
-            models.Class.status == "scheduled",
-            or_(
-                and_(
-                    models.Class.start_time <= class_data.start_time,
-                    models.Class.end_time > class_data.start_time
-                ),
-                and_(
-                    models.Class.start_time < class_data.end_time,
-                    models.Class.end_time >= class_data.end_time
-                ),
-                and_(
-                    models.Class.start_time >= class_data.start_time,
-                    models.Class.end_time <= class_data.end_time
-                )
-            )
+    if class_data.is_recurring:
+        occurrences = _class_occurrences(
+            class_data.start_time, class_data.end_time, class_data.recurrence_pattern
         )
-    ).first()
+        if any(conflicts.find_series_conflicts(db, class_data.room_id, occurrences)):
+            db.rollback()  # Release the room lock
+            return None
+        return _insert_class(db, class_data)
     
-    if class_conflicts:
-        return None  # Conflict with another class found
+    if occupancy.is_free(db, class_data.room_id, class_data.start_time, class_data.end_time):
+        return _insert_class(db, class_data)
     
+    # Check for conflicts with existing bookings, classes and students
+    if conflicts.find_conflicts(db, class_data.room_id, class_data.start_time, class_data.end_time):
+        db.rollback()  # Release the room lock
+        return None
+    
+    return _insert_class(db, class_data)
+
+def _insert_class(db: Session, class_data: schemas.ClassCreate):
     db_class = models.Class(**class_data.dict())
     db.add(db_class)
+    written = (db_class.room_id, db_class.start_time, db_class.end_time, bool(db_class.is_recurring))
+    _refresh_class_occupancy(db, *written)
     db.commit()
     db.refresh(db_class)
+    _invalidate_class_availability(*written)
     return db_class
 
 def update_class(db: Session, class_id: int, class_update: schemas.ClassUpdate):
     db_class = db.query(models.Class).filter(models.Class.id == class_id).first()
     if db_class:
+        previous = (db_class.room_id, db_class.start_time, db_class.end_time, bool(db_class.is_recurring))
         update_data = class_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_class, field, value)
+        checked = {"start_time", "end_time", "status", "is_recurring", "recurrence_pattern"}
+        if db_class.status == "scheduled" and update_data.keys() & checked:
+            lock_room(db, db_class.room_id)
+            if db_class.is_recurring:
+                blocked = any(conflicts.find_series_conflicts(
+                    db, db_class.room_id,
+                    _class_occurrences(
+                        db_class.start_time, db_class.end_time, db_class.recurrence_pattern
+                    ),
+                    exclude_class_id=db_class.id
+                ))
+            else:
+                blocked = conflicts.find_conflicts(
+                    db, db_class.room_id, db_class.start_time, db_class.end_time,
+                    exclude_class_id=db_class.id
+                )
+            if blocked:
+                db.rollback()  # Drop the changes and release the room lock
+                return None
+        written = (db_class.room_id, db_class.start_time, db_class.end_time, bool(db_class.is_recurring))
+        _refresh_class_occupancy(db, *previous)
+        _refresh_class_occupancy(db, *written)
         db.commit()
         db.refresh(db_class)
+        _invalidate_class_availability(*previous)
+        _invalidate_class_availability(*written)
     return db_class
 
 def delete_class(db: Session, class_id: int):
     db_class = db.query(models.Class).filter(models.Class.id == class_id).first()
     if db_class:
+        previous = (db_class.room_id, db_class.start_time, db_class.end_time, bool(db_class.is_recurring))
         db.delete(db_class)
+        _refresh_class_occupancy(db, *previous)
         db.commit()
+        _invalidate_class_availability(*previous)
         return True
     return False
 
-def get_available_slots_with_classes(db: Session, room_id: int, date: datetime, duration_minutes: int = 60):
-    """Get available time slots for a specific room and date, considering both bookings and classes"""
-    
-    # Check if it's Sunday (weekday 6) or Friday (weekday 4) - no availability on these days
-    if date.weekday() == 6 or date.weekday() == 4:  # Sunday or Friday
+def existing_room_ids(db: Session, room_ids: List[int], active_only: bool = False) -> List[int]:
+    """The ids of `room_ids` that belong to a room (an active one with
+    `active_only`), in the given order"""
+    if not room_ids:
         return []
+    query = db.query(models.Room.id).filter(models.Room.id.in_(set(room_ids)))
+    if active_only:
+        query = query.filter(models.Room.is_active == True)
+    found = {room_id for (room_id,) in query}
+    return [room_id for room_id in room_ids if room_id in found]
+
+def get_available_slots_with_classes(db: Session, room_id: int, date: datetime, duration_minutes: int = 60,
+                                     step_minutes: Optional[int] = None):
+    """Get available time slots for a specific room and date, considering both
+    bookings and classes, or None when the room does not exist"""
+    rooms = get_availability_for_rooms(
+        db, [room_id], date, date, duration_minutes, step_minutes
+    )
+    return rooms[0].slots if rooms else None
+
+class AvailabilityPlan(NamedTuple):
+    """What plan_availability read from the database, for build_availability"""
+    room_ids: List[int]
+    days: List[datetime]
+    open_hours: dict
+    duration_minutes: int
+    step_minutes: int
+    replica: bool
+    generations: dict
+    slots_by_day: dict
+    missing: list
+    masks: dict
+
+def get_availability_for_rooms(db: Session, room_ids: List[int], start_date: datetime,
+                               end_date: datetime, duration_minutes: int = 60,
+                               step_minutes: Optional[int] = None):
+    """Get availability for several rooms over a date range.
+
+    Days already in the availability cache are served from it; the rest are
+    computed together from the rooms' occupancy bitmaps. Slots start every
+    `step_minutes` (back-to-back, i.e. every `duration_minutes`, by default).
+
+    On a read replica nothing is written back, and rooms written to within
+    the replica's lag are not cached, since the replica may predate the
+    write. Ids of rooms that do not exist are left out.
+    """
+    return build_availability(plan_availability(
+        db, room_ids, start_date, end_date, duration_minutes, step_minutes
+    ))
+
+def plan_availability(db: Session, room_ids: List[int], start_date: datetime,
+                      end_date: datetime, duration_minutes: int = 60,
+                      step_minutes: Optional[int] = None) -> AvailabilityPlan:
+    """The database half of get_availability_for_rooms: cached days and the
+    occupancy bitmaps of the others"""
+    room_ids = existing_room_ids(db, room_ids)
+    step_minutes = step_minutes or duration_minutes
+    replica = db.info.get("replica", False)
+    business_calendar.ensure_loaded(db)
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date.date() - start_date.date()).days + 1)
+    ]
+    open_hours = {day: business_calendar.open_windows(day) for day in days}
     
-    # Define business hours based on day of week
-    start_of_day = date.replace(hour=9, minute=0, second=0, microsecond=0)
-      # Saturday closes at 1 PM (13:00), other days at 9 PM (21:00)
-    if date.weekday() == 5:  # Saturday
-        end_of_day = date.replace(hour=13, minute=0, second=0, microsecond=0)
-    else:  # Monday to Thursday
-        end_of_day = date.replace(hour=21, minute=0, second=0, microsecond=0)
+    # Capture the write generations before reading so that results computed
+    # while a write is committing are not cached
+    generations = {
+        room_id: availability_cache.generation(room_id) for room_id in room_ids
+    }
     
-    # Get existing bookings for the day
-    existing_bookings = db.query(models.Booking).filter(
-        and_(
-            models.Booking.room_id == room_id,
-            models.Booking.start_time >= start_of_day,
-            models.Booking.start_time < end_of_day + timedelta(days=1),
-            models.Booking.status == "confirmed"
-        )
-    ).order_by(models.Booking.start_time).all()
-      # Get existing classes for the day
-    existing_classes = db.query(models.Class).filter(
-        and_(
-            models.Class.room_id == room_id,
-            models.Class.start_time >= start_of_day,
-            models.Class.start_time < end_of_day + timedelta(days=1),
-            models.Class.status == "scheduled"
+    slots_by_day = {}
+    missing = []
+    for room_id in room_ids:
+        for day in days:
+            if not open_hours[day]:
+                slots_by_day[(room_id, day)] = []
+                continue
+            cached = availability_cache.get(
+                room_id, day.date(), duration_minutes, step_minutes
+            )
+            if cached is None:
+                missing.append((room_id, day))
+            else:
+                slots_by_day[(room_id, day)] = cached
+    
+    masks = {}
+    if missing:
+        masks = occupancy.load_masks(
+            db,
+            list(dict.fromkeys(room_id for room_id, _ in missing)),
+            sorted({day.date() for _, day in missing}),
+            persist=not replica
         )
-    ).order_by(models.Class.start_time).all()
+    return AvailabilityPlan(
+        room_ids, days, open_hours, duration_minutes, step_minutes, replica,
+        generations, slots_by_day, missing, masks
+    )
+
+def build_availability(plan: AvailabilityPlan) -> List[schemas.RoomAvailability]:
+    """The CPU half of get_availability_for_rooms: slots of the days missing
+    from the cache, scanned from their bitmaps within each opening window.
+    Needs no session, so async callers can run it off the event loop."""
+    slots_by_day = dict(plan.slots_by_day)
+    for room_id, day in plan.missing:
+        slots = []
+        for start_of_day, end_of_day in plan.open_hours[day]:
+            slots += availability.build_slots_from_mask(
+                room_id, start_of_day, end_of_day, plan.duration_minutes,
+                plan.masks[(room_id, day.date())], plan.step_minutes
+            )
+        if not (plan.replica and availability_cache.written_within(
+            room_id, settings.read_replica_max_lag_seconds
+        )):
+            availability_cache.put(
+                room_id, day.date(), plan.duration_minutes, plan.step_minutes, slots,
+                plan.generations[room_id]
+            )
+        slots_by_day[(room_id, day)] = slots
     
-    # Get student schedules for this day of week
-    student_schedules = db.query(models.Student).filter(
-        and_(
-            models.Student.room_id == room_id,
-            models.Student.weekday == date.weekday(),
-            models.Student.is_active.is_(True)
+    return [
+        schemas.RoomAvailability(
+            room_id=room_id, date=day.date(), slots=slots_by_day[(room_id, day)]
         )
-    ).all()
+        for room_id in plan.room_ids
+        for day in plan.days
+    ]
+
+# Days fetched per round of the next-available search
+SEARCH_CHUNK_DAYS = 7
+# The earliest start of a search is rounded up to a multiple of this many
+# minutes; slots then start wherever a gap between occupants begins
+SEARCH_STEP_MINUTES = 15
+
+def find_next_available_slots(db: Session, duration_minutes: int, not_before: datetime,
+                              horizon_days: int = 14, room_ids: Optional[List[int]] = None,
+                              limit: int = 5):
+    """Find the first `limit` free slots of `duration_minutes` in any of
+    `room_ids` (all active rooms by default) within `horizon_days`. Ids of
+    unknown or inactive rooms are ignored.
+
+    Days are fetched a week at a time and the search stops as soon as enough
+    slots were found, walking the gaps between occupied intervals instead of
+    building full day grids.
+    """
+    if room_ids is None:
+        room_ids = [
+            room_id for (room_id,) in
+            db.query(models.Room.id).filter(models.Room.is_active == True).order_by(models.Room.id)
+        ]
+    else:
+        room_ids = existing_room_ids(db, room_ids, active_only=True)
+    if not room_ids or limit <= 0:
+        return []
+    business_calendar.ensure_loaded(db)
     
-    # Generate available slots
-    available_slots = []
-    current_time = start_of_day
-    slot_duration = timedelta(minutes=duration_minutes)
+    # Round the earliest start up to the search step
+    step = timedelta(minutes=SEARCH_STEP_MINUTES)
+    midnight = not_before.replace(hour=0, minute=0, second=0, microsecond=0)
+    not_before = midnight + math.ceil((not_before - midnight) / step) * step
     
-    while current_time + slot_duration <= end_of_day:
-        slot_end = current_time + slot_duration
+    horizon_end = midnight + timedelta(days=horizon_days)
+    found = []
+    chunk_start = midnight
+    while chunk_start < horizon_end and len(found) < limit:
+        chunk_end = min(chunk_start + timedelta(days=SEARCH_CHUNK_DAYS), horizon_end)
+        days = [
+            chunk_start + timedelta(days=offset)
+            for offset in range((chunk_end - chunk_start).days)
+        ]
+        windows = [
+            (max(window_start, not_before), window_end)
+            for day in days
+            for window_start, window_end in business_calendar.open_windows(day)
+            if window_end > not_before
+        ]
         
-        # Check if this slot conflicts with any booking
-        is_available = True
-        for booking in existing_bookings:
-            if (current_time < booking.end_time and slot_end > booking.start_time):
-                is_available = False
-                break
-          # Check if this slot conflicts with any class
-        if is_available:
-            for class_schedule in existing_classes:
-                if (current_time < class_schedule.end_time and 
-                    slot_end > class_schedule.start_time):
-                    is_available = False
-                    break
-        
-        # Check if this slot conflicts with any student schedule
-        if is_available:
-            for student in student_schedules:
-                # Convert student time strings to datetime objects
-                student_start_hour, student_start_min = map(
-                    int, student.start_time.split(':')
-                )
-                student_end_hour, student_end_min = map(
-                    int, student.end_time.split(':')
-                )
-                
-                student_start = date.replace(
-                    hour=student_start_hour, 
-                    minute=student_start_min,
-                    second=0, 
-                    microsecond=0
-                )
-                student_end = date.replace(
-                    hour=student_end_hour,
-                    minute=student_end_min,
-                    second=0,
-                    microsecond=0
+        if windows:
+            intervals, weekly = occupancy.load_occupants(
+                db, room_ids, windows[0][0], windows[-1][1]
+            )
+            candidates = []
+            for room_id in room_ids:
+                occupied = list(intervals[room_id])
+                for day in days:
+                    for start_min, end_min in weekly.get((room_id, day.weekday()), []):
+                        occupied.append((
+                            day + timedelta(minutes=start_min),
+                            day + timedelta(minutes=end_min)
+                        ))
+                slots = availability.free_slots(
+                    windows, availability.merge_intervals(occupied),
+                    duration_minutes, limit - len(found)
                 )
-                
-                if (current_time < student_end and slot_end > student_start):
-                    is_available = False
-                    break
-        
-        available_slots.append(schemas.TimeSlot(
-            start_time=current_time,
-            end_time=slot_end,
-            is_available=is_available,
-            room_id=room_id
-        ))
-        
-        current_time += slot_duration
+                candidates.extend((start, room_id, end) for start, end in slots)
+            
+            candidates.sort()
+            for start, room_id, end in candidates[:limit - len(found)]:
+                found.append(schemas.TimeSlot(
+                    start_time=start, end_time=end, is_available=True, room_id=room_id
+                ))
+        chunk_start = chunk_end
+    
+    return found
+
+def get_utilization(db: Session, room_ids: List[int], start_date: datetime, days: int):
+    """Free/occupied minutes within business hours per room and day.
+
+    Occupants are fetched with one range query per table and aggregated with
+    NumPy over the whole range at once. Completed and archived bookings and
+    classes count as occupied.
+    """
+    origin = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    dates = [origin + timedelta(days=offset) for offset in range(days)]
+    
+    business_calendar.ensure_loaded(db)
+    open_windows = [
+        tuple(int((moment - origin).total_seconds()) // 60 for moment in window)
+        for day in dates
+        for window in business_calendar.open_windows(day)
+    ]
     
-    return available_slots
+    intervals, weekly = occupancy.load_occupants(
+        db, room_ids, origin, origin + timedelta(days=days), include_history=True
+    )
+    room_index, starts, ends = utilization.occupied_offsets(
+        room_ids, intervals, weekly, origin, days
+    )
+    open_minutes, occupied_minutes = utilization.minute_totals(
+        len(room_ids), days, open_windows, room_index, starts, ends
+    )
+    
+    return [
+        schemas.RoomUtilization(
+            room_id=room_id,
+            days=[
+                schemas.UtilizationDay(
+                    date=day.date(),
+                    open_minutes=int(open_minutes[offset]),
+                    occupied_minutes=int(occupied_minutes[index, offset]),
+                    free_minutes=int(open_minutes[offset] - occupied_minutes[index, offset]),
+                    utilization=(
+                        float(occupied_minutes[index, offset] / open_minutes[offset])
+                        if open_minutes[offset] else 0.0
+                    )
+                )
+                for offset, day in enumerate(dates)
+            ]
+        )
+        for index, room_id in enumerate(room_ids)
+    ]
 
 # Student CRUD operations
-def get_students(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Student).filter(
+def get_students(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    query = db.query(models.Student).filter(
         models.Student.is_active.is_(True)
-    ).offset(skip).limit(limit).all()
+    ).options(joinedload(models.Student.room))
+    return paginate(query, STUDENT_ORDER, cursor, skip, limit)
 
 
 def get_student(db: Session, student_id: int):
     return db.query(models.Student).filter(
         models.Student.id == student_id,
         models.Student.is_active.is_(True)
-    ).first()
+    ).options(joinedload(models.Student.room)).first()
 
 
 def create_student(db: Session, student: schemas.StudentCreate):
     db_student = models.Student(**student.dict())
     db.add(db_student)
+    occupancy.discard_weekday(db, db_student.room_id, db_student.weekday)
     db.commit()
     db.refresh(db_student)
+    availability_cache.invalidate_weekday(db_student.room_id, db_student.weekday)
     return db_student
 
 
@@ -419,12 +719,17 @@ def update_student(db: Session, student_id: int,
     if not db_student:
         return None
     
+    previous = (db_student.room_id, db_student.weekday)
     update_data = student_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_student, field, value)
+    occupancy.discard_weekday(db, *previous)
+    occupancy.discard_weekday(db, db_student.room_id, db_student.weekday)
     
     db.commit()
     db.refresh(db_student)
+    availability_cache.invalidate_weekday(*previous)
+    availability_cache.invalidate_weekday(db_student.room_id, db_student.weekday)
     return db_student
 
 
@@ -435,7 +740,9 @@ def delete_student(db: Session, student_id: int):
     
     # Soft delete
     db_student.is_active = False
+    occupancy.discard_weekday(db, db_student.room_id, db_student.weekday)
     db.commit()
+    availability_cache.invalidate_weekday(db_student.room_id, db_student.weekday)
     return db_student
 
 
@@ -443,4 +750,59 @@ def get_students_by_room(db: Session, room_id: int):
     return db.query(models.Student).filter(
         models.Student.room_id == room_id,
         models.Student.is_active.is_(True)
+    ).options(joinedload(models.Student.room)).all()
+
+
+
+# Business calendar operations
+def _calendar_changed(db: Session):
+    business_calendar.load(db)
+    availability_cache.clear()
+
+
+def get_business_hours(db: Session):
+    return db.query(models.BusinessHours).order_by(
+        models.BusinessHours.weekday, models.BusinessHours.open_min
     ).all()
+
+
+def replace_business_hours(db: Session, hours: List[schemas.BusinessHoursBase]):
+    """Replace the whole weekly schedule; an empty list restores the defaults"""
+    db.query(models.BusinessHours).delete(synchronize_session=False)
+    db.add_all(models.BusinessHours(**window.dict()) for window in hours)
+    db.commit()
+    _calendar_changed(db)
+    return get_business_hours(db)
+
+
+def get_blackouts(db: Session):
+    return db.query(models.CalendarBlackout).order_by(
+        models.CalendarBlackout.date
+    ).all()
+
+
+def get_blackout_by_date(db: Session, day):
+    return db.query(models.CalendarBlackout).filter(
+        models.CalendarBlackout.date == day
+    ).first()
+
+
+def create_blackout(db: Session, blackout: schemas.CalendarBlackoutCreate):
+    db_blackout = models.CalendarBlackout(**blackout.dict())
+    db.add(db_blackout)
+    db.commit()
+    db.refresh(db_blackout)
+    _calendar_changed(db)
+    return db_blackout
+
+
+def delete_blackout(db: Session, blackout_id: int):
+    db_blackout = db.query(models.CalendarBlackout).filter(
+        models.CalendarBlackout.id == blackout_id
+    ).first()
+    if not db_blackout:
+        return False
+    db.delete(db_blackout)
+    db.commit()
+    _calendar_changed(db)
+    return True
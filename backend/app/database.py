@@ -1,19 +1,292 @@
-from sqlalchemy import create_engine
+import hashlib
+import threading
+import time
+from typing import Dict, List
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
 
-# Special handling for SQLite
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url, 
-        connect_args={"check_same_thread": False}
+# Async drivers used for the AsyncSession path
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+class PoolMetrics:
+    """Checkout counters of an InstrumentedQueuePool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record(self, seconds: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "average_checkout_ms": (
+                    1000 * self.checkout_seconds / self.checkouts if self.checkouts else 0.0
+                ),
+                "max_checkout_ms": 1000 * self.max_checkout_seconds,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool timing how long each checkout waits for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        # overflow() counts every connection opened, minus pool_size; it only
+        # goes above zero for connections beyond pool_size
+        overflowed = self.overflow() > max(overflow, 0)
+        self.metrics.record(time.perf_counter() - started, overflowed)
+        return connection
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for the async engines"""
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMAs of the SQLite tuning profile, from the settings"""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+def apply_sqlite_pragmas(target_engine, pragmas: dict):
+    """Run `pragmas` on every new connection of a SQLite engine"""
+    @event.listens_for(target_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_options(url: str) -> dict:
+    options = {}
+    if url.startswith("sqlite"):
+        # Special handling for SQLite
+        options["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            # In-memory databases live in a single connection; keep the default pool
+            return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
     )
-else:
-    engine = create_engine(settings.database_url)
+    return options
+
+
+def _async_url(url: str) -> str:
+    """A database URL with its async driver"""
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    driver = ASYNC_DRIVERS.get(dialect)
+    return f"{dialect}+{driver}://{rest}" if driver else url
+
+
+def _async_engine_options(url: str) -> dict:
+    options = {
+        key: value for key, value in _engine_options(url).items()
+        if key not in ("poolclass", "connect_args")
+    }
+    if "pool_size" in options:
+        options["poolclass"] = InstrumentedAsyncAdaptedQueuePool
+    return options
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+if settings.database_url.startswith("sqlite") and settings.sqlite_tuning:
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_database_url = settings.async_database_url or _async_url(settings.database_url)
+async_engine = create_async_engine(async_database_url, **_async_engine_options(settings.database_url))
+if settings.database_url.startswith("sqlite") and settings.sqlite_tuning:
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Read replica. Without one, the read factories are bound to the primary.
+# Sessions on the replica carry info["replica"] so code paths that would
+# write as a side effect (e.g. materializing occupancy rows) can skip it.
+if settings.read_replica_url:
+    replica_url = settings.read_replica_url
+    replica_engine = create_engine(replica_url, **_engine_options(replica_url))
+    async_replica_engine = create_async_engine(
+        _async_url(replica_url), **_async_engine_options(replica_url)
+    )
+    if replica_url.startswith("sqlite"):
+        # A second connection set on the same file: in WAL mode readers never
+        # wait for the writer, and query_only rejects any write by mistake
+        pragmas = sqlite_pragmas() if settings.sqlite_tuning else {}
+        pragmas["query_only"] = "ON"
+        apply_sqlite_pragmas(replica_engine, pragmas)
+        apply_sqlite_pragmas(async_replica_engine.sync_engine, pragmas)
+    replica_info = {"replica": True}
+else:
+    replica_engine, async_replica_engine = engine, async_engine
+    replica_info = {}
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine, info=replica_info
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_replica_engine, autoflush=False, expire_on_commit=False, info=replica_info
+)
+
+
+class ReadRouter:
+    """Chooses the database serving a request.
+
+    Safe (GET/HEAD) requests go to the replica, unless routing is off or the
+    client wrote something in the last `sticky_seconds`: a client keeps
+    reading from the primary until the replica has had time to replay its
+    own writes. Clients are told apart by their bearer token, and by their
+    address for requests made before logging in.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD")
+
+    def __init__(self, enabled: bool, sticky_seconds: float):
+        self.enabled = enabled
+        self.sticky_seconds = sticky_seconds
+        self._written_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.writes = 0
+
+    @staticmethod
+    def _clients(request: Request) -> List[str]:
+        clients = []
+        authorization = request.headers.get("authorization")
+        if authorization:
+            clients.append("token:" + hashlib.sha256(authorization.encode()).hexdigest())
+        if request.client is not None:
+            clients.append("address:" + request.client.host)
+        return clients
+
+    def record_write(self, request: Request):
+        """Keep the reads of the request's client on the primary for a while"""
+        now = time.monotonic()
+        with self._lock:
+            self.writes += 1
+            if not self.enabled:
+                return
+            for client in self._clients(request):
+                self._written_at[client] = now
+            if len(self._written_at) > 1024:
+                self._forget(now)
+
+    def use_replica(self, request: Request) -> bool:
+        if not self.enabled or request.method not in self.SAFE_METHODS:
+            with self._lock:
+                self.primary_reads += request.method in self.SAFE_METHODS
+            return False
+        clients = self._clients(request)
+        now = time.monotonic()
+        with self._lock:
+            sticky = any(
+                now - self._written_at.get(client, float("-inf")) < self.sticky_seconds
+                for client in clients
+            )
+            if sticky:
+                self.primary_reads += 1
+                self.sticky_reads += 1
+            else:
+                self.replica_reads += 1
+        return not sticky
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._forget(time.monotonic())
+            reads = self.replica_reads + self.primary_reads
+            return {
+                "enabled": self.enabled,
+                "sticky_seconds": self.sticky_seconds,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "sticky_reads": self.sticky_reads,
+                "replica_ratio": self.replica_reads / reads if reads else 0.0,
+                "writes": self.writes,
+                "sticky_clients": len(self._written_at),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._written_at.clear()
+            self.replica_reads = self.primary_reads = self.sticky_reads = self.writes = 0
+
+    def _forget(self, now: float):
+        """Drop clients whose last write is older than the sticky window"""
+        for client in [
+            client for client, written_at in self._written_at.items()
+            if now - written_at >= self.sticky_seconds
+        ]:
+            del self._written_at[client]
+
+
+read_router = ReadRouter(
+    enabled=bool(settings.read_replica_url) and settings.read_routing_enabled,
+    sticky_seconds=settings.read_replica_max_lag_seconds,
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -22,3 +295,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(request: Request):
+    """get_db for query endpoints, served by the replica when routed there"""
+    factory = ReadSessionLocal if read_router.use_replica(request) else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """get_async_db for query endpoints, served by the replica when routed
+    there"""
+    factory = AsyncReadSessionLocal if read_router.use_replica(request) else AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+def pool_stats(target_engine=None) -> dict:
+    """Current pool usage plus the checkout counters of an engine, sync or
+    async (the sync primary by default)"""
+    pool = (target_engine or engine).pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.metrics.snapshot())
+    return stats
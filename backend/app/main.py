@@ -1,19 +1,26 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from .database import engine, get_db
-from .models import Base, User
+from .database import engine, get_db, read_router
+from .models import User
 from .routers import auth, rooms, bookings, admin, classes, students
 from .auth import get_password_hash
 from .config import settings
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from .business_hours import business_calendar
+from . import archive, scheduler, sweeper
+from .pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from .schema import check_schema_revision
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create admin user if it doesn't exist
+    # Startup: the schema is migrated by `alembic upgrade head`; only check
+    # that it is current
+    if settings.schema_check:
+        check_schema_revision(engine)
+    
+    # Create admin user if it doesn't exist
     db = next(get_db())
     try:
         admin_user = db.query(User).filter(
@@ -58,13 +65,20 @@ async def lifespan(app: FastAPI):
                 db.add(room)
             db.commit()
             print("Sample rooms created")
+        
+        business_calendar.load(db)
             
     finally:
         db.close()
     
+    # Optional periodic maintenance
+    for job in (sweeper.scheduled_job(), archive.scheduled_job()):
+        if job is not None:
+            scheduler.start(job)
+    
     yield
     # Shutdown
-    pass
+    await scheduler.stop_all()
 
 app = FastAPI(
     title="Agendamento de aulas API",
@@ -80,8 +94,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": "Cursor inválido"})
+
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    """Keep a client's reads on the primary right after it writes"""
+    response = await call_next(request)
+    if request.method not in read_router.SAFE_METHODS and response.status_code < 400:
+        read_router.record_write(request)
+    return response
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(rooms.router)
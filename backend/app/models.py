@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, ForeignKey, Text, LargeBinary, Index
+from sqlalchemy.orm import relationship, declarative_base, validates
 from datetime import datetime
 
 Base = declarative_base()
 
+def time_to_minutes(value: str) -> int:
+    """Convert an "HH:MM" string to minutes since midnight"""
+    hours, minutes = map(int, value.split(":"))
+    return hours * 60 + minutes
+
 class User(Base):
     __tablename__ = "users"
     
@@ -28,6 +33,8 @@ class Room(Base):
     capacity = Column(Integer, default=1)
     equipment = Column(Text)  # JSON string of available equipment
     is_active = Column(Boolean, default=True)
+    # Bumped whenever room_occupancy rows of the room are discarded (see occupancy.py)
+    occupancy_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     bookings = relationship("Booking", back_populates="room")
@@ -48,6 +55,14 @@ class Booking(Base):
     # Relationships
     user = relationship("User", back_populates="bookings")
     room = relationship("Room", back_populates="bookings")
+    
+    __table_args__ = (
+        Index("ix_bookings_room_status_time", "room_id", "status", "start_time", "end_time"),
+        Index("ix_bookings_user_start", "user_id", "start_time"),
+        Index("ix_bookings_start_time", "start_time", "id"),
+        # Archived ids must never be handed out again (see app/archive.py)
+        {"sqlite_autoincrement": True},
+    )
 
 class Class(Base):
     __tablename__ = "classes"
@@ -67,6 +82,13 @@ class Class(Base):
     
     # Relationships
     room = relationship("Room", back_populates="classes")
+    
+    __table_args__ = (
+        Index("ix_classes_room_status_time", "room_id", "status", "start_time", "end_time"),
+        Index("ix_classes_room_start", "room_id", "start_time"),
+        Index("ix_classes_start_time", "start_time", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
 class Student(Base):
     __tablename__ = "students"
@@ -80,9 +102,91 @@ class Student(Base):
     weekday = Column(Integer, nullable=False)  # 0=Mon, 1=Tue, ..., 6=Sun
     start_time = Column(String, nullable=False)  # Format: "14:00"
     end_time = Column(String, nullable=False)    # Format: "15:00"
+    start_min = Column(Integer, nullable=False)  # Minutes since midnight, kept in sync with start_time
+    end_min = Column(Integer, nullable=False)    # Minutes since midnight, kept in sync with end_time
     notes = Column(Text)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.now)
     
     # Relationships
     room = relationship("Room")
+    
+    __table_args__ = (
+        Index("ix_students_room_weekday_minutes", "room_id", "weekday", "start_min", "end_min"),
+    )
+    
+    @validates("start_time", "end_time")
+    def _sync_minutes(self, key, value):
+        setattr(self, key.replace("_time", "_min"), time_to_minutes(value))
+        return value
+
+class RoomOccupancy(Base):
+    __tablename__ = "room_occupancy"
+    
+    room_id = Column(Integer, ForeignKey("rooms.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    weekday = Column(Integer, nullable=False, index=True)  # 0=Mon, 1=Tue, ..., 6=Sun
+    bits = Column(LargeBinary, nullable=False)  # 1440-bit mask, bit n = minute n of the day
+    updated_at = Column(DateTime, default=datetime.now)
+
+class BusinessHours(Base):
+    __tablename__ = "business_hours"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    weekday = Column(Integer, nullable=False)  # 0=Mon, 1=Tue, ..., 6=Sun
+    open_time = Column(String, nullable=False)   # Format: "09:00"
+    close_time = Column(String, nullable=False)  # Format: "21:00"
+    open_min = Column(Integer, nullable=False)   # Minutes since midnight, kept in sync with open_time
+    close_min = Column(Integer, nullable=False)  # Minutes since midnight, kept in sync with close_time
+    
+    @validates("open_time", "close_time")
+    def _sync_minutes(self, key, value):
+        setattr(self, key.replace("_time", "_min"), time_to_minutes(value))
+        return value
+
+class CalendarBlackout(Base):
+    __tablename__ = "calendar_blackouts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False, unique=True, index=True)
+    reason = Column(String)
+
+# Archive of finished bookings and classes (see archive.py). Same columns as
+# the hot tables, ids included, plus when each row was moved.
+class BookingArchive(Base):
+    __tablename__ = "bookings_archive"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    notes = Column(Text)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.now)
+    
+    __table_args__ = (
+        Index("ix_bookings_archive_room_start", "room_id", "start_time"),
+    )
+
+class ClassArchive(Base):
+    __tablename__ = "classes_archive"
+    
+    id = Column(Integer, primary_key=True)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    teacher_name = Column(String, nullable=False)
+    class_name = Column(String, nullable=False)
+    student_name = Column(String)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    is_recurring = Column(Boolean)
+    recurrence_pattern = Column(String)
+    notes = Column(Text)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.now)
+    
+    __table_args__ = (
+        Index("ix_classes_archive_room_start", "room_id", "start_time"),
+    )
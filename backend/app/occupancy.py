@@ -0,0 +1,336 @@
+"""Materialized per-room daily occupancy bitmaps.
+
+Each `room_occupancy` row stores a 1440-bit mask for one room and day, where
+bit n is set when minute n (counted from midnight) is taken by a confirmed
+booking, a scheduled class (or an occurrence of a recurring one) or an
+active student's weekly slot. Booking and class write paths rebuild the
+rows of the days they touch inside their own transaction; student writes
+discard the rows of the affected weekday, and recurring class writes the
+rows from the series start on, which are rebuilt lazily on the next read.
+
+Discarding also bumps the room's `occupancy_version`. A reader captures the
+versions before reading the source tables and only stores the rows it
+built if they are unchanged, so a row computed before a discard can never
+be saved after it.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .archive import booking_history, class_history
+from .recurrence import expansion_cache
+
+MINUTES_PER_DAY = 24 * 60
+MASK_BYTES = MINUTES_PER_DAY // 8
+# Rows per multi-row INSERT, well below SQLite's bound parameter limit
+STORE_CHUNK_SIZE = 500
+
+DayKey = Tuple[int, date]
+
+
+def interval_mask(day: date, start_time: datetime, end_time: datetime) -> int:
+    """Bits covered by [start_time, end_time) on `day`, rounded outwards to
+    whole minutes"""
+    midnight = datetime.combine(day, datetime.min.time())
+    start = max((start_time - midnight).total_seconds(), 0)
+    end = min((end_time - midnight).total_seconds(), MINUTES_PER_DAY * 60)
+    if end <= start:
+        return 0
+    first = int(start // 60)
+    last = -int(-end // 60)
+    return ((1 << (last - first)) - 1) << first
+
+
+def minutes_mask(start_min: int, end_min: int) -> int:
+    """Bits covered by [start_min, end_min) minutes after midnight"""
+    start_min = max(start_min, 0)
+    end_min = min(end_min, MINUTES_PER_DAY)
+    if end_min <= start_min:
+        return 0
+    return ((1 << (end_min - start_min)) - 1) << start_min
+
+
+def days_of(start_time: datetime, end_time: datetime) -> List[date]:
+    """Dates touched by [start_time, end_time)"""
+    last = (end_time - timedelta(microseconds=1)).date()
+    first = start_time.date()
+    return [first + timedelta(days=n) for n in range(max((last - first).days, 0) + 1)]
+
+
+def load_occupants(db: Session, room_ids: List[int], range_start: datetime,
+                   range_end: datetime, include_history: bool = False):
+    """Fetch what occupies `room_ids` during [range_start, range_end), with
+    one range query per table.
+
+    Returns the one-off intervals (bookings and classes) per room, sorted by
+    start, and the weekly student slots as (start_min, end_min) pairs per
+    (room, weekday). With `include_history`, completed bookings and classes
+    count as well, archived ones included, as reports on past days expect.
+    """
+    intervals: Dict[int, List[Tuple[datetime, datetime]]] = {room_id: [] for room_id in room_ids}
+    weekly: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    if not room_ids:
+        return intervals, weekly
+
+    if include_history:
+        # Finished and archived rows occupied the room too
+        Booking, booking_statuses = booking_history().c, ("confirmed", "completed")
+        Class, class_statuses = class_history().c, ("scheduled", "completed")
+    else:
+        Booking, booking_statuses = models.Booking, ("confirmed",)
+        Class, class_statuses = models.Class, ("scheduled",)
+
+    bookings = db.query(
+        Booking.room_id, Booking.start_time, Booking.end_time
+    ).filter(
+        and_(
+            Booking.room_id.in_(room_ids),
+            Booking.status.in_(booking_statuses),
+            Booking.start_time < range_end,
+            Booking.end_time > range_start
+        )
+    ).all()
+
+    # Recurring classes are stored once, so any series that started before
+    # the range ends may have occurrences inside it
+    classes = db.query(
+        Class.id, Class.room_id, Class.start_time,
+        Class.end_time, Class.is_recurring, Class.recurrence_pattern
+    ).filter(
+        and_(
+            Class.room_id.in_(room_ids),
+            Class.status.in_(class_statuses),
+            Class.start_time < range_end,
+            or_(Class.end_time > range_start, Class.is_recurring.is_(True))
+        )
+    ).all()
+
+    students = db.query(
+        models.Student.room_id, models.Student.weekday,
+        models.Student.start_min, models.Student.end_min
+    ).filter(
+        and_(
+            models.Student.room_id.in_(room_ids),
+            models.Student.is_active.is_(True)
+        )
+    ).all()
+
+    for row in bookings:
+        intervals[row.room_id].append((row.start_time, row.end_time))
+    for row in classes:
+        if row.is_recurring:
+            intervals[row.room_id].extend(expansion_cache.expand(
+                row.id, row.start_time, row.end_time, row.recurrence_pattern,
+                range_start, range_end
+            ))
+        else:
+            intervals[row.room_id].append((row.start_time, row.end_time))
+    for room_intervals in intervals.values():
+        room_intervals.sort()
+    for row in students:
+        weekly.setdefault((row.room_id, row.weekday), []).append((row.start_min, row.end_min))
+    return intervals, weekly
+
+
+def compute_masks(db: Session, room_ids: List[int], days: List[date]) -> Dict[DayKey, int]:
+    """Build the masks of `room_ids` x `days` from the source tables"""
+    masks = {(room_id, day): 0 for room_id in room_ids for day in days}
+    if not room_ids or not days:
+        return masks
+    wanted_days = set(days)
+    range_start = datetime.combine(min(days), datetime.min.time())
+    range_end = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+    intervals, weekly = load_occupants(db, room_ids, range_start, range_end)
+
+    for room_id, room_intervals in intervals.items():
+        for start_time, end_time in room_intervals:
+            for day in days_of(start_time, end_time):
+                if day in wanted_days:
+                    masks[(room_id, day)] |= interval_mask(day, start_time, end_time)
+
+    weekly_masks: Dict[Tuple[int, int], int] = {}
+    for key, slots in weekly.items():
+        for start_min, end_min in slots:
+            weekly_masks[key] = weekly_masks.get(key, 0) | minutes_mask(start_min, end_min)
+    for (room_id, day) in masks:
+        masks[(room_id, day)] |= weekly_masks.get((room_id, day.weekday()), 0)
+
+    return masks
+
+
+def _store(db: Session, masks: Dict[DayKey, int], overwrite: bool):
+    if not masks:
+        return
+    rows = [
+        {
+            "room_id": room_id,
+            "date": day,
+            "weekday": day.weekday(),
+            "bits": mask.to_bytes(MASK_BYTES, "little"),
+            "updated_at": datetime.now(),
+        }
+        for (room_id, day), mask in masks.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        index = ["room_id", "date"]
+        for offset in range(0, len(rows), STORE_CHUNK_SIZE):
+            statement = insert(models.RoomOccupancy).values(
+                rows[offset:offset + STORE_CHUNK_SIZE]
+            )
+            if overwrite:
+                statement = statement.on_conflict_do_update(
+                    index_elements=index,
+                    set_={
+                        "bits": statement.excluded.bits,
+                        "updated_at": statement.excluded.updated_at,
+                    }
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=index)
+            db.execute(statement)
+    else:
+        for row in rows:
+            db.merge(models.RoomOccupancy(**row))
+
+
+def load_masks(db: Session, room_ids: List[int], days: List[date],
+               persist: bool = True) -> Dict[DayKey, int]:
+    """Get the masks of `room_ids` x `days`, building and storing the rows
+    that have not been materialized yet"""
+    masks = {}
+    if not room_ids or not days:
+        return masks
+    rows = db.query(models.RoomOccupancy).filter(
+        models.RoomOccupancy.room_id.in_(room_ids),
+        models.RoomOccupancy.date >= min(days),
+        models.RoomOccupancy.date <= max(days)
+    ).all()
+    for row in rows:
+        masks[(row.room_id, row.date)] = int.from_bytes(row.bits, "little")
+
+    missing = [
+        (room_id, day) for room_id in room_ids for day in days
+        if (room_id, day) not in masks
+    ]
+    if missing:
+        missing_rooms = sorted({room_id for room_id, _ in missing})
+        # Captured before reading the sources; see store_built
+        versions = occupancy_versions(db, missing_rooms) if persist else {}
+        built = compute_masks(db, missing_rooms, sorted({day for _, day in missing}))
+        built = {key: built[key] for key in missing}
+        masks.update(built)
+        if persist:
+            store_built(db, built, versions)
+    return masks
+
+
+def occupancy_versions(db: Session, room_ids: Iterable[int], lock: bool = False) -> Dict[int, int]:
+    """occupancy_version of each existing room of `room_ids`.
+
+    With `lock`, the versions cannot change until the transaction ends: on
+    SQLite the database write lock is taken up front (BEGIN IMMEDIATE), on
+    other databases the rooms' rows are share-locked.
+    """
+    query = db.query(models.Room.id, models.Room.occupancy_version).filter(
+        models.Room.id.in_(list(room_ids))
+    )
+    if lock:
+        if db.get_bind().dialect.name == "sqlite":
+            connection = db.connection()
+            if not connection.connection.driver_connection.in_transaction:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            query = query.with_for_update(read=True)
+    return dict(query.all())
+
+
+def store_built(db: Session, built: Dict[DayKey, int], versions: Dict[int, int]):
+    """Store masks built from the sources read after `versions` were
+    captured, and commit.
+
+    Rows of rooms whose version moved meanwhile are dropped, since a
+    discard may have committed after the sources were read; so are rows of
+    rooms that do not exist (room_id is a foreign key). Rows written
+    concurrently by a write path win over ours.
+    """
+    current = occupancy_versions(db, {room_id for room_id, _ in built}, lock=True)
+    _store(db, {
+        key: mask for key, mask in built.items()
+        if key[0] in current and current[key[0]] == versions.get(key[0])
+    }, overwrite=False)
+    db.commit()
+
+
+def cached_masks(db: Session, room_id: int, days: Iterable[date]) -> Optional[Dict[date, int]]:
+    """Get the stored masks of a room for `days`, or None when any of them
+    has not been materialized"""
+    days = list(days)
+    rows = db.query(
+        models.RoomOccupancy.date, models.RoomOccupancy.bits
+    ).filter(
+        models.RoomOccupancy.room_id == room_id,
+        models.RoomOccupancy.date.in_(days)
+    ).all()
+    if len(rows) != len(set(days)):
+        return None
+    return {row.date: int.from_bytes(row.bits, "little") for row in rows}
+
+
+def is_free(db: Session, room_id: int, start_time: datetime, end_time: datetime) -> Optional[bool]:
+    """Check [start_time, end_time) against the stored masks.
+
+    Returns None when a touched day has no materialized row, so the caller
+    has to fall back to querying the source tables.
+    """
+    days = days_of(start_time, end_time)
+    masks = cached_masks(db, room_id, days)
+    if masks is None:
+        return None
+    return all(
+        not masks[day] & interval_mask(day, start_time, end_time) for day in days
+    )
+
+
+def refresh(db: Session, room_id: int, start_time: datetime, end_time: datetime):
+    """Rebuild the rows of the days touched by an interval.
+
+    Must run inside the writing transaction, after the change was flushed.
+    """
+    refresh_days(db, room_id, days_of(start_time, end_time))
+
+
+def refresh_days(db: Session, room_id: int, days: List[date]):
+    """Rebuild the rows of a room for `days`, reading the source tables once"""
+    _store(db, compute_masks(db, [room_id], sorted(set(days))), overwrite=True)
+
+
+def _bump_version(db: Session, room_id: int):
+    db.query(models.Room).filter(models.Room.id == room_id).update(
+        {models.Room.occupancy_version: models.Room.occupancy_version + 1},
+        synchronize_session=False
+    )
+
+
+def discard_weekday(db: Session, room_id: int, weekday: int):
+    """Drop the rows of a room for a weekday so they are rebuilt lazily"""
+    _bump_version(db, room_id)
+    db.query(models.RoomOccupancy).filter(
+        models.RoomOccupancy.room_id == room_id,
+        models.RoomOccupancy.weekday == weekday
+    ).delete(synchronize_session=False)
+
+
+def discard_from(db: Session, room_id: int, day: date):
+    """Drop the rows of a room from `day` on so they are rebuilt lazily"""
+    _bump_version(db, room_id)
+    db.query(models.RoomOccupancy).filter(
+        models.RoomOccupancy.room_id == room_id,
+        models.RoomOccupancy.date >= day
+    ).delete(synchronize_session=False)
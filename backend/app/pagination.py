@@ -0,0 +1,95 @@
+"""Keyset pagination for the list endpoints.
+
+Lists are ordered by indexed columns ending with the primary key, e.g.
+(start_time, id) for bookings. A page continues right after the last row
+of the previous one (WHERE (start_time, id) > (:start_time, :id)) instead
+of skipping rows with OFFSET, so deep pages cost the same as the first one
+and rows inserted meanwhile do not shift or repeat rows across pages.
+
+Clients get an opaque cursor (the key of the last row of the page) in the
+X-Next-Cursor response header and send it back as `cursor`. skip/limit
+still work, ordered the same way, but are deprecated.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this listing"""
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _key_value(column, value):
+    """`value` as the Python type of `column`, or ValueError when it is not
+    one"""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError()
+        return datetime.fromisoformat(value)
+    # bool is an int to isinstance, but never a valid id
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise ValueError()
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """Key values of `cursor`, checked against the types of `columns`"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError()
+        return [_key_value(column, value) for column, value in zip(columns, payload)]
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def paginate(query, columns: Sequence, cursor: Optional[str] = None, skip: int = 0,
+             limit: int = 100) -> Page:
+    """Run a legacy Query ordered by `columns`, from `cursor` (or the
+    deprecated `skip`), returning at most `limit` rows"""
+    query = query.order_by(*columns)
+    if cursor:
+        query = query.filter(after(columns, cursor))
+    elif skip:
+        query = query.offset(skip)
+    return page(query.limit(limit + 1).all(), columns, limit)
+
+
+def after(columns: Sequence, cursor: str):
+    """Criterion for the rows following `cursor` in `columns` order"""
+    return tuple_(*columns) > tuple_(*decode_cursor(cursor, columns))
+
+
+def page(rows: List[Any], columns: Sequence, limit: int) -> Page:
+    """A page out of up to `limit` + 1 fetched rows; the extra row only tells
+    that there is a next page"""
+    if len(rows) <= limit or limit <= 0:
+        return Page(rows[:max(limit, 0)])
+    items = rows[:limit]
+    last = items[-1]
+    return Page(items, encode_cursor([getattr(last, column.key) for column in columns]))
+
+
+def send_page(response: Response, result: Page) -> List[Any]:
+    """Put the next cursor of a page in the response headers and return its
+    items as the body"""
+    if result.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = result.next_cursor
+    return result.items
@@ -0,0 +1,226 @@
+"""Lazy expansion of recurring classes.
+
+A recurring class is stored once: its row holds the first occurrence and
+`recurrence_pattern` holds the rule. Patterns are either a keyword (daily,
+weekly, biweekly, monthly) or an RRULE subset such as
+"FREQ=WEEKLY;INTERVAL=2;COUNT=10" or "FREQ=MONTHLY;UNTIL=20301231".
+An empty pattern means weekly.
+
+Occurrences are only generated for the window being queried, and expanded
+windows are kept in a small LRU cache keyed by the class and its rule, so
+editing a class never serves stale occurrences.
+"""
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+from .config import settings
+
+Interval = Tuple[datetime, datetime]
+
+ALIASES = {
+    "daily": "FREQ=DAILY",
+    "weekly": "FREQ=WEEKLY",
+    "biweekly": "FREQ=WEEKLY;INTERVAL=2",
+    "monthly": "FREQ=MONTHLY",
+}
+FREQUENCIES = {"DAILY", "WEEKLY", "MONTHLY"}
+# How far ahead an open-ended series is checked for conflicts on write
+CHECK_HORIZON = timedelta(days=365)
+# Bounds of COUNT and UNTIL; a series meant to go on forever omits both
+MAX_COUNT = 10000
+MAX_UNTIL = datetime(2100, 1, 1)
+
+
+class Rule(NamedTuple):
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+
+def parse_rule(pattern: Optional[str]) -> Rule:
+    """Parse a recurrence pattern, raising ValueError when it is invalid"""
+    pattern = (pattern or "weekly").strip()
+    pattern = ALIASES.get(pattern.lower(), pattern)
+    if pattern.upper().startswith("RRULE:"):
+        pattern = pattern[len("RRULE:"):]
+
+    parts = {}
+    for part in filter(None, pattern.split(";")):
+        key, _, value = part.partition("=")
+        parts[key.strip().upper()] = value.strip()
+
+    unknown = set(parts) - {"FREQ", "INTERVAL", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"Unsupported recurrence fields: {', '.join(sorted(unknown))}")
+    freq = parts.get("FREQ", "").upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence frequency: {freq or pattern!r}")
+
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        until = None
+        if "UNTIL" in parts:
+            value = parts["UNTIL"].rstrip("Z")
+            until = datetime.strptime(value, "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+            if "T" not in value:
+                until += timedelta(days=1) - timedelta(microseconds=1)
+    except ValueError:
+        raise ValueError(f"Invalid recurrence pattern: {pattern!r}")
+    if interval < 1 or (count is not None and not 1 <= count <= MAX_COUNT):
+        raise ValueError(f"Invalid recurrence pattern: {pattern!r}")
+    if until is not None and until >= MAX_UNTIL:
+        raise ValueError(f"Recurrence UNTIL must be before {MAX_UNTIL.year}: {pattern!r}")
+    return Rule(freq, interval, count, until)
+
+
+def _add_months(value: datetime, months: int) -> Optional[datetime]:
+    """`value` moved by whole months, or None when the day does not exist in
+    that month (like RRULE, the 31st skips shorter months)"""
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    if value.day > calendar.monthrange(year, month + 1)[1]:
+        return None
+    return value.replace(year=year, month=month + 1)
+
+
+def _step(rule: Rule) -> timedelta:
+    """Distance between occurrences of a daily or weekly series"""
+    return timedelta(days=rule.interval) if rule.freq == "DAILY" else timedelta(weeks=rule.interval)
+
+
+def occurrences(start_time: datetime, end_time: datetime, rule: Rule,
+                window_start: datetime, window_end: datetime) -> List[Interval]:
+    """Occurrences of a series overlapping [window_start, window_end)"""
+    duration = end_time - start_time
+    found: List[Interval] = []
+
+    if rule.freq == "MONTHLY":
+        if rule.count is not None and start_time.day > 28:
+            # Skipped months do not count, so walk from the first occurrence
+            index = 0
+        else:
+            months = (window_start.year - start_time.year) * 12 + window_start.month - start_time.month
+            index = max(0, (months - 1) // rule.interval)
+        produced = index
+        misses = 0
+        while misses < 48:
+            occurrence = _add_months(start_time, index * rule.interval)
+            index += 1
+            if occurrence is None:
+                # Only the 29th-31st get skipped, and never for four years
+                misses += 1
+                continue
+            misses = 0
+            if occurrence >= window_end or (rule.until and occurrence > rule.until):
+                break
+            if rule.count is not None and produced >= rule.count:
+                break
+            produced += 1
+            if occurrence + duration > window_start:
+                found.append((occurrence, occurrence + duration))
+        return found
+
+    step = _step(rule)
+    index = max(0, (window_start - end_time) // step)
+    while True:
+        occurrence = start_time + index * step
+        if occurrence >= window_end or (rule.until and occurrence > rule.until):
+            break
+        if rule.count is not None and index >= rule.count:
+            break
+        if occurrence + duration > window_start:
+            found.append((occurrence, occurrence + duration))
+        index += 1
+    return found
+
+
+def series_end(start_time: datetime, end_time: datetime, pattern: Optional[str]) -> Optional[datetime]:
+    """End of the last occurrence of a series, or None when it never ends.
+
+    The position of the last occurrence is worked out from COUNT and UNTIL
+    rather than by walking the series, except for monthly series on the
+    29th-31st, whose skipped months make it irregular (COUNT and UNTIL
+    bound that walk).
+    """
+    rule = parse_rule(pattern)
+    if rule.count is None and rule.until is None:
+        return None
+    duration = end_time - start_time
+
+    if rule.freq == "MONTHLY" and start_time.day > 28:
+        window_end = rule.until + timedelta(microseconds=1) if rule.until else datetime.max
+        found = occurrences(start_time, end_time, rule, start_time, window_end)
+        return found[-1][1] if found else end_time
+
+    # Index of the last occurrence
+    last = rule.count - 1 if rule.count is not None else None
+    if rule.until is not None:
+        if rule.freq == "MONTHLY":
+            months = (rule.until.year - start_time.year) * 12 + rule.until.month - start_time.month
+            index = months // rule.interval
+            if index >= 0 and _add_months(start_time, index * rule.interval) > rule.until:
+                index -= 1
+        else:
+            index = (rule.until - start_time) // _step(rule)
+        last = index if last is None else min(last, index)
+    if last < 0:
+        return end_time
+    if rule.freq == "MONTHLY":
+        return _add_months(start_time, last * rule.interval) + duration
+    return start_time + last * _step(rule) + duration
+
+
+class ExpansionCache:
+    """LRU cache of the occurrences of a class inside a window"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, List[Interval]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def expand(self, class_id: int, start_time: datetime, end_time: datetime,
+               pattern: Optional[str], window_start: datetime,
+               window_end: datetime) -> List[Interval]:
+        # The rule and first occurrence are part of the key, so an edited
+        # class simply stops matching its old entries
+        key = (class_id, start_time, end_time, pattern, window_start, window_end)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+
+        expanded = occurrences(start_time, end_time, parse_rule(pattern), window_start, window_end)
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = expanded
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return list(expanded)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+expansion_cache = ExpansionCache(max_entries=settings.recurrence_cache_size)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime
 
-from ..database import get_db
-from ..auth import get_admin_user
+from ..database import (
+    get_db, pool_stats, read_router, replica_engine, engine,
+    async_engine, async_replica_engine
+)
+from ..auth import get_admin_user, user_cache
 from ..models import User
 from ..schemas import (
     User as UserSchema, 
@@ -12,7 +16,12 @@ from ..schemas import (
     Room, 
     RoomCreate, 
     RoomUpdate,
-    BookingAdmin
+    BookingAdmin,
+    RoomUtilization,
+    BusinessHours,
+    BusinessHoursBase,
+    CalendarBlackout,
+    CalendarBlackoutCreate
 )
 from ..crud import (
     get_users, 
@@ -22,22 +31,41 @@ from ..crud import (
     create_room,
     update_room,
     get_bookings,
-    delete_room
+    delete_room,
+    get_utilization,
+    get_business_hours,
+    replace_business_hours,
+    get_blackouts,
+    get_blackout_by_date,
+    create_blackout,
+    delete_blackout
 )
+from ..models import time_to_minutes
+from ..cache import availability_cache
+from ..pagination import send_page
+from ..write_queue import room_writes
+from .. import scheduler
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Longest range accepted by the utilization heatmap
+MAX_UTILIZATION_DAYS = 90
+# Most rooms in one heatmap; each room and day is a 1440-minute row in memory
+MAX_UTILIZATION_ROOMS = 50
+
 # User management
 @router.get("/users", response_model=List[UserAdmin])
 def read_all_users(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, deprecated=True, description="Use cursor instead"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Get all users (admin only)"""
-    users = get_users(db, skip=skip, limit=limit)
-    return users
+    users = get_users(db, skip=skip, limit=limit, cursor=cursor)
+    return send_page(response, users)
 
 @router.get("/users/{user_id}", response_model=UserAdmin)
 def read_user(
@@ -113,11 +141,155 @@ def delete_room_admin(
 # Booking management
 @router.get("/bookings", response_model=List[BookingAdmin])
 def read_all_bookings(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, deprecated=True, description="Use cursor instead"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Get all bookings with user details (admin only)"""
-    bookings = get_bookings(db, skip=skip, limit=limit)
-    return bookings
+    bookings = get_bookings(db, skip=skip, limit=limit, cursor=cursor)
+    return send_page(response, bookings)
+
+# Business calendar
+@router.get("/business-hours", response_model=List[BusinessHours])
+def read_business_hours(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get the weekly opening hours; empty means the built-in defaults (admin only)"""
+    return get_business_hours(db)
+
+@router.put("/business-hours", response_model=List[BusinessHours])
+def update_business_hours(
+    hours: List[BusinessHoursBase],
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Replace the weekly opening hours (admin only)"""
+    for window in hours:
+        if time_to_minutes(window.close_time) <= time_to_minutes(window.open_time):
+            raise HTTPException(
+                status_code=400,
+                detail="Horário de fechamento deve ser posterior ao de abertura"
+            )
+    
+    windows = sorted(
+        (window.weekday, time_to_minutes(window.open_time), time_to_minutes(window.close_time))
+        for window in hours
+    )
+    for (weekday, _, close), (next_weekday, next_open, _) in zip(windows, windows[1:]):
+        if weekday == next_weekday and next_open < close:
+            raise HTTPException(
+                status_code=400,
+                detail="Os horários de um mesmo dia não podem se sobrepor"
+            )
+    return replace_business_hours(db, hours)
+
+@router.get("/blackouts", response_model=List[CalendarBlackout])
+def read_blackouts(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get the dates the school is closed (admin only)"""
+    return get_blackouts(db)
+
+@router.post("/blackouts", response_model=CalendarBlackout)
+def create_blackout_admin(
+    blackout: CalendarBlackoutCreate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Close the school on a date (admin only)"""
+    if get_blackout_by_date(db, blackout.date):
+        raise HTTPException(status_code=400, detail="Data já está bloqueada")
+    return create_blackout(db, blackout)
+
+@router.delete("/blackouts/{blackout_id}")
+def delete_blackout_admin(
+    blackout_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Reopen a blocked date (admin only)"""
+    if not delete_blackout(db, blackout_id):
+        raise HTTPException(status_code=404, detail="Blackout not found")
+    return {"message": "Blackout deleted successfully"}
+
+# Planning
+@router.get("/utilization", response_model=List[RoomUtilization])
+def read_utilization(
+    start_date: date = Query(..., description="First date of the range (YYYY-MM-DD)"),
+    days: int = Query(30, ge=1, le=MAX_UTILIZATION_DAYS, description="Number of days"),
+    room_ids: Optional[List[int]] = Query(None, description="Rooms to include (defaults to all active rooms)"),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get free/occupied minutes per room and day, for heatmaps (admin only)"""
+    if room_ids is None:
+        # One more than the cap, so going past it is an error, not a cut
+        room_ids = [room.id for room in get_rooms(db, limit=MAX_UTILIZATION_ROOMS + 1)]
+    else:
+        room_ids = list(dict.fromkeys(room_ids))
+    if len(room_ids) > MAX_UTILIZATION_ROOMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O máximo é de {MAX_UTILIZATION_ROOMS} salas por consulta; informe room_ids"
+        )
+    return get_utilization(
+        db,
+        room_ids=room_ids,
+        start_date=datetime.combine(start_date, datetime.min.time()),
+        days=days
+    )
+
+# Instrumentation
+@router.get("/metrics/availability-cache")
+def read_availability_cache_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get availability cache hit/miss/eviction counters (admin only)"""
+    return availability_cache.stats()
+
+@router.get("/metrics/user-cache")
+def read_user_cache_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get authenticated user cache hit/miss/eviction counters (admin only)"""
+    return user_cache.stats()
+
+@router.get("/metrics/write-queue")
+def read_write_queue_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get per-room write queue depth, batch and wait-time metrics (admin only)"""
+    return room_writes.stats()
+
+@router.get("/metrics/pool")
+def read_pool_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get connection pool usage and checkout latency of the sync and async
+    engines (admin only)"""
+    stats = pool_stats()
+    stats["async_pool"] = pool_stats(async_engine)
+    return stats
+
+@router.get("/metrics/read-routing")
+def read_read_routing_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get how many reads went to the replica vs the primary (admin only)"""
+    stats = read_router.stats()
+    if replica_engine is not engine:
+        stats["replica_pool"] = pool_stats(replica_engine)
+        stats["async_replica_pool"] = pool_stats(async_replica_engine)
+    return stats
+
+@router.get("/metrics/jobs")
+def read_job_metrics(
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get runs, failures and the last report of the scheduled jobs (admin only)"""
+    return {name: job.stats() for name, job in scheduler.jobs.items()}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from datetime import timedelta
 from typing import List
 
@@ -65,7 +65,7 @@ def get_my_classes(
     students = db.query(Student).filter(
         Student.email == current_user.email,
         Student.is_active.is_(True)
-    ).all()
+    ).options(joinedload(Student.room)).all()
     
     if not students:
         # If no direct email match, return empty list
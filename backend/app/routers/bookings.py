@@ -1,33 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, date, timedelta
 
-from ..database import get_db
-from ..auth import get_current_active_user
+from ..database import get_async_read_db, get_db, get_read_db
+from ..auth import get_current_active_user, get_current_active_user_async
+from .. import async_crud
+from ..business_hours import business_calendar
+from ..pagination import send_page
 from ..models import User
-from ..schemas import Booking, BookingCreate, BookingUpdate, BookingWithDetails, TimeSlot
+from ..schemas import (
+    Booking, BookingCreate, BookingUpdate, BookingWithDetails, TimeSlot, RoomAvailability,
+    BookingSeriesCreate, BookingSeriesResult
+)
 from ..crud import (
-    get_user_bookings,
     create_booking,
+    create_booking_series,
     update_booking,
     delete_booking,
     get_booking,
-    get_available_slots_with_classes
+    find_next_available_slots
 )
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
+# Longest date range accepted by the batch availability endpoint
+MAX_AVAILABILITY_DAYS = 62
+# Most rooms a single availability or search request may ask for
+MAX_REQUEST_ROOMS = 50
+# Longest slot the availability endpoints build
+MAX_DURATION_MINUTES = 24 * 60
+# Limits of the next-available search
+MAX_SEARCH_HORIZON_DAYS = 90
+MAX_SEARCH_RESULTS = 50
+# Longest booking series (a year of weekly bookings)
+MAX_SERIES_OCCURRENCES = 52
+
+def _check_room_count(room_ids: List[int]):
+    if len(room_ids) > MAX_REQUEST_ROOMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O máximo é de {MAX_REQUEST_ROOMS} salas por consulta"
+        )
+
 @router.get("/my-bookings", response_model=List[BookingWithDetails])
-def read_my_bookings(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def read_my_bookings(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, deprecated=True, description="Use cursor instead"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """Get current user's bookings"""
-    bookings = get_user_bookings(db, user_id=current_user.id, skip=skip, limit=limit)
-    return bookings
+    bookings = await async_crud.get_user_bookings(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+    )
+    return send_page(response, bookings)
 
 @router.post("/", response_model=Booking)
 def create_booking_endpoint(
@@ -50,6 +80,13 @@ def create_booking_endpoint(
             detail="Não é possível agendar horários no passado"
         )
     
+    business_calendar.ensure_loaded(db)
+    if not business_calendar.is_open(booking.start_time, booking.end_time):
+        raise HTTPException(
+            status_code=400,
+            detail="Horário fora do expediente da escola"
+        )
+    
     db_booking = create_booking(db=db, booking=booking, user_id=current_user.id)
     if db_booking is None:
         raise HTTPException(
@@ -58,6 +95,50 @@ def create_booking_endpoint(
         )
     return db_booking
 
+@router.post("/series", response_model=BookingSeriesResult)
+def create_booking_series_endpoint(
+    series: BookingSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Book the same slot every `interval_weeks` weeks.
+
+    Free occurrences are booked together; the ones that collide with
+    existing bookings, classes or students, fall outside business hours or
+    are already in the past are reported instead.
+    """
+    if series.start_time >= series.end_time:
+        raise HTTPException(
+            status_code=400,
+            detail="End time must be after start time"
+        )
+    if series.end_time - series.start_time >= timedelta(weeks=series.interval_weeks):
+        raise HTTPException(
+            status_code=400,
+            detail="As ocorrências da série não podem se sobrepor"
+        )
+    if series.occurrences > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O máximo é de {MAX_SERIES_OCCURRENCES} ocorrências por série"
+        )
+    
+    current_time_with_buffer = datetime.now() + timedelta(minutes=15)
+    business_calendar.ensure_loaded(db)
+    duration = series.end_time - series.start_time
+    skipped = {}
+    for n in range(series.occurrences):
+        start_time = series.start_time + timedelta(weeks=n * series.interval_weeks)
+        if start_time < current_time_with_buffer:
+            skipped[start_time] = "past"
+        elif not business_calendar.is_open(start_time, start_time + duration):
+            skipped[start_time] = "closed"
+    
+    created, collisions = create_booking_series(
+        db=db, series=series, user_id=current_user.id, skipped=skipped
+    )
+    return BookingSeriesResult(created=created, collisions=collisions)
+
 @router.put("/{booking_id}", response_model=Booking)
 def update_booking_endpoint(
     booking_id: int,
@@ -76,7 +157,23 @@ def update_booking_endpoint(
             detail="Not enough permissions"
         )
     
+    if booking_update.start_time is not None or booking_update.end_time is not None:
+        business_calendar.ensure_loaded(db)
+        if not business_calendar.is_open(
+            booking_update.start_time or db_booking.start_time,
+            booking_update.end_time or db_booking.end_time
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="Horário fora do expediente da escola"
+            )
+    
     updated_booking = update_booking(db=db, booking_id=booking_id, booking_update=booking_update)
+    if updated_booking is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Time slot is already booked"
+        )
     return updated_booking
 
 @router.delete("/{booking_id}")
@@ -103,14 +200,91 @@ def cancel_booking(
         raise HTTPException(status_code=404, detail="Booking not found")
 
 @router.get("/available-slots", response_model=List[TimeSlot])
-def get_available_time_slots(
+async def get_available_time_slots(
     room_id: int,
     date: date = Query(..., description="Date to check availability (YYYY-MM-DD)"),
-    duration: int = Query(60, description="Duration in minutes"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    duration: int = Query(60, gt=0, le=MAX_DURATION_MINUTES, description="Duration in minutes"),
+    step: Optional[int] = Query(None, gt=0, description="Minutes between slot starts (defaults to the duration)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """Get available time slots for a specific room and date"""
     date_datetime = datetime.combine(date, datetime.min.time())
-    slots = get_available_slots_with_classes(db, room_id=room_id, date=date_datetime, duration_minutes=duration)
+    slots = await async_crud.get_available_slots_with_classes(
+        db, room_id=room_id, date=date_datetime, duration_minutes=duration, step_minutes=step
+    )
+    if slots is None:
+        raise HTTPException(status_code=404, detail="Room not found")
     return slots
+
+@router.get("/availability", response_model=List[RoomAvailability])
+async def get_rooms_availability(
+    start_date: date = Query(..., description="First date of the range (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Last date of the range (YYYY-MM-DD)"),
+    room_ids: Optional[List[int]] = Query(None, description="Rooms to check (defaults to all active rooms)"),
+    duration: int = Query(60, gt=0, le=MAX_DURATION_MINUTES, description="Duration in minutes"),
+    step: Optional[int] = Query(None, gt=0, description="Minutes between slot starts (defaults to the duration)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Get available time slots for several rooms over a date range"""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=400,
+            detail="A data final deve ser igual ou posterior à data inicial"
+        )
+    if (end_date - start_date).days + 1 > MAX_AVAILABILITY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O intervalo máximo é de {MAX_AVAILABILITY_DAYS} dias"
+        )
+    
+    if room_ids is None:
+        # One more than the cap, so a school past it gets an error instead
+        # of a silently truncated answer
+        rooms = await async_crud.get_rooms(db, limit=MAX_REQUEST_ROOMS + 1)
+        if len(rooms) > MAX_REQUEST_ROOMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Há mais de {MAX_REQUEST_ROOMS} salas ativas; informe room_ids"
+            )
+        room_ids = [room.id for room in rooms]
+    else:
+        room_ids = list(dict.fromkeys(room_ids))
+        _check_room_count(room_ids)
+    
+    availability = await async_crud.get_availability_for_rooms(
+        db,
+        room_ids=room_ids,
+        start_date=datetime.combine(start_date, datetime.min.time()),
+        end_date=datetime.combine(end_date, datetime.min.time()),
+        duration_minutes=duration,
+        step_minutes=step
+    )
+    if {day.room_id for day in availability} != set(room_ids):
+        raise HTTPException(status_code=404, detail="Room not found")
+    return availability
+
+@router.get("/next-available", response_model=List[TimeSlot])
+def get_next_available_slots(
+    duration: int = Query(60, gt=0, le=MAX_DURATION_MINUTES, description="Duration in minutes"),
+    room_ids: Optional[List[int]] = Query(None, description="Rooms to search (defaults to all active rooms)"),
+    horizon_days: int = Query(14, gt=0, le=MAX_SEARCH_HORIZON_DAYS, description="How many days ahead to search"),
+    limit: int = Query(5, gt=0, le=MAX_SEARCH_RESULTS, description="Number of slots to return"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Find the earliest free slots across rooms and days"""
+    # Same buffer as booking creation: nothing starting in the next 15 minutes
+    not_before = datetime.now() + timedelta(minutes=15)
+    if room_ids is not None:
+        room_ids = list(dict.fromkeys(room_ids))
+        _check_room_count(room_ids)
+    return find_next_available_slots(
+        db,
+        duration_minutes=duration,
+        not_before=not_before,
+        horizon_days=horizon_days,
+        room_ids=room_ids,
+        limit=limit
+    )
@@ -1,25 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
-from ..auth import get_current_active_user, get_admin_user
-from .. import crud, schemas, models
+from ..database import get_async_read_db, get_db
+from ..auth import get_current_active_user_async, get_admin_user
+from .. import async_crud, crud, schemas, models, recurrence
+from ..pagination import send_page
 
 router = APIRouter(prefix="/classes", tags=["classes"])
 
 
+def _check_recurrence(is_recurring: bool, pattern: str):
+    if not is_recurring:
+        return
+    try:
+        recurrence.parse_rule(pattern)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Padrão de recorrência inválido"
+        )
+
+
 @router.get("/", response_model=List[schemas.ClassWithDetails])
 def get_classes(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, deprecated=True, description="Use cursor instead"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_admin_user)
 ):
     """Get all classes (admin only)"""
-    classes = crud.get_classes(db, skip=skip, limit=limit)
-    return classes
+    classes = crud.get_classes(db, skip=skip, limit=limit, cursor=cursor)
+    return send_page(response, classes)
 
 
 @router.get("/{class_id}", response_model=schemas.ClassWithDetails)
@@ -60,6 +76,8 @@ def create_class(
             detail="Horário de término deve ser posterior ao horário de início"
         )
     
+    _check_recurrence(class_data.is_recurring, class_data.recurrence_pattern)
+    
     # Create the class
     db_class = crud.create_class(db=db, class_data=class_data)
     if db_class is None:
@@ -86,7 +104,18 @@ def update_class(
             detail="Aula não encontrada"
         )
     
+    changes = class_update.dict(exclude_unset=True)
+    _check_recurrence(
+        changes.get("is_recurring", db_class.is_recurring),
+        changes.get("recurrence_pattern", db_class.recurrence_pattern)
+    )
+    
     updated_class = crud.update_class(db=db, class_id=class_id, class_update=class_update)
+    if updated_class is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Conflito de horário: já existe uma aula ou agendamento neste período"
+        )
     return updated_class
 
 
@@ -115,22 +144,22 @@ def delete_class(
 
 
 @router.get("/room/{room_id}", response_model=List[schemas.Class])
-def get_classes_by_room(
+async def get_classes_by_room(
     room_id: int,
     start_date: datetime = None,
     end_date: datetime = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_active_user_async)
 ):
     """Get classes for a specific room"""
-    room = crud.get_room(db, room_id=room_id)
+    room = await async_crud.get_room(db, room_id=room_id)
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sala não encontrada"
         )
     
-    classes = crud.get_classes_by_room(
+    classes = await async_crud.get_classes_by_room(
         db, room_id=room_id, start_date=start_date, end_date=end_date
     )
     return classes
@@ -1,22 +1,26 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import crud, models, schemas, auth
 from ..database import get_db
+from ..pagination import send_page
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[schemas.StudentWithDetails])
 def read_students(
-    skip: int = 0,
-    limit: int = 100,    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, deprecated=True, description="Use cursor instead"),
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_admin_user)
 ):
     """Get all students (admin only)"""
-    students = crud.get_students(db, skip=skip, limit=limit)
-    return students
+    students = crud.get_students(db, skip=skip, limit=limit, cursor=cursor)
+    return send_page(response, students)
 
 
 @router.post("/", response_model=schemas.Student)
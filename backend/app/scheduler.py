@@ -0,0 +1,81 @@
+"""Periodic maintenance jobs run inside the app's lifespan.
+
+Each job is a blocking function returning a small report dict; it runs in
+a worker thread every `interval_seconds`, so it never blocks the event
+loop. The first run happens one interval after startup, keeping cold
+starts fast. With several worker processes every worker runs its own
+copy, so the jobs must be safe to run concurrently.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval_seconds: float, run: Callable[[], dict]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.run = run
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_report: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.run_once()
+
+    async def run_once(self):
+        self.last_run_at = datetime.now()
+        started = time.perf_counter()
+        try:
+            report = await asyncio.to_thread(self.run)
+        except Exception:
+            self.failures += 1
+            logger.exception("Scheduled job %s failed", self.name)
+            return
+        self.runs += 1
+        self.last_report = report
+        logger.info("Scheduled job %s: %s (%.2fs)", self.name, report, time.perf_counter() - started)
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "running": self._task is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at,
+            "last_report": self.last_report,
+        }
+
+
+# Jobs started by the current process
+jobs: Dict[str, PeriodicJob] = {}
+
+
+def start(job: PeriodicJob):
+    jobs[job.name] = job
+    job.start()
+
+
+async def stop_all():
+    for job in jobs.values():
+        await job.stop()
@@ -0,0 +1,44 @@
+"""Schema revision check.
+
+The schema is owned by the Alembic migrations, applied once per deploy
+with `alembic upgrade head`. Worker processes never issue DDL: at startup
+they only compare the database's revision with the head of the migration
+scripts, a single-row query.
+"""
+import os
+from typing import Optional
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection, Engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the revision this code expects"""
+
+
+def head_revision() -> str:
+    """Latest revision of the migration scripts"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """Revision stamped in the database, None when it was never migrated"""
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def check_schema_revision(engine: Engine):
+    """Raise SchemaOutOfDate unless the database is at the head revision"""
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    head = head_revision()
+    if current != head:
+        raise SchemaOutOfDate(
+            f"Database schema is at revision {current or 'none'}, expected {head}; "
+            "run `alembic upgrade head`"
+        )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List
 
 # User Schemas
@@ -104,6 +104,44 @@ class TimeSlot(BaseModel):
     is_available: bool
     room_id: int
 
+class Conflict(BaseModel):
+    kind: str  # booking, class or student
+    id: int
+    start_time: datetime
+    end_time: datetime
+
+# Booking series Schemas
+class BookingSeriesCreate(BookingBase):
+    """First occurrence plus how often and how many times it repeats"""
+    interval_weeks: int = Field(1, ge=1)
+    occurrences: int = Field(..., ge=1)
+
+class SeriesCollision(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    reason: str  # conflict, closed or past
+    blocking: List[Conflict] = []
+
+class BookingSeriesResult(BaseModel):
+    created: List[Booking]
+    collisions: List[SeriesCollision]
+
+class RoomAvailability(BaseModel):
+    room_id: int
+    date: date
+    slots: List[TimeSlot]
+
+class UtilizationDay(BaseModel):
+    date: date
+    open_minutes: int
+    occupied_minutes: int
+    free_minutes: int
+    utilization: float
+
+class RoomUtilization(BaseModel):
+    room_id: int
+    days: List[UtilizationDay]
+
 # Class Schemas
 class ClassBase(BaseModel):
     room_id: int
@@ -187,3 +225,34 @@ class Student(StudentBase):
 
 class StudentWithDetails(Student):
     room: Room
+
+
+# Business Calendar Schemas
+class BusinessHoursBase(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)  # 0=Mon, 1=Tue, ..., 6=Sun
+    open_time: str = Field(..., pattern=r"^([01]?[0-9]|2[0-3]):[0-5][0-9]$")
+    # 24:00 closes at midnight; no other time past 23:59 is valid
+    close_time: str = Field(..., pattern=r"^(([01]?[0-9]|2[0-3]):[0-5][0-9]|24:00)$")
+
+
+class BusinessHours(BusinessHoursBase):
+    id: int
+    
+    class Config:
+        from_attributes = True
+
+
+class CalendarBlackoutBase(BaseModel):
+    date: date
+    reason: Optional[str] = None
+
+
+class CalendarBlackoutCreate(CalendarBlackoutBase):
+    pass
+
+
+class CalendarBlackout(CalendarBlackoutBase):
+    id: int
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,142 @@
+"""Status sweep of bookings and classes that already ended.
+
+Confirmed bookings and scheduled classes whose end_time has passed are
+marked "completed" with chunked UPDATEs of `status_sweep_batch_size` rows,
+one short transaction per chunk, so conflict checks and availability (which
+only look at confirmed/scheduled rows) stop scanning years of history.
+Recurring classes are only completed once their series has ended (COUNT or
+UNTIL); open-ended series stay scheduled.
+
+Only rows that ended before the sweep are touched, so nothing bookable
+changes and the availability caches are left alone. Utilization reports
+count completed rows, and the archive job later moves them out of the hot
+tables.
+
+Run it with `python -m app.sweeper`, or periodically from the app through
+STATUS_SWEEP_INTERVAL_MINUTES.
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .database import SessionLocal
+from .recurrence import series_end
+from .scheduler import PeriodicJob
+
+COMPLETED = "completed"
+
+
+def _complete(db: Session, model, status: str, ids: List[int]) -> int:
+    """Mark the rows of `ids` still in `status` as completed, committing"""
+    result = db.execute(
+        update(model.__table__)
+        .where(model.__table__.c.id.in_(ids), model.__table__.c.status == status)
+        .values(status=COMPLETED)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def sweep_rows(db: Session, model, status: str, now: datetime, batch_size: int,
+               max_batches: Optional[int] = None) -> int:
+    """Complete the non-recurring rows of `model` in `status` that ended
+    before `now`, one chunk per transaction. Returns the rows updated."""
+    table = model.__table__
+    ended = [table.c.status == status, table.c.end_time < now]
+    if "is_recurring" in table.c:
+        ended.append(table.c.is_recurring.isnot(True))
+    updated = batches = last_id = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.execute(
+            select(table.c.id).where(*ended, table.c.id > last_id)
+            .order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        updated += _complete(db, model, status, ids)
+        last_id = ids[-1]
+        batches += 1
+    return updated
+
+
+def sweep_series(db: Session, now: datetime, batch_size: int) -> int:
+    """Complete the scheduled recurring classes whose last occurrence ended
+    before `now`"""
+    rows = db.execute(
+        select(
+            models.Class.id, models.Class.start_time, models.Class.end_time,
+            models.Class.recurrence_pattern
+        ).where(
+            models.Class.status == "scheduled",
+            models.Class.is_recurring.is_(True),
+            models.Class.end_time < now,
+        )
+    ).all()
+    ended = []
+    for row in rows:
+        try:
+            last_end = series_end(row.start_time, row.end_time, row.recurrence_pattern)
+        except (ValueError, OverflowError):
+            # Rules this version rejects, stored by an older one
+            continue
+        if last_end is not None and last_end < now:
+            ended.append(row.id)
+    return sum(
+        _complete(db, models.Class, "scheduled", ended[n:n + batch_size])
+        for n in range(0, len(ended), batch_size)
+    )
+
+
+def run_sweep(db: Session, batch_size: Optional[int] = None,
+              max_batches: Optional[int] = None, now: Optional[datetime] = None) -> dict:
+    """Complete ended bookings and classes, returning how many rows were
+    updated and how long it took"""
+    batch_size = batch_size or settings.status_sweep_batch_size
+    now = now or datetime.now()
+    started = time.perf_counter()
+    bookings = sweep_rows(db, models.Booking, "confirmed", now, batch_size, max_batches)
+    classes = sweep_rows(db, models.Class, "scheduled", now, batch_size, max_batches)
+    classes += sweep_series(db, now, batch_size)
+    return {
+        "cutoff": now.isoformat(),
+        "bookings": bookings,
+        "classes": classes,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def scheduled_job() -> Optional[PeriodicJob]:
+    """The periodic sweep, or None when it is not enabled"""
+    if settings.status_sweep_interval_minutes <= 0:
+        return None
+
+    def run():
+        with SessionLocal() as db:
+            return run_sweep(db)
+
+    return PeriodicJob("status_sweep", settings.status_sweep_interval_minutes * 60, run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mark bookings and classes that already ended as completed"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.status_sweep_batch_size)
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop after this many batches per table")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        report = run_sweep(db, args.batch_size, args.max_batches)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Vectorized room utilization over a range of days.
+
+Every room/day is laid out on a single minute axis (day d, minute m is
+offset d * 1440 + m). Occupied intervals and opening windows are turned
+into +1/-1 steps at their start/end offsets, and a cumulative sum gives the
+minute-by-minute occupancy of all rooms at once, without any per-day
+Python loop.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _coverage(rows: int, length: int, row_index: np.ndarray, starts: np.ndarray,
+              ends: np.ndarray) -> np.ndarray:
+    """Boolean (rows, length) grid, True where any [start, end) covers it"""
+    steps = np.zeros((rows, length + 1), dtype=np.int32)
+    starts = np.clip(starts, 0, length)
+    ends = np.clip(ends, 0, length)
+    keep = ends > starts
+    np.add.at(steps, (row_index[keep], starts[keep]), 1)
+    np.add.at(steps, (row_index[keep], ends[keep]), -1)
+    return np.cumsum(steps[:, :length], axis=1) > 0
+
+
+def minute_totals(
+    room_count: int,
+    day_count: int,
+    open_windows: Sequence[Tuple[int, int]],
+    room_index: Sequence[int],
+    starts: Sequence[int],
+    ends: Sequence[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Count open and occupied-while-open minutes per day and per room/day.
+
+    `open_windows` are (start, end) minute offsets of the opening hours,
+    shared by all rooms; `room_index`/`starts`/`ends` describe the occupied
+    intervals, also as minute offsets from the first day's midnight.
+
+    Returns `open_minutes` with shape (days,) and `occupied_minutes` with
+    shape (rooms, days).
+    """
+    length = day_count * MINUTES_PER_DAY
+
+    windows = np.asarray(open_windows, dtype=np.int64).reshape(-1, 2)
+    is_open = _coverage(
+        1, length, np.zeros(len(windows), dtype=np.int64), windows[:, 0], windows[:, 1]
+    )[0]
+
+    occupied = _coverage(
+        room_count,
+        length,
+        np.asarray(room_index, dtype=np.int64),
+        np.asarray(starts, dtype=np.int64),
+        np.asarray(ends, dtype=np.int64),
+    )
+    occupied &= is_open
+
+    open_minutes = is_open.reshape(day_count, MINUTES_PER_DAY).sum(axis=1)
+    occupied_minutes = occupied.reshape(room_count, day_count, MINUTES_PER_DAY).sum(axis=2)
+    return open_minutes, occupied_minutes
+
+
+def weekly_offsets(first_weekday: int, day_count: int, weekday: int,
+                   start_min: int, end_min: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets of a weekly slot on every matching day of the range"""
+    days = np.arange(day_count)
+    matching = days[(first_weekday + days) % 7 == weekday]
+    base = matching * MINUTES_PER_DAY
+    return base + start_min, base + end_min
+
+
+def minute_offsets(values: List, origin, round_up: bool = False) -> np.ndarray:
+    """Whole-minute offsets of datetimes from `origin`, rounded down (or up)"""
+    seconds = (
+        np.array(values, dtype="datetime64[s]") - np.datetime64(origin, "s")
+    ).astype(np.int64)
+    return -(-seconds // 60) if round_up else seconds // 60
+
+
+def occupied_offsets(room_ids: List[int], intervals: Dict, weekly: Dict, origin,
+                     day_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten occupancy.load_occupants output into (room_index, starts, ends)
+    minute offset arrays from `origin`"""
+    position = {room_id: index for index, room_id in enumerate(room_ids)}
+    room_index = [np.zeros(0, dtype=np.int64)]
+    starts = [np.zeros(0, dtype=np.int64)]
+    ends = [np.zeros(0, dtype=np.int64)]
+    for room_id, room_intervals in intervals.items():
+        room_index.append(np.full(len(room_intervals), position[room_id], dtype=np.int64))
+        starts.append(minute_offsets([start for start, _ in room_intervals], origin))
+        ends.append(minute_offsets([end for _, end in room_intervals], origin, round_up=True))
+    for (room_id, weekday), slots in weekly.items():
+        for start_min, end_min in slots:
+            slot_starts, slot_ends = weekly_offsets(
+                origin.weekday(), day_count, weekday, start_min, end_min
+            )
+            room_index.append(np.full(len(slot_starts), position[room_id], dtype=np.int64))
+            starts.append(slot_starts)
+            ends.append(slot_ends)
+    return np.concatenate(room_index), np.concatenate(starts), np.concatenate(ends)
@@ -0,0 +1,187 @@
+"""Per-room write coordination.
+
+Writes for one room go through that room's queue, so they never race each
+other inside a worker process, while rooms stay independent. The first
+writer to find a room idle becomes its leader: it takes the room's database
+write lock once, runs every write queued behind it (each in its own
+SAVEPOINT, so a rejected write does not undo the others) and commits them
+together. Writers that queued up meanwhile just wait for their result.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+Stage = Callable[[Session], Optional[Any]]
+Finish = Callable[[Session, Any], None]
+
+
+def lock_room(db: Session, room_id: int):
+    """Hold the room's write lock until the transaction ends, so a conflict
+    check and the insert that follows it cannot interleave with another
+    writer of the same room.
+
+    SQLite only has a database-wide write lock, taken up front with BEGIN
+    IMMEDIATE; other databases lock the room's row (SELECT ... FOR UPDATE),
+    so only writers of the same room wait for each other.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        connection = db.connection()
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        db.query(models.Room.id).filter(models.Room.id == room_id).with_for_update().first()
+
+
+class _Rejected(Exception):
+    """Raised inside a write's SAVEPOINT to roll it back"""
+
+
+class _Job:
+    __slots__ = ("stage", "finish", "enqueued_at", "wake", "lead", "finished", "result", "error")
+
+    def __init__(self, stage: Stage, finish: Optional[Finish]):
+        self.stage = stage
+        self.finish = finish
+        self.enqueued_at = time.monotonic()
+        # Set when the job is finished or its writer becomes the leader
+        self.wake = threading.Event()
+        self.lead = False
+        self.finished = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _Room:
+    __slots__ = ("pending", "busy", "max_depth", "writes", "batches", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.pending: Deque[_Job] = deque()
+        self.busy = False
+        self.max_depth = 0
+        self.writes = 0
+        self.batches = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class RoomWriteQueue:
+    def __init__(self, max_batch: int = 32):
+        self.max_batch = max_batch
+        self._rooms: Dict[int, _Room] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, db: Session, room_id: int, stage: Stage,
+               finish: Optional[Finish] = None):
+        """Run `stage` for a room and commit it, possibly batched with other
+        queued writes of the same room.
+
+        `stage` adds its changes to the session it is given without
+        committing and returns the written object, or None to reject the
+        write. `finish` runs after the commit for accepted writes. Returns
+        what `stage` returned, refreshed and detached from the session that
+        ran it.
+        """
+        job = _Job(stage, finish)
+        with self._lock:
+            room = self._rooms.setdefault(room_id, _Room())
+            room.pending.append(job)
+            room.max_depth = max(room.max_depth, len(room.pending))
+            job.lead = not room.busy
+            room.busy = True
+
+        if not job.lead:
+            job.wake.wait()
+        if not job.finished:
+            self._lead(db, room_id, room)
+
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _lead(self, db: Session, room_id: int, room: _Room):
+        """Run the room's queued writes as one batch, then hand the room over
+        to the next waiting writer"""
+        with self._lock:
+            batch = [room.pending.popleft() for _ in range(min(self.max_batch, len(room.pending)))]
+        started = time.monotonic()
+
+        try:
+            lock_room(db, room_id)
+            for job in batch:
+                try:
+                    with db.begin_nested():
+                        job.result = job.stage(db)
+                        if job.result is None:
+                            raise _Rejected()
+                except _Rejected:
+                    job.result = None
+                except Exception as error:
+                    job.result, job.error = None, error
+            db.commit()
+        except Exception as error:
+            db.rollback()
+            for job in batch:
+                if job.error is None:
+                    job.result, job.error = None, error
+
+        for job in batch:
+            if job.result is None:
+                continue
+            try:
+                db.refresh(job.result)
+                if job.finish is not None:
+                    job.finish(db, job.result)
+                db.expunge(job.result)
+            except Exception as error:
+                job.error = error
+
+        with self._lock:
+            room.batches += 1
+            for job in batch:
+                wait = started - job.enqueued_at
+                room.writes += 1
+                room.wait_total += wait
+                room.wait_max = max(room.wait_max, wait)
+            for job in batch:
+                job.finished = True
+                job.wake.set()
+            if room.pending:
+                room.pending[0].lead = True
+                room.pending[0].wake.set()
+            else:
+                room.busy = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            rooms = {
+                room_id: {
+                    "queue_depth": len(room.pending),
+                    "max_queue_depth": room.max_depth,
+                    "writes": room.writes,
+                    "batches": room.batches,
+                    "average_batch_size": room.writes / room.batches if room.batches else 0.0,
+                    "average_wait_ms": 1000 * room.wait_total / room.writes if room.writes else 0.0,
+                    "max_wait_ms": 1000 * room.wait_max,
+                }
+                for room_id, room in self._rooms.items()
+            }
+        return {
+            "max_batch": self.max_batch,
+            "queue_depth": sum(room["queue_depth"] for room in rooms.values()),
+            "rooms": rooms,
+        }
+
+    def reset(self):
+        """Forget the metrics of idle rooms"""
+        with self._lock:
+            for room_id in [room_id for room_id, room in self._rooms.items() if not room.busy]:
+                del self._rooms[room_id]
+
+
+room_writes = RoomWriteQueue(max_batch=settings.write_batch_size)
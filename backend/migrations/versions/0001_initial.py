@@ -0,0 +1,137 @@
+"""Initial schema
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+Databases created before migrations were introduced (by
+Base.metadata.create_all) already have these tables, so each one is only
+created when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('hashed_password', sa.String(), nullable=False),
+            sa.Column('full_name', sa.String(), nullable=False),
+            sa.Column('phone', sa.String(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    if 'rooms' not in existing:
+        op.create_table(
+            'rooms',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('capacity', sa.Integer(), nullable=True),
+            sa.Column('equipment', sa.Text(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_rooms_id', 'rooms', ['id'], unique=False)
+
+    if 'bookings' not in existing:
+        op.create_table(
+            'bookings',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('room_id', sa.Integer(), nullable=False),
+            sa.Column('start_time', sa.DateTime(), nullable=False),
+            sa.Column('end_time', sa.DateTime(), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_bookings_id', 'bookings', ['id'], unique=False)
+
+    if 'classes' not in existing:
+        op.create_table(
+            'classes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('room_id', sa.Integer(), nullable=False),
+            sa.Column('teacher_name', sa.String(), nullable=False),
+            sa.Column('class_name', sa.String(), nullable=False),
+            sa.Column('student_name', sa.String(), nullable=True),
+            sa.Column('start_time', sa.DateTime(), nullable=False),
+            sa.Column('end_time', sa.DateTime(), nullable=False),
+            sa.Column('is_recurring', sa.Boolean(), nullable=True),
+            sa.Column('recurrence_pattern', sa.String(), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_classes_id', 'classes', ['id'], unique=False)
+
+    if 'students' not in existing:
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=True),
+            sa.Column('phone', sa.String(), nullable=True),
+            sa.Column('teacher_name', sa.String(), nullable=False),
+            sa.Column('room_id', sa.Integer(), nullable=False),
+            sa.Column('weekday', sa.Integer(), nullable=False),
+            sa.Column('start_time', sa.String(), nullable=False),
+            sa.Column('end_time', sa.String(), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_students_id', 'students', ['id'], unique=False)
+
+    if 'room_occupancy' not in existing:
+        op.create_table(
+            'room_occupancy',
+            sa.Column('room_id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('weekday', sa.Integer(), nullable=False),
+            sa.Column('bits', sa.LargeBinary(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+            sa.PrimaryKeyConstraint('room_id', 'date')
+        )
+        op.create_index('ix_room_occupancy_weekday', 'room_occupancy', ['weekday'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('room_occupancy')
+    op.drop_table('students')
+    op.drop_table('classes')
+    op.drop_table('bookings')
+    op.drop_table('rooms')
+    op.drop_table('users')
@@ -0,0 +1,76 @@
+"""Integer minute columns for student weekly schedules
+
+Revision ID: 0002_student_minutes
+Revises: 0001_initial
+Create Date: 2026-10-17 09:30:00
+
+Adds start_min/end_min (minutes since midnight) next to the "HH:MM"
+strings, backfills them and indexes (room_id, weekday, start_min, end_min)
+so schedule overlaps can be compared in SQL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_student_minutes'
+down_revision: Union[str, None] = '0001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_students_room_weekday_minutes'
+
+
+def _to_minutes(value: str) -> int:
+    hours, minutes = map(int, value.split(':'))
+    return hours * 60 + minutes
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column['name'] for column in inspector.get_columns('students')}
+    if {'start_min', 'end_min'} <= columns:
+        # Already created with the current models (create_all)
+        return
+
+    with op.batch_alter_table('students') as batch_op:
+        batch_op.add_column(sa.Column('start_min', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('end_min', sa.Integer(), nullable=True))
+
+    students = sa.table(
+        'students',
+        sa.column('id', sa.Integer),
+        sa.column('start_time', sa.String),
+        sa.column('end_time', sa.String),
+        sa.column('start_min', sa.Integer),
+        sa.column('end_min', sa.Integer),
+    )
+    rows = bind.execute(
+        sa.select(students.c.id, students.c.start_time, students.c.end_time)
+    ).all()
+    for row in rows:
+        bind.execute(
+            students.update()
+            .where(students.c.id == row.id)
+            .values(
+                start_min=_to_minutes(row.start_time),
+                end_min=_to_minutes(row.end_time),
+            )
+        )
+
+    with op.batch_alter_table('students') as batch_op:
+        batch_op.alter_column('start_min', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('end_min', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(
+            INDEX_NAME, ['room_id', 'weekday', 'start_min', 'end_min'], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('students') as batch_op:
+        batch_op.drop_index(INDEX_NAME)
+        batch_op.drop_column('end_min')
+        batch_op.drop_column('start_min')
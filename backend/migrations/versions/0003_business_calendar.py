@@ -0,0 +1,53 @@
+"""Business hours and calendar blackouts
+
+Revision ID: 0003_business_calendar
+Revises: 0002_student_minutes
+Create Date: 2026-10-17 10:00:00
+
+While business_hours is empty the built-in schedule is used, so no rows
+are seeded here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_business_calendar'
+down_revision: Union[str, None] = '0002_student_minutes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'business_hours' not in existing:
+        op.create_table(
+            'business_hours',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('weekday', sa.Integer(), nullable=False),
+            sa.Column('open_time', sa.String(), nullable=False),
+            sa.Column('close_time', sa.String(), nullable=False),
+            sa.Column('open_min', sa.Integer(), nullable=False),
+            sa.Column('close_min', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_business_hours_id', 'business_hours', ['id'], unique=False)
+
+    if 'calendar_blackouts' not in existing:
+        op.create_table(
+            'calendar_blackouts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('reason', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_calendar_blackouts_id', 'calendar_blackouts', ['id'], unique=False)
+        op.create_index('ix_calendar_blackouts_date', 'calendar_blackouts', ['date'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('calendar_blackouts')
+    op.drop_table('business_hours')
@@ -0,0 +1,42 @@
+"""Composite indexes for booking and class conflict checks
+
+Revision ID: 0004_conflict_indexes
+Revises: 0003_business_calendar
+Create Date: 2026-10-17 11:00:00
+
+Conflict checks filter on room_id and status and compare the time columns
+(start_time < new_end AND end_time > new_start), so both tables get an
+index on (room_id, status, start_time, end_time).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_conflict_indexes'
+down_revision: Union[str, None] = '0003_business_calendar'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'bookings': 'ix_bookings_room_status_time',
+    'classes': 'ix_classes_room_status_time',
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name in INDEXES.items():
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            # Already created with the current models (create_all)
+            continue
+        op.create_index(
+            name, table, ['room_id', 'status', 'start_time', 'end_time'], unique=False
+        )
+
+
+def downgrade() -> None:
+    for table, name in INDEXES.items():
+        op.drop_index(name, table_name=table)
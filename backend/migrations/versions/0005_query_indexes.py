@@ -0,0 +1,41 @@
+"""Indexes for the per-user and per-room listings
+
+Revision ID: 0005_query_indexes
+Revises: 0004_conflict_indexes
+Create Date: 2026-10-17 15:00:00
+
+"My bookings" filters bookings on user_id, and the room's class listing
+filters classes on room_id alone and walks them by start_time (recurring
+classes are matched by start_time only), so neither is served well by the
+(room_id, status, ...) conflict indexes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_query_indexes'
+down_revision: Union[str, None] = '0004_conflict_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_bookings_user_start': ('bookings', ['user_id', 'start_time']),
+    'ix_classes_room_start': ('classes', ['room_id', 'start_time']),
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, (table, columns) in INDEXES.items():
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            # Already created with the current models (create_all)
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
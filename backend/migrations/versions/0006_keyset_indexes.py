@@ -0,0 +1,42 @@
+"""Indexes for the keyset-paginated booking and class lists
+
+Revision ID: 0006_keyset_indexes
+Revises: 0005_query_indexes
+Create Date: 2026-10-17 16:00:00
+
+The admin lists of bookings and classes are paginated in (start_time, id)
+order across all rooms and users, which none of the existing indexes
+(all leading with room_id or user_id) can serve. The id is part of the
+key: PostgreSQL does not store the primary key in a secondary index, so
+(start_time) alone would leave ties on start_time to be sorted.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_keyset_indexes'
+down_revision: Union[str, None] = '0005_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_bookings_start_time': ('bookings', ['start_time', 'id']),
+    'ix_classes_start_time': ('classes', ['start_time', 'id']),
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, (table, columns) in INDEXES.items():
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            # Already created with the current models (create_all)
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
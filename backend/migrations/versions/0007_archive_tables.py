@@ -0,0 +1,104 @@
+"""Archive tables for finished bookings and classes
+
+Revision ID: 0007_archive_tables
+Revises: 0006_keyset_indexes
+Create Date: 2026-10-17 17:00:00
+
+Completed and cancelled rows past the retention period are moved to
+bookings_archive / classes_archive (see app/archive.py). The bookings_all
+and classes_all views put both back together for reporting queries; their
+archived_at column is NULL for rows still in the hot table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_archive_tables'
+down_revision: Union[str, None] = '0006_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKING_COLUMNS = 'id, user_id, room_id, start_time, end_time, notes, status, created_at'
+CLASS_COLUMNS = (
+    'id, room_id, teacher_name, class_name, student_name, start_time, end_time, '
+    'is_recurring, recurrence_pattern, notes, status, created_at'
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+    views = set(inspector.get_view_names())
+
+    if 'bookings_archive' not in existing:
+        _create_bookings_archive()
+    if 'classes_archive' not in existing:
+        _create_classes_archive()
+
+    if 'bookings_all' not in views:
+        op.execute(
+            f"CREATE VIEW bookings_all AS "
+            f"SELECT {BOOKING_COLUMNS}, CAST(NULL AS TIMESTAMP) AS archived_at FROM bookings "
+            f"UNION ALL SELECT {BOOKING_COLUMNS}, archived_at FROM bookings_archive"
+        )
+    if 'classes_all' not in views:
+        op.execute(
+            f"CREATE VIEW classes_all AS "
+            f"SELECT {CLASS_COLUMNS}, CAST(NULL AS TIMESTAMP) AS archived_at FROM classes "
+            f"UNION ALL SELECT {CLASS_COLUMNS}, archived_at FROM classes_archive"
+        )
+
+
+def _create_bookings_archive():
+    op.create_table(
+        'bookings_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_bookings_archive_room_start', 'bookings_archive', ['room_id', 'start_time'], unique=False
+    )
+
+
+def _create_classes_archive():
+    op.create_table(
+        'classes_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_name', sa.String(), nullable=False),
+        sa.Column('class_name', sa.String(), nullable=False),
+        sa.Column('student_name', sa.String(), nullable=True),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('is_recurring', sa.Boolean(), nullable=True),
+        sa.Column('recurrence_pattern', sa.String(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_classes_archive_room_start', 'classes_archive', ['room_id', 'start_time'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW classes_all")
+    op.execute("DROP VIEW bookings_all")
+    op.drop_table('classes_archive')
+    op.drop_table('bookings_archive')
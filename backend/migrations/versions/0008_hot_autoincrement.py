@@ -0,0 +1,91 @@
+"""Never reuse the ids of archived bookings and classes
+
+Revision ID: 0008_hot_autoincrement
+Revises: 0007_archive_tables
+Create Date: 2026-10-17 21:00:00
+
+Without AUTOINCREMENT, SQLite hands out the highest id again once that row
+has moved to the archive, and the next archive run of the new row collides
+with the archived one. The hot tables are rebuilt with AUTOINCREMENT and
+their sequence starts past the highest archived id. PostgreSQL sequences
+never reuse ids, so nothing changes there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_hot_autoincrement'
+down_revision: Union[str, None] = '0007_archive_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKING_COLUMNS = 'id, user_id, room_id, start_time, end_time, notes, status, created_at'
+CLASS_COLUMNS = (
+    'id, room_id, teacher_name, class_name, student_name, start_time, end_time, '
+    'is_recurring, recurrence_pattern, notes, status, created_at'
+)
+# table -> (archive table, view, view columns)
+TABLES = {
+    'bookings': ('bookings_archive', 'bookings_all', BOOKING_COLUMNS),
+    'classes': ('classes_archive', 'classes_all', CLASS_COLUMNS),
+}
+
+
+def _has_autoincrement(bind, table: str) -> bool:
+    sql = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': table}
+    ).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+
+def _rebuild(table: str, autoincrement: bool):
+    archive, view, columns = TABLES[table]
+    # SQLite refuses to rename a table over a view that points at it
+    op.execute(f"DROP VIEW IF EXISTS {view}")
+    with op.batch_alter_table(
+        table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}
+    ):
+        pass
+    op.execute(
+        f"CREATE VIEW {view} AS "
+        f"SELECT {columns}, CAST(NULL AS TIMESTAMP) AS archived_at FROM {table} "
+        f"UNION ALL SELECT {columns}, archived_at FROM {archive}"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    for table, (archive, _, _) in TABLES.items():
+        if not _has_autoincrement(bind, table):
+            _rebuild(table, autoincrement=True)
+        # Start past every id used so far, archived ones included
+        highest = bind.execute(sa.text(
+            f"SELECT MAX(COALESCE((SELECT MAX(id) FROM {table}), 0), "
+            f"COALESCE((SELECT MAX(id) FROM {archive}), 0))"
+        )).scalar()
+        updated = bind.execute(
+            sa.text("UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = :name"),
+            {'seq': highest, 'name': table}
+        ).rowcount
+        if not updated:
+            bind.execute(
+                sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                {'seq': highest, 'name': table}
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    for table in TABLES:
+        if _has_autoincrement(bind, table):
+            _rebuild(table, autoincrement=False)
@@ -0,0 +1,38 @@
+"""Occupancy version of rooms
+
+Revision ID: 0009_occupancy_version
+Revises: 0008_hot_autoincrement
+Create Date: 2026-10-17 22:00:00
+
+Adds rooms.occupancy_version, bumped whenever a room's occupancy rows are
+discarded, so lazily rebuilt rows computed before the discard are not
+stored after it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_occupancy_version'
+down_revision: Union[str, None] = '0008_hot_autoincrement'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('rooms')}
+    if 'occupancy_version' in columns:
+        # Already created with the current models (create_all)
+        return
+    op.add_column(
+        'rooms',
+        sa.Column('occupancy_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('rooms') as batch_op:
+        batch_op.drop_column('occupancy_version')
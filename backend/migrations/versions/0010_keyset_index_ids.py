@@ -0,0 +1,46 @@
+"""Add the id to the keyset pagination indexes
+
+Revision ID: 0010_keyset_index_ids
+Revises: 0009_occupancy_version
+Create Date: 2026-10-17 23:00:00
+
+Databases upgraded with an earlier 0006_keyset_indexes got the start_time
+indexes without the id, which PostgreSQL does not keep in a secondary
+index. They are rebuilt on (start_time, id) so the lists' ORDER BY
+start_time, id is served by the index alone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_keyset_index_ids'
+down_revision: Union[str, None] = '0009_occupancy_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_bookings_start_time': 'bookings',
+    'ix_classes_start_time': 'classes',
+}
+
+
+def _rebuild(columns) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table in INDEXES.items():
+        existing = {index['name']: index['column_names'] for index in inspector.get_indexes(table)}
+        if existing.get(name) == columns:
+            continue
+        if name in existing:
+            op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns, unique=False)
+
+
+def upgrade() -> None:
+    _rebuild(['start_time', 'id'])
+
+
+def downgrade() -> None:
+    _rebuild(['start_time'])
@@ -98,6 +98,13 @@ class ApiService {
     });
   }
 
+  async createBookingSeries(seriesData) {
+    return this.request('/bookings/series', {
+      method: 'POST',
+      body: JSON.stringify(seriesData),
+    });
+  }
+
   async updateBooking(bookingId, updateData) {
     return this.request(`/bookings/${bookingId}`, {
       method: 'PUT',
@@ -120,6 +127,16 @@ class ApiService {
     return this.request(`/bookings/available-slots?${params}`);
   }
 
+  async getAvailability(roomIds, startDate, endDate, duration = 60) {
+    const params = new URLSearchParams({
+      start_date: startDate,
+      end_date: endDate,
+      duration: duration,
+    });
+    roomIds.forEach((roomId) => params.append('room_ids', roomId));
+    return this.request(`/bookings/availability?${params}`);
+  }
+
   // Admin endpoints
   async getAllUsers() {
     return this.request('/admin/users');
@@ -6,6 +6,7 @@ echo Starting Backend Server...
 cd /d "d:\Repositórios\projeto-pessoal\backend"
 call venv\Scripts\activate.bat
 pip install -r requirements.txt
+alembic upgrade head
 start "Backend Server" cmd /k "uvicorn app.main:app --reload --host 0.0.0.0 --port 8000"
 
 echo.
@@ -9,5 +9,8 @@ source venv/Scripts/activate
 # Install dependencies
 pip install -r requirements.txt
 
+# Apply the database migrations
+alembic upgrade head
+
 # Start the backend server
 python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
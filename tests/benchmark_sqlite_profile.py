@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mixed read/write throughput with and without the SQLite tuning
+profile (WAL, synchronous=NORMAL, mmap, cache, busy_timeout, temp_store).
+
+Runs reader threads (availability lookups on random days, bypassing the
+in-process availability cache) and writer threads (crud.create_booking on
+random slots) against a fresh file database for a fixed time, once with
+the default rollback journal and once with the profile applied.
+
+Usage: python tests/benchmark_sqlite_profile.py [seconds] [readers] [writers]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"
+)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine, exc  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import crud, models, occupancy, schemas  # noqa: E402
+from app.database import apply_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+
+ROOMS = 4
+DAYS = 60
+FIRST_DAY = datetime(2030, 1, 7)
+
+
+def seed(Session):
+    with Session() as db:
+        db.add(models.User(email="bench@example.com", hashed_password="x", full_name="Bench"))
+        db.add_all([models.Room(name=f"Room {i}") for i in range(ROOMS)])
+        db.commit()
+        return db.query(models.User.id).scalar(), [room.id for room in db.query(models.Room)]
+
+
+def run(tuned, seconds, readers, writers):
+    directory = tempfile.mkdtemp()
+    engine = create_engine(
+        f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=readers + writers,
+    )
+    if tuned:
+        apply_sqlite_pragmas(engine, sqlite_pragmas())
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    user_id, room_ids = seed(Session)
+
+    deadline = time.perf_counter() + seconds
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader(seed_value):
+        rng = random.Random(seed_value)
+        done = errors = 0
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                day = FIRST_DAY + timedelta(days=rng.randrange(DAYS))
+                try:
+                    occupancy.load_occupants(db, room_ids, day, day + timedelta(days=1))
+                    db.commit()
+                    done += 1
+                except exc.OperationalError:
+                    db.rollback()
+                    errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer(seed_value):
+        rng = random.Random(seed_value)
+        done = errors = 0
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                start = (FIRST_DAY + timedelta(days=rng.randrange(DAYS))).replace(
+                    hour=rng.randrange(9, 20), minute=rng.choice([0, 15, 30, 45])
+                )
+                try:
+                    crud.create_booking(db, schemas.BookingCreate(
+                        room_id=rng.choice(room_ids), start_time=start,
+                        end_time=start + timedelta(minutes=30)
+                    ), user_id)
+                    done += 1
+                except exc.OperationalError:
+                    db.rollback()
+                    errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return counts
+
+
+def main(seconds=5, readers=4, writers=2):
+    print(f"{readers} readers, {writers} writers, {seconds} s per run")
+    for tuned in (False, True):
+        counts = run(tuned, seconds, readers, writers)
+        label = "tuning profile" if tuned else "default pragmas"
+        print(
+            f"{label:16} reads/s {counts['reads'] / seconds:9.1f}   "
+            f"writes/s {counts['writes'] / seconds:8.1f}   errors {counts['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized utilization heatmap vs. the naive per-day loop.
+
+Seeds an in-memory database with a reproducible schedule and times
+crud.get_utilization against a loop that queries and scans every room/day
+on its own, checking both return the same numbers.
+
+Usage: python tests/benchmark_utilization.py [days] [rooms]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"
+)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import and_, create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app import crud, models  # noqa: E402
+from app.business_hours import business_calendar  # noqa: E402
+
+
+def seed(db, first_day, days, rooms, seed_value=42):
+    """Reproducible schedule: bookings, classes and weekly students"""
+    rng = random.Random(seed_value)
+    user = models.User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    db.add(user)
+    room_rows = [models.Room(name=f"Room {i}") for i in range(rooms)]
+    db.add_all(room_rows)
+    db.flush()
+
+    for room in room_rows:
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            for _ in range(rng.randint(0, 8)):
+                start = day.replace(hour=8) + timedelta(minutes=5 * rng.randint(0, 160))
+                end = start + timedelta(minutes=5 * rng.randint(3, 30))
+                db.add(models.Booking(
+                    user_id=user.id, room_id=room.id, start_time=start, end_time=end,
+                    status=rng.choice(["confirmed", "confirmed", "cancelled"])
+                ))
+            for _ in range(rng.randint(0, 2)):
+                start = day.replace(hour=9) + timedelta(minutes=15 * rng.randint(0, 44))
+                db.add(models.Class(
+                    room_id=room.id, teacher_name="T", class_name="C",
+                    start_time=start, end_time=start + timedelta(minutes=rng.choice([45, 60, 90]))
+                ))
+        for weekday in range(7):
+            for _ in range(rng.randint(0, 3)):
+                start_min = rng.randrange(9 * 60, 20 * 60, 15)
+                end_min = start_min + rng.choice([30, 60])
+                db.add(models.Student(
+                    name="S", teacher_name="T", room_id=room.id, weekday=weekday,
+                    start_time=f"{start_min // 60:02d}:{start_min % 60:02d}",
+                    end_time=f"{end_min // 60:02d}:{end_min % 60:02d}"
+                ))
+    db.commit()
+    return [room.id for room in room_rows]
+
+
+def naive_utilization(db, room_ids, start_date, days):
+    """One set of queries and a minute-by-minute scan per room and day"""
+    business_calendar.ensure_loaded(db)
+    results = {}
+    for room_id in room_ids:
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            windows = business_calendar.open_windows(day)
+            if not windows:
+                results[(room_id, day.date())] = (0, 0)
+                continue
+            start_of_day, end_of_day = windows[0][0], windows[-1][1]
+            occupants = [
+                (b.start_time, b.end_time) for b in db.query(models.Booking).filter(and_(
+                    models.Booking.room_id == room_id,
+                    models.Booking.status == "confirmed",
+                    models.Booking.start_time < end_of_day,
+                    models.Booking.end_time > start_of_day
+                ))
+            ] + [
+                (c.start_time, c.end_time) for c in db.query(models.Class).filter(and_(
+                    models.Class.room_id == room_id,
+                    models.Class.status == "scheduled",
+                    models.Class.start_time < end_of_day,
+                    models.Class.end_time > start_of_day
+                ))
+            ] + [
+                (day + timedelta(minutes=s.start_min), day + timedelta(minutes=s.end_min))
+                for s in db.query(models.Student).filter(and_(
+                    models.Student.room_id == room_id,
+                    models.Student.weekday == day.weekday(),
+                    models.Student.is_active.is_(True)
+                ))
+            ]
+            open_minutes = 0
+            occupied = 0
+            for window_start, window_end in windows:
+                window_minutes = int((window_end - window_start).total_seconds()) // 60
+                open_minutes += window_minutes
+                for minute in range(window_minutes):
+                    moment = window_start + timedelta(minutes=minute)
+                    if any(start < moment + timedelta(minutes=1) and end > moment
+                           for start, end in occupants):
+                        occupied += 1
+            results[(room_id, day.date())] = (open_minutes, occupied)
+    return results
+
+
+def vectorized_utilization(db, room_ids, start_date, days):
+    return {
+        (room.room_id, day.date): (day.open_minutes, day.occupied_minutes)
+        for room in crud.get_utilization(db, room_ids, start_date, days)
+        for day in room.days
+    }
+
+
+def main(days=90, rooms=3):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    first_day = datetime(2030, 1, 7)
+    room_ids = seed(db, first_day, days, rooms)
+
+    started = time.perf_counter()
+    naive = naive_utilization(db, room_ids, first_day, days)
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = vectorized_utilization(db, room_ids, first_day, days)
+    vectorized_seconds = time.perf_counter() - started
+
+    assert naive == vectorized, "results differ"
+    print(f"{rooms} rooms x {days} days")
+    print(f"naive per-day loop: {naive_seconds * 1000:9.1f} ms")
+    print(f"vectorized:         {vectorized_seconds * 1000:9.1f} ms")
+    print(f"speedup:            {naive_seconds / vectorized_seconds:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
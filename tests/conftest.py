@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the backend unit tests.
+
+These tests talk to the application code directly (no running server) and
+use a throwaway in-memory SQLite database.
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"
+)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models import Base  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    """Module-level caches outlive a test's database"""
+    from app.auth import user_cache
+    from app.business_hours import business_calendar
+    from app.cache import availability_cache
+    from app.recurrence import expansion_cache
+    from app.write_queue import room_writes
+
+    availability_cache.clear()
+    expansion_cache.clear()
+    room_writes.reset()
+    business_calendar.invalidate()
+    user_cache.clear()
+    yield
+    availability_cache.clear()
+    expansion_cache.clear()
+    business_calendar.invalidate()
+    user_cache.clear()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the AsyncSession read path.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import async_crud, availability, crud, models
+from app.routers import bookings
+
+MONDAY = datetime(2030, 6, 3)
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A file database seeded through a sync session, so the async engine
+    sees the same rows"""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=sync_engine)
+    db = sessionmaker(bind=sync_engine)()
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    closed = models.Room(name="Closed", is_active=False)
+    db.add_all([user, room, closed])
+    db.flush()
+    db.add_all([
+        models.Booking(
+            user_id=user.id, room_id=room.id,
+            start_time=MONDAY.replace(hour=10), end_time=MONDAY.replace(hour=11)
+        ),
+        models.Class(
+            class_name="Weekly", teacher_name="T", room_id=room.id,
+            start_time=MONDAY.replace(hour=14), end_time=MONDAY.replace(hour=15),
+            is_recurring=True, recurrence_pattern="weekly"
+        ),
+    ])
+    db.commit()
+    yield db, user.id, room.id, f"sqlite+aiosqlite:///{path}"
+    db.close()
+    sync_engine.dispose()
+
+
+def _run(url, read):
+    async def main():
+        engine = create_async_engine(url)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                return await read(session)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def test_rooms_and_room(database):
+    _, _, room_id, url = database
+
+    rooms = _run(url, lambda db: async_crud.get_rooms(db))
+    room = _run(url, lambda db: async_crud.get_room(db, room_id))
+
+    assert [r.name for r in rooms] == ["Room"]
+    assert room.name == "Room"
+
+
+def test_user_bookings_have_their_room_loaded(database):
+    _, user_id, _, url = database
+
+    bookings = _run(url, lambda db: async_crud.get_user_bookings(db, user_id))
+
+    # The session is closed, so the room must have been loaded eagerly
+    assert [b.room.name for b in bookings.items] == ["Room"]
+
+
+def test_availability_matches_the_sync_path(database):
+    db, _, room_id, url = database
+
+    expected = crud.get_availability_for_rooms(db, [room_id], MONDAY, MONDAY, 60)
+    crud.availability_cache.clear()
+    result = _run(url, lambda session: async_crud.get_availability_for_rooms(
+        session, [room_id], MONDAY, MONDAY, 60
+    ))
+
+    assert result == expected
+    busy = {slot.start_time.hour for slot in result[0].slots if not slot.is_available}
+    assert {10, 14} <= busy
+
+
+def test_classes_by_room_expands_recurring_classes(database):
+    _, _, room_id, url = database
+
+    classes = _run(url, lambda db: async_crud.get_classes_by_room(
+        db, room_id, MONDAY, datetime(2030, 6, 24)
+    ))
+
+    assert [c.start_time.day for c in classes] == [3, 10, 17]
+
+
+def test_slots_are_built_off_the_event_loop(database, monkeypatch):
+    _, _, room_id, url = database
+    threads = set()
+    build = availability.build_slots_from_mask
+
+    def recording_build(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(availability, "build_slots_from_mask", recording_build)
+
+    async def read(db):
+        loop_thread = threading.get_ident()
+        await async_crud.get_availability_for_rooms(db, [room_id], MONDAY, MONDAY, 60)
+        return loop_thread
+
+    loop_thread = _run(url, read)
+    assert threads and loop_thread not in threads
+
+
+def test_availability_of_all_rooms_is_capped(database, monkeypatch):
+    db, _, room_id, url = database
+    monkeypatch.setattr(bookings, "MAX_REQUEST_ROOMS", 1)
+
+    def read(db):
+        return bookings.get_rooms_availability(
+            start_date=MONDAY.date(), end_date=MONDAY.date(), room_ids=None,
+            duration=60, step=None, db=db, current_user=None
+        )
+
+    assert {day.room_id for day in _run(url, read)} == {room_id}
+
+    db.add(models.Room(name="Second"))
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        _run(url, read)
+    assert error.value.status_code == 400
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the availability LRU cache and its write-driven invalidation.
+"""
+
+from datetime import datetime, timedelta
+
+from app import crud, models, schemas
+from app.cache import AvailabilityCache, availability_cache
+
+
+def _setup(db):
+    user = models.User(email="cache@example.com", hashed_password="x", full_name="C")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.commit()
+    return user, room
+
+
+def test_repeated_reads_hit_the_cache(db):
+    _, room = _setup(db)
+    day = datetime(2030, 6, 3)
+
+    before = availability_cache.stats()
+
+    first = crud.get_available_slots_with_classes(db, room.id, day, 60)
+    second = crud.get_available_slots_with_classes(db, room.id, day, 60)
+
+    assert first == second
+    stats = availability_cache.stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+
+
+def test_booking_writes_invalidate_the_affected_day(db):
+    user, room = _setup(db)
+    day = datetime(2030, 6, 3)
+    other_day = day + timedelta(days=1)
+    crud.get_available_slots_with_classes(db, room.id, day, 60)
+    crud.get_available_slots_with_classes(db, room.id, other_day, 60)
+
+    booking = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=day.replace(hour=10), end_time=day.replace(hour=11)
+    ), user_id=user.id)
+
+    slots = crud.get_available_slots_with_classes(db, room.id, day, 60)
+    assert [s.start_time.hour for s in slots if not s.is_available] == [10]
+    hits = availability_cache.stats()["hits"]
+    crud.get_available_slots_with_classes(db, room.id, other_day, 60)
+    assert availability_cache.stats()["hits"] == hits + 1
+
+    crud.delete_booking(db, booking.id)
+    slots = crud.get_available_slots_with_classes(db, room.id, day, 60)
+    assert all(s.is_available for s in slots)
+
+
+def test_student_writes_invalidate_matching_weekdays(db):
+    _, room = _setup(db)
+    monday = datetime(2030, 6, 3)
+    crud.get_available_slots_with_classes(db, room.id, monday, 60)
+
+    crud.create_student(db, schemas.StudentCreate(
+        name="S", teacher_name="T", room_id=room.id, weekday=0,
+        start_time="14:00", end_time="15:00"
+    ))
+
+    slots = crud.get_available_slots_with_classes(db, room.id, monday, 60)
+    assert [s.start_time.hour for s in slots if not s.is_available] == [14]
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = AvailabilityCache(max_entries=2)
+    day = datetime(2030, 6, 3).date()
+    for room_id in (1, 2):
+        cache.put(room_id, day, 60, 60, [], cache.generation(room_id))
+    cache.get(1, day, 60, 60)
+    cache.put(3, day, 60, 60, [], cache.generation(3))
+
+    assert cache.get(2, day, 60, 60) is None
+    assert cache.get(1, day, 60, 60) == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_results_are_not_cached_after_a_write():
+    cache = AvailabilityCache()
+    day = datetime(2030, 6, 3).date()
+    generation = cache.generation(1)
+    cache.invalidate(1, [day])
+    cache.put(1, day, 60, 60, [], generation)
+
+    assert cache.get(1, day, 60, 60) is None
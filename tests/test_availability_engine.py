@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Regression test for the availability engine.
+
+Compares crud.get_available_slots_with_classes (occupancy bitmaps) and the
+sweep-line helper against the original slot-by-occupant loop on randomly
+generated rooms.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import and_
+
+from app import availability, crud, models, schemas
+from app.auth import get_current_active_user_async
+from app.main import app
+
+
+def student_interval(date, start_time, end_time):
+    """A student's weekly "HH:MM" schedule as an interval on `date`"""
+    start_hour, start_min = map(int, start_time.split(':'))
+    end_hour, end_min = map(int, end_time.split(':'))
+    return (
+        date.replace(hour=start_hour, minute=start_min, second=0, microsecond=0),
+        date.replace(hour=end_hour, minute=end_min, second=0, microsecond=0),
+    )
+
+
+def reference_slots(db, room_id, date, duration_minutes=60, step_minutes=None):
+    """The original O(slots x occupants) implementation.
+
+    Occupants are selected by overlap with the opening hours, so bookings
+    and classes that start before opening but run into it block slots too.
+    """
+    if date.weekday() == 6 or date.weekday() == 4:
+        return []
+
+    start_of_day = date.replace(hour=9, minute=0, second=0, microsecond=0)
+    if date.weekday() == 5:
+        end_of_day = date.replace(hour=13, minute=0, second=0, microsecond=0)
+    else:
+        end_of_day = date.replace(hour=21, minute=0, second=0, microsecond=0)
+
+    existing_bookings = db.query(models.Booking).filter(
+        and_(
+            models.Booking.room_id == room_id,
+            models.Booking.start_time < end_of_day,
+            models.Booking.end_time > start_of_day,
+            models.Booking.status == "confirmed"
+        )
+    ).all()
+    existing_classes = db.query(models.Class).filter(
+        and_(
+            models.Class.room_id == room_id,
+            models.Class.start_time < end_of_day,
+            models.Class.end_time > start_of_day,
+            models.Class.status == "scheduled"
+        )
+    ).all()
+    student_schedules = db.query(models.Student).filter(
+        and_(
+            models.Student.room_id == room_id,
+            models.Student.weekday == date.weekday(),
+            models.Student.is_active.is_(True)
+        )
+    ).all()
+
+    slots = []
+    current_time = start_of_day
+    slot_duration = timedelta(minutes=duration_minutes)
+    while current_time + slot_duration <= end_of_day:
+        slot_end = current_time + slot_duration
+        is_available = True
+        for booking in existing_bookings:
+            if current_time < booking.end_time and slot_end > booking.start_time:
+                is_available = False
+                break
+        if is_available:
+            for class_schedule in existing_classes:
+                if (current_time < class_schedule.end_time and
+                        slot_end > class_schedule.start_time):
+                    is_available = False
+                    break
+        if is_available:
+            for student in student_schedules:
+                sh, sm = map(int, student.start_time.split(':'))
+                eh, em = map(int, student.end_time.split(':'))
+                student_start = date.replace(hour=sh, minute=sm, second=0, microsecond=0)
+                student_end = date.replace(hour=eh, minute=em, second=0, microsecond=0)
+                if current_time < student_end and slot_end > student_start:
+                    is_available = False
+                    break
+        slots.append(schemas.TimeSlot(
+            start_time=current_time,
+            end_time=slot_end,
+            is_available=is_available,
+            room_id=room_id
+        ))
+        current_time += timedelta(minutes=step_minutes or duration_minutes)
+    return slots
+
+
+def _random_interval(rng, day):
+    start = day.replace(hour=8) + timedelta(minutes=5 * rng.randint(0, 160))
+    return start, start + timedelta(minutes=5 * rng.randint(1, 36))
+
+
+def seed_random_schedule(db, rng, days):
+    user = models.User(email="seed@example.com", hashed_password="x", full_name="Seed")
+    db.add(user)
+    rooms = [models.Room(name=f"Room {i}") for i in range(3)]
+    db.add_all(rooms)
+    db.flush()
+
+    for room in rooms:
+        for day in days:
+            for _ in range(rng.randint(0, 6)):
+                start, end = _random_interval(rng, day)
+                db.add(models.Booking(
+                    user_id=user.id, room_id=room.id, start_time=start, end_time=end,
+                    status=rng.choice(["confirmed", "confirmed", "cancelled"])
+                ))
+            for _ in range(rng.randint(0, 3)):
+                start, end = _random_interval(rng, day)
+                db.add(models.Class(
+                    room_id=room.id, teacher_name="T", class_name="C",
+                    start_time=start, end_time=end,
+                    status=rng.choice(["scheduled", "scheduled", "cancelled"])
+                ))
+        for weekday in range(7):
+            for _ in range(rng.randint(0, 2)):
+                start_min = rng.randrange(8 * 60, 20 * 60, 15)
+                end_min = start_min + rng.choice([30, 45, 60, 90])
+                db.add(models.Student(
+                    name="S", teacher_name="T", room_id=room.id, weekday=weekday,
+                    start_time=f"{start_min // 60:02d}:{start_min % 60:02d}",
+                    end_time=f"{end_min // 60:02d}:{end_min % 60:02d}",
+                    is_active=rng.random() > 0.2
+                ))
+    db.commit()
+    return rooms
+
+
+def test_engine_matches_reference_implementation(db):
+    rng = random.Random(1234)
+    first_day = datetime(2025, 6, 2)
+    days = [first_day + timedelta(days=i) for i in range(14)]
+    rooms = seed_random_schedule(db, rng, days)
+
+    for room in rooms:
+        for day in days:
+            for duration in (15, 30, 45, 60, 90, 120):
+                expected = reference_slots(db, room.id, day, duration)
+                actual = crud.get_available_slots_with_classes(
+                    db, room_id=room.id, date=day, duration_minutes=duration
+                )
+                assert actual == expected, (room.id, day, duration)
+
+
+def test_sliding_step_matches_reference_implementation(db):
+    rng = random.Random(2468)
+    first_day = datetime(2025, 6, 2)
+    days = [first_day + timedelta(days=i) for i in range(7)]
+    rooms = seed_random_schedule(db, rng, days)
+
+    for room in rooms:
+        for day in days:
+            for duration, step in ((90, 15), (60, 30), (45, 5), (30, 60)):
+                expected = reference_slots(db, room.id, day, duration, step)
+                actual = crud.get_available_slots_with_classes(
+                    db, room_id=room.id, date=day, duration_minutes=duration,
+                    step_minutes=step
+                )
+                assert actual == expected, (room.id, day, duration, step)
+
+
+def test_sweep_line_matches_reference_implementation(db):
+    rng = random.Random(4321)
+    first_day = datetime(2025, 6, 2)
+    days = [first_day + timedelta(days=i) for i in range(7)]
+    rooms = seed_random_schedule(db, rng, days)
+
+    for room in rooms:
+        for day in days:
+            expected = reference_slots(db, room.id, day, 30)
+            if not expected:
+                continue
+            occupied = [
+                (b.start_time, b.end_time) for b in db.query(models.Booking).filter(
+                    models.Booking.room_id == room.id,
+                    models.Booking.status == "confirmed"
+                )
+            ] + [
+                (c.start_time, c.end_time) for c in db.query(models.Class).filter(
+                    models.Class.room_id == room.id,
+                    models.Class.status == "scheduled"
+                )
+            ] + [
+                student_interval(day, s.start_time, s.end_time)
+                for s in db.query(models.Student).filter(
+                    models.Student.room_id == room.id,
+                    models.Student.weekday == day.weekday(),
+                    models.Student.is_active.is_(True)
+                )
+            ]
+            actual = availability.build_slots(
+                room.id, expected[0].start_time, expected[-1].end_time, 30, occupied
+            )
+            assert actual == expected, (room.id, day)
+
+
+def test_touching_intervals_do_not_block_adjacent_slots(db):
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.flush()
+    day = datetime(2025, 6, 3)
+    db.add(models.Booking(
+        user_id=user.id, room_id=room.id,
+        start_time=day.replace(hour=10), end_time=day.replace(hour=11)
+    ))
+    db.add(models.Class(
+        room_id=room.id, teacher_name="T", class_name="C",
+        start_time=day.replace(hour=11), end_time=day.replace(hour=12)
+    ))
+    db.commit()
+
+    slots = crud.get_available_slots_with_classes(db, room.id, day, 60)
+    busy = [s.start_time.hour for s in slots if not s.is_available]
+    assert busy == [10, 11]
+
+
+def test_batch_availability_matches_single_day_queries(db):
+    rng = random.Random(99)
+    first_day = datetime(2025, 6, 2)
+    days = [first_day + timedelta(days=i) for i in range(10)]
+    rooms = seed_random_schedule(db, rng, days)
+    room_ids = [room.id for room in rooms]
+
+    batch = crud.get_availability_for_rooms(db, room_ids, days[0], days[-1], 45)
+
+    assert len(batch) == len(room_ids) * len(days)
+    for entry in batch:
+        day = datetime.combine(entry.date, datetime.min.time())
+        assert entry.slots == reference_slots(db, entry.room_id, day, 45)
+
+
+def test_slot_durations_must_be_positive_and_fit_a_day():
+    day = datetime(2030, 6, 3, 9)
+    with pytest.raises(ValueError):
+        availability.build_slots_from_mask(1, day, day + timedelta(hours=4), 0, 0)
+
+    app.dependency_overrides[get_current_active_user_async] = lambda: models.User(id=1, is_active=True)
+    try:
+        client = TestClient(app)
+        for duration in (0, -30, 24 * 60 + 1):
+            for path in ("/bookings/available-slots?room_id=1", "/bookings/availability?room_ids=1"):
+                response = client.get(f"{path}&date=2030-06-03&start_date=2030-06-03"
+                                      f"&end_date=2030-06-03&duration={duration}")
+                assert response.status_code == 422, (path, duration)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for weekly booking series.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import crud, models, occupancy, schemas
+
+MONDAY = datetime(2030, 6, 3)
+
+
+def _seed(db):
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.flush()
+    # Third Monday is taken by another booking
+    db.add(models.Booking(
+        user_id=user.id, room_id=room.id,
+        start_time=MONDAY.replace(hour=14, minute=30) + timedelta(weeks=2),
+        end_time=MONDAY.replace(hour=15, minute=30) + timedelta(weeks=2)
+    ))
+    db.commit()
+    return user.id, room.id
+
+
+def _series(room_id, occurrences=5):
+    return schemas.BookingSeriesCreate(
+        room_id=room_id,
+        start_time=MONDAY.replace(hour=14),
+        end_time=MONDAY.replace(hour=15),
+        occurrences=occurrences,
+    )
+
+
+def test_free_occurrences_are_booked_and_collisions_reported(db):
+    user_id, room_id = _seed(db)
+
+    created, collisions = crud.create_booking_series(
+        db, _series(room_id), user_id,
+        skipped={MONDAY.replace(hour=14) + timedelta(weeks=4): "closed"}
+    )
+
+    assert [b.start_time for b in created] == [
+        MONDAY.replace(hour=14) + timedelta(weeks=n) for n in (0, 1, 3)
+    ]
+    assert [(c.start_time, c.reason) for c in collisions] == [
+        (MONDAY.replace(hour=14) + timedelta(weeks=2), "conflict"),
+        (MONDAY.replace(hour=14) + timedelta(weeks=4), "closed"),
+    ]
+    assert [c.kind for c in collisions[0].blocking] == ["booking"]
+
+    masks = occupancy.cached_masks(db, room_id, [MONDAY.date(), (MONDAY + timedelta(weeks=1)).date()])
+    hour = occupancy.minutes_mask(14 * 60, 15 * 60)
+    assert all(mask & hour == hour for mask in masks.values())
+
+
+def test_series_uses_one_conflict_query_and_one_insert(db, engine):
+    user_id, room_id = _seed(db)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    crud.create_booking_series(db, _series(room_id, occurrences=20), user_id)
+
+    assert sum("UNION ALL" in statement for statement in statements) == 1
+    assert sum(statement.startswith("INSERT INTO bookings") for statement in statements) == 1
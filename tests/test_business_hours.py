@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the configurable business-hours calendar.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app import crud, models, schemas
+from app.business_hours import business_calendar
+from app.routers.admin import update_business_hours
+from app.routers.bookings import update_booking_endpoint
+
+
+def _room(db):
+    room = models.Room(name="Room")
+    db.add(room)
+    db.commit()
+    return room
+
+
+def test_defaults_apply_until_hours_are_configured(db):
+    business_calendar.ensure_loaded(db)
+    monday, friday, saturday = datetime(2030, 6, 3), datetime(2030, 6, 7), datetime(2030, 6, 8)
+
+    assert business_calendar.open_windows(monday) == [(monday.replace(hour=9), monday.replace(hour=21))]
+    assert business_calendar.open_windows(friday) == []
+    assert business_calendar.open_windows(saturday) == [(saturday.replace(hour=9), saturday.replace(hour=13))]
+
+
+def test_admin_edits_reload_the_calendar(db):
+    room = _room(db)
+    friday = datetime(2030, 6, 7)
+    assert crud.get_available_slots_with_classes(db, room.id, friday, 60) == []
+
+    crud.replace_business_hours(db, [
+        schemas.BusinessHoursBase(weekday=4, open_time="10:00", close_time="12:00"),
+        schemas.BusinessHoursBase(weekday=4, open_time="14:00", close_time="15:30"),
+    ])
+
+    slots = crud.get_available_slots_with_classes(db, room.id, friday, 60)
+    assert [s.start_time.strftime("%H:%M") for s in slots] == ["10:00", "11:00", "14:00"]
+    assert business_calendar.is_open(friday.replace(hour=14), friday.replace(hour=15, minute=30))
+    assert not business_calendar.is_open(friday.replace(hour=11), friday.replace(hour=14, minute=30))
+    # Monday has no configured hours any more
+    assert crud.get_available_slots_with_classes(db, room.id, datetime(2030, 6, 3), 60) == []
+
+
+def test_blackouts_close_the_whole_day(db):
+    room = _room(db)
+    monday = datetime(2030, 6, 3)
+    assert crud.get_available_slots_with_classes(db, room.id, monday, 60)
+
+    blackout = crud.create_blackout(db, schemas.CalendarBlackoutCreate(
+        date=date(2030, 6, 3), reason="Feriado"
+    ))
+    assert crud.get_available_slots_with_classes(db, room.id, monday, 60) == []
+
+    crud.delete_blackout(db, blackout.id)
+    assert crud.get_available_slots_with_classes(db, room.id, monday, 60)
+
+
+def test_only_midnight_closes_past_23_59():
+    assert schemas.BusinessHoursBase(weekday=0, open_time="09:00", close_time="24:00")
+    for close_time in ("24:01", "24:30", "24:59"):
+        with pytest.raises(ValidationError):
+            schemas.BusinessHoursBase(weekday=0, open_time="09:00", close_time=close_time)
+
+
+def test_overlapping_windows_on_a_weekday_are_rejected(db):
+    windows = [
+        schemas.BusinessHoursBase(weekday=0, open_time="09:00", close_time="12:00"),
+        schemas.BusinessHoursBase(weekday=1, open_time="11:00", close_time="13:00"),
+        schemas.BusinessHoursBase(weekday=0, open_time="12:00", close_time="18:00"),
+    ]
+    assert len(update_business_hours(windows, db=db, admin_user=None)) == 3
+
+    windows.append(schemas.BusinessHoursBase(weekday=0, open_time="17:00", close_time="20:00"))
+    with pytest.raises(HTTPException) as error:
+        update_business_hours(windows, db=db, admin_user=None)
+    assert error.value.status_code == 400
+
+
+def test_bookings_cannot_be_moved_out_of_business_hours(db):
+    room = _room(db)
+    user = models.User(email="hours@example.com", hashed_password="x", full_name="H")
+    db.add(user)
+    db.commit()
+    monday = datetime(2030, 6, 3)
+    booking = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=monday.replace(hour=10), end_time=monday.replace(hour=11)
+    ), user_id=user.id)
+
+    with pytest.raises(HTTPException) as error:
+        update_booking_endpoint(
+            booking.id, schemas.BookingUpdate(end_time=monday.replace(hour=22)),
+            db=db, current_user=user
+        )
+    assert error.value.status_code == 400
+
+    moved = update_booking_endpoint(
+        booking.id, schemas.BookingUpdate(start_time=monday.replace(hour=9)),
+        db=db, current_user=user
+    )
+    assert moved.start_time == monday.replace(hour=9)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Concurrent booking attempts: exactly one booking may win each slot.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.models import Base
+
+ATTEMPTS = 300
+SLOTS = 6
+WORKERS = 24
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # Threads need their own connections, so use a file instead of :memory:
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrent.db'}",
+        connect_args={"check_same_thread": False, "timeout": 60},
+        pool_size=WORKERS,
+    )
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+def test_exactly_one_booking_wins_each_slot(file_engine):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+    with Session() as db:
+        users = [
+            models.User(email=f"u{i}@example.com", hashed_password="x", full_name=f"U{i}")
+            for i in range(WORKERS)
+        ]
+        room = models.Room(name="Room")
+        db.add_all(users + [room])
+        db.commit()
+        user_ids = [user.id for user in users]
+        room_id = room.id
+
+    first = datetime(2030, 6, 3, 9)
+    slots = [
+        (first + timedelta(hours=n), first + timedelta(hours=n + 1)) for n in range(SLOTS)
+    ]
+    barrier = threading.Barrier(WORKERS)
+
+    def attempt(n):
+        if n < WORKERS:
+            barrier.wait()
+        start_time, end_time = slots[n % SLOTS]
+        with Session() as db:
+            booking = crud.create_booking(
+                db,
+                schemas.BookingCreate(room_id=room_id, start_time=start_time, end_time=end_time),
+                user_id=user_ids[n % WORKERS],
+            )
+            return (start_time, booking is not None)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(attempt, range(ATTEMPTS)))
+
+    winners = {}
+    for start_time, won in results:
+        winners[start_time] = winners.get(start_time, 0) + won
+    assert winners == {start_time: 1 for start_time, _ in slots}
+
+    with Session() as db:
+        stored = dict(db.query(
+            models.Booking.start_time, func.count(models.Booking.id)
+        ).group_by(models.Booking.start_time).all())
+    assert stored == {start_time: 1 for start_time, _ in slots}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Checks that the conflict queries are served by the composite indexes.
+
+The plan is taken for the exact statement conflicts.find_conflicts sends,
+so a change to that query cannot silently fall back to table scans.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import conflicts, models
+
+
+def _emitted_statement(engine, check):
+    """The (SQL, parameters) of the single statement `check` sends"""
+    emitted = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            emitted.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        check()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(emitted) == 1, emitted
+    return emitted[0]
+
+
+def _conflict_plan(db, engine):
+    room = models.Room(name="Room")
+    db.add(room)
+    db.commit()
+    room_id = room.id
+    statement, parameters = _emitted_statement(engine, lambda: conflicts.find_conflicts(
+        db, room_id, datetime(2030, 6, 3, 10), datetime(2030, 6, 3, 11)
+    ))
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def test_conflict_check_searches_every_index(db, engine):
+    plan = _conflict_plan(db, engine)
+
+    for index in (
+        "ix_bookings_room_status_time",
+        "ix_classes_room_status_time",
+        "ix_students_room_weekday_minutes",
+    ):
+        assert any(
+            step.startswith("SEARCH") and f"INDEX {index}" in step for step in plan
+        ), plan
+    assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
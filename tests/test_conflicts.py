@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the unified conflict checker.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import conflicts, crud, models, schemas
+
+MONDAY = datetime(2030, 6, 3)
+
+
+def _seed(db):
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.flush()
+    booking = models.Booking(
+        user_id=user.id, room_id=room.id,
+        start_time=MONDAY.replace(hour=10), end_time=MONDAY.replace(hour=11)
+    )
+    lesson = models.Class(
+        room_id=room.id, teacher_name="T", class_name="C",
+        start_time=MONDAY.replace(hour=11), end_time=MONDAY.replace(hour=12)
+    )
+    student = models.Student(
+        name="S", teacher_name="T", room_id=room.id, weekday=0,
+        start_time="11:30", end_time="12:30"
+    )
+    db.add_all([booking, lesson, student])
+    db.commit()
+    return user, room, booking, lesson, student
+
+
+def test_blocking_items_come_from_one_query(db, engine):
+    _, room, booking, lesson, student = _seed(db)
+    room_id, expected = room.id, [
+        ("booking", booking.id), ("class", lesson.id), ("student", student.id)
+    ]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    found = conflicts.find_conflicts(
+        db, room_id, MONDAY.replace(hour=10, minute=30), MONDAY.replace(hour=13)
+    )
+
+    assert len(statements) == 1
+    assert [(c.kind, c.id) for c in found] == expected
+    assert found[2].start_time == MONDAY.replace(hour=11, minute=30)
+    assert found[2].end_time == MONDAY.replace(hour=12, minute=30)
+
+
+def test_touching_and_other_weekdays_do_not_conflict(db):
+    _, room, *_ = _seed(db)
+
+    assert conflicts.find_conflicts(
+        db, room.id, MONDAY.replace(hour=9), MONDAY.replace(hour=10)
+    ) == []
+    tuesday = MONDAY.replace(day=4)
+    assert conflicts.find_conflicts(
+        db, room.id, tuesday.replace(hour=10), tuesday.replace(hour=13)
+    ) == []
+
+
+def test_bookings_are_blocked_by_student_slots(db):
+    user, room, *_ = _seed(db)
+
+    booking = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id,
+        start_time=MONDAY.replace(hour=12), end_time=MONDAY.replace(hour=13)
+    ), user_id=user.id)
+
+    assert booking is None
+
+
+def test_updates_are_checked_against_everything_but_themselves(db):
+    _, room, booking, lesson, _ = _seed(db)
+
+    moved = crud.update_booking(db, booking.id, schemas.BookingUpdate(
+        start_time=MONDAY.replace(hour=9, minute=30), end_time=MONDAY.replace(hour=10, minute=30)
+    ))
+    assert moved.start_time == MONDAY.replace(hour=9, minute=30)
+
+    assert crud.update_class(db, lesson.id, schemas.ClassUpdate(
+        start_time=MONDAY.replace(hour=10), end_time=MONDAY.replace(hour=11)
+    )) is None
+    assert crud.get_class(db, lesson.id).start_time == MONDAY.replace(hour=11)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the Alembic migrations.
+"""
+
+import os
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+from conftest import BACKEND_DIR
+
+
+def _alembic_config(url):
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_student_minutes_are_backfilled(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "0001_initial")
+
+    engine = sa.create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO rooms (id, name) VALUES (1, 'Room')"))
+        connection.execute(sa.text(
+            "INSERT INTO students (name, teacher_name, room_id, weekday, start_time, end_time) "
+            "VALUES ('S', 'T', 1, 2, '14:30', '9:05')"
+        ))
+
+    command.upgrade(config, "0002_student_minutes")
+
+    with engine.connect() as connection:
+        row = connection.execute(sa.text("SELECT start_min, end_min FROM students")).one()
+    assert tuple(row) == (870, 545)
+    indexes = {index["name"] for index in sa.inspect(engine).get_indexes("students")}
+    assert "ix_students_room_weekday_minutes" in indexes
+    engine.dispose()
+
+
+def test_upgrade_skips_schema_created_by_the_models(tmp_path):
+    from app.models import Base
+
+    url = f"sqlite:///{tmp_path / 'create_all.db'}"
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    command.upgrade(_alembic_config(url), "head")
+
+    with engine.connect() as connection:
+        version = connection.execute(sa.text("SELECT version_num FROM alembic_version")).scalar()
+    assert version is not None
+    engine.dispose()
+
+
+def test_migrations_match_the_models(tmp_path):
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+    from app.models import Base
+
+    url = f"sqlite:///{tmp_path / 'head.db'}"
+    command.upgrade(_alembic_config(url), "head")
+
+    engine = sa.create_engine(url)
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+    engine.dispose()
+
+
+def test_keyset_indexes_get_the_id(tmp_path):
+    url = f"sqlite:///{tmp_path / 'keyset.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "0009_occupancy_version")
+    engine = sa.create_engine(url)
+    with engine.begin() as connection:
+        # As left by the first version of 0006_keyset_indexes
+        connection.execute(sa.text("DROP INDEX ix_bookings_start_time"))
+        connection.execute(sa.text("CREATE INDEX ix_bookings_start_time ON bookings (start_time)"))
+
+    command.upgrade(config, "head")
+
+    for table in ("bookings", "classes"):
+        indexes = {index["name"]: index["column_names"] for index in sa.inspect(engine).get_indexes(table)}
+        assert indexes[f"ix_{table}_start_time"] == ["start_time", "id"]
+    engine.dispose()
+
+
+def test_schema_check_requires_the_head_revision(tmp_path):
+    from app.schema import SchemaOutOfDate, check_schema_revision
+
+    url = f"sqlite:///{tmp_path / 'check.db'}"
+    engine = sa.create_engine(url)
+    with pytest.raises(SchemaOutOfDate):
+        check_schema_revision(engine)
+
+    command.upgrade(_alembic_config(url), "0004_conflict_indexes")
+    with pytest.raises(SchemaOutOfDate):
+        check_schema_revision(engine)
+
+    command.upgrade(_alembic_config(url), "head")
+    check_schema_revision(engine)
+    engine.dispose()
+
+
+def test_history_views_union_the_archive(tmp_path):
+    url = f"sqlite:///{tmp_path / 'views.db'}"
+    command.upgrade(_alembic_config(url), "head")
+
+    engine = sa.create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO users (id, email, hashed_password, full_name) VALUES (1, 'a', 'x', 'A')"))
+        connection.execute(sa.text("INSERT INTO rooms (id, name) VALUES (1, 'Room')"))
+        connection.execute(sa.text(
+            "INSERT INTO bookings (id, user_id, room_id, start_time, end_time, status) "
+            "VALUES (1, 1, 1, '2030-01-07 10:00:00', '2030-01-07 11:00:00', 'confirmed')"
+        ))
+        connection.execute(sa.text(
+            "INSERT INTO bookings_archive (id, user_id, room_id, start_time, end_time, status, archived_at) "
+            "VALUES (2, 1, 1, '2020-01-06 10:00:00', '2020-01-06 11:00:00', 'completed', '2021-01-06 00:00:00')"
+        ))
+        rows = connection.execute(sa.text(
+            "SELECT id, archived_at IS NOT NULL FROM bookings_all ORDER BY id"
+        )).all()
+    assert [tuple(row) for row in rows] == [(1, 0), (2, 1)]
+    engine.dispose()
+
+
+def test_hot_tables_never_reuse_archived_ids(tmp_path):
+    url = f"sqlite:///{tmp_path / 'ids.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "0007_archive_tables")
+
+    engine = sa.create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO users (id, email, hashed_password, full_name) VALUES (1, 'a', 'x', 'A')"))
+        connection.execute(sa.text("INSERT INTO rooms (id, name) VALUES (1, 'Room')"))
+        connection.execute(sa.text(
+            "INSERT INTO bookings_archive (id, user_id, room_id, start_time, end_time, status, archived_at) "
+            "VALUES (7, 1, 1, '2020-01-06 10:00:00', '2020-01-06 11:00:00', 'completed', '2021-01-06 00:00:00')"
+        ))
+    command.upgrade(config, "head")
+
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO bookings (user_id, room_id, start_time, end_time, status) "
+            "VALUES (1, 1, '2030-01-07 10:00:00', '2030-01-07 11:00:00', 'confirmed')"
+        ))
+        new_id = connection.execute(sa.text("SELECT MAX(id) FROM bookings")).scalar()
+        views = connection.execute(sa.text("SELECT COUNT(*) FROM bookings_all")).scalar()
+    assert (new_id, views) == (8, 2)
+    engine.dispose()
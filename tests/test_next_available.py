@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the earliest-free-slot search.
+"""
+
+from datetime import datetime
+
+from app import crud, models
+
+
+def _rooms(db, count=2):
+    user = models.User(email="search@example.com", hashed_password="x", full_name="S")
+    rooms = [models.Room(name=f"Room {i}") for i in range(count)]
+    db.add(user)
+    db.add_all(rooms)
+    db.commit()
+    return user, rooms
+
+
+def _book(db, user, room, start, end):
+    db.add(models.Booking(user_id=user.id, room_id=room.id, start_time=start, end_time=end))
+    db.commit()
+
+
+def test_returns_earliest_slots_across_rooms(db):
+    user, (room1, room2) = _rooms(db)
+    monday = datetime(2030, 6, 3)
+    _book(db, user, room1, monday.replace(hour=9), monday.replace(hour=12))
+    _book(db, user, room2, monday.replace(hour=9), monday.replace(hour=10, minute=37))
+    _book(db, user, room2, monday.replace(hour=11, minute=37), monday.replace(hour=21))
+
+    slots = crud.find_next_available_slots(
+        db, duration_minutes=60, not_before=monday.replace(hour=8), limit=3
+    )
+
+    assert [(s.room_id, s.start_time.strftime("%H:%M")) for s in slots] == [
+        (room2.id, "10:37"), (room1.id, "12:00"), (room1.id, "13:00")
+    ]
+
+
+def test_skips_closed_days_students_and_the_past(db):
+    user, (room,) = _rooms(db, 1)
+    thursday = datetime(2030, 6, 6)
+    db.add(models.Student(
+        name="S", teacher_name="T", room_id=room.id, weekday=5,
+        start_time="09:00", end_time="10:00"
+    ))
+    db.commit()
+
+    # 20:10 rounds up to 20:15, leaving no room for an hour on Thursday;
+    # Friday is closed and Saturday starts after the student's lesson
+    slots = crud.find_next_available_slots(
+        db, duration_minutes=60, not_before=thursday.replace(hour=20, minute=10),
+        room_ids=[room.id], limit=2
+    )
+
+    assert [s.start_time for s in slots] == [
+        datetime(2030, 6, 8, 10), datetime(2030, 6, 8, 11)
+    ]
+
+
+def test_stops_at_the_horizon(db):
+    user, (room,) = _rooms(db, 1)
+    monday = datetime(2030, 6, 3)
+    _book(db, user, room, monday.replace(hour=9), monday.replace(hour=21))
+
+    slots = crud.find_next_available_slots(
+        db, duration_minutes=60, not_before=monday, horizon_days=1, room_ids=[room.id]
+    )
+
+    assert slots == []
+
+
+def test_ignores_unknown_and_inactive_rooms(db):
+    _, (active, inactive) = _rooms(db)
+    inactive.is_active = False
+    db.commit()
+    monday = datetime(2030, 6, 3)
+
+    slots = crud.find_next_available_slots(
+        db, duration_minutes=60, not_before=monday.replace(hour=8),
+        room_ids=[inactive.id, 999, active.id], limit=3
+    )
+    assert {s.room_id for s in slots} == {active.id}
+
+    assert crud.find_next_available_slots(
+        db, duration_minutes=60, not_before=monday, room_ids=[inactive.id, 999]
+    ) == []
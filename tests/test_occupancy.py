@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the materialized per-room occupancy bitmaps.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import text as sa_text
+
+from app import crud, models, occupancy, schemas
+
+
+def _setup(db):
+    user = models.User(email="occ@example.com", hashed_password="x", full_name="O")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.commit()
+    return user, room
+
+
+def _stored_mask(db, room_id, day):
+    row = db.query(models.RoomOccupancy).filter_by(room_id=room_id, date=day).one()
+    return int.from_bytes(row.bits, "little")
+
+
+def test_interval_mask_rounds_outwards_and_clips_to_the_day():
+    day = datetime(2030, 6, 3).date()
+    mask = occupancy.interval_mask(
+        day, datetime(2030, 6, 3, 10, 0, 30), datetime(2030, 6, 3, 10, 2, 10)
+    )
+    assert mask == 0b111 << 600
+
+    overnight = occupancy.interval_mask(
+        day, datetime(2030, 6, 3, 23, 58), datetime(2030, 6, 4, 1, 0)
+    )
+    assert overnight == 0b11 << 1438
+
+
+def test_booking_writes_keep_the_bitmap_up_to_date(db):
+    user, room = _setup(db)
+    day = datetime(2030, 6, 3)
+
+    booking = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=day.replace(hour=10), end_time=day.replace(hour=11)
+    ), user_id=user.id)
+    assert _stored_mask(db, room.id, day.date()) == occupancy.minutes_mask(600, 660)
+
+    crud.update_booking(db, booking.id, schemas.BookingUpdate(
+        start_time=day.replace(hour=12), end_time=day.replace(hour=13)
+    ))
+    assert _stored_mask(db, room.id, day.date()) == occupancy.minutes_mask(720, 780)
+
+    crud.delete_booking(db, booking.id)
+    assert _stored_mask(db, room.id, day.date()) == 0
+
+
+def test_conflicts_are_detected_from_the_bitmap(db):
+    user, room = _setup(db)
+    day = datetime(2030, 6, 3)
+    crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=day.replace(hour=10), end_time=day.replace(hour=11)
+    ), user_id=user.id)
+
+    assert occupancy.is_free(db, room.id, day.replace(hour=11), day.replace(hour=12))
+    assert not occupancy.is_free(db, room.id, day.replace(hour=10, minute=30), day.replace(hour=12))
+    assert occupancy.is_free(db, room.id, day.replace(day=4, hour=10), day.replace(day=4, hour=11)) is None
+
+    clash = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=day.replace(hour=10, minute=30),
+        end_time=day.replace(hour=11, minute=30)
+    ), user_id=user.id)
+    assert clash is None
+
+
+def test_student_writes_discard_rows_of_their_weekday(db):
+    _, room = _setup(db)
+    monday = datetime(2030, 6, 3)
+    crud.get_available_slots_with_classes(db, room.id, monday, 60)
+    assert db.query(models.RoomOccupancy).count() == 1
+
+    crud.create_student(db, schemas.StudentCreate(
+        name="S", teacher_name="T", room_id=room.id, weekday=0,
+        start_time="14:00", end_time="15:00"
+    ))
+    assert db.query(models.RoomOccupancy).count() == 0
+
+    slots = crud.get_available_slots_with_classes(db, room.id, monday, 60)
+    assert [s.start_time.hour for s in slots if not s.is_available] == [14]
+    assert _stored_mask(db, room.id, monday.date()) == occupancy.minutes_mask(840, 900)
+
+
+def test_unknown_rooms_get_no_occupancy_rows(db):
+    _, room = _setup(db)
+    db.execute(sa_text("PRAGMA foreign_keys=ON"))
+    monday = datetime(2030, 6, 3)
+
+    batch = crud.get_availability_for_rooms(db, [999, room.id], monday, monday, 60)
+
+    assert [day.room_id for day in batch] == [room.id]
+    assert crud.get_available_slots_with_classes(db, 999, monday, 60) is None
+    assert {row.room_id for row in db.query(models.RoomOccupancy)} == {room.id}
+
+    occupancy.load_masks(db, [999], [monday.date()])
+    assert db.query(models.RoomOccupancy).filter_by(room_id=999).count() == 0
+
+
+def test_rows_built_before_a_discard_are_not_stored(db):
+    user, room = _setup(db)
+    tuesday = datetime(2030, 6, 4)
+    versions = occupancy.occupancy_versions(db, [room.id])
+    stale = occupancy.compute_masks(db, [room.id], [tuesday.date()])
+
+    crud.create_student(db, schemas.StudentCreate(
+        name="S", teacher_name="T", room_id=room.id, weekday=1,
+        start_time="10:00", end_time="11:00"
+    ))
+    occupancy.store_built(db, stale, versions)
+
+    assert db.query(models.RoomOccupancy).count() == 0
+    clash = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room.id, start_time=tuesday.replace(hour=10), end_time=tuesday.replace(hour=11)
+    ), user_id=user.id)
+    assert clash is None
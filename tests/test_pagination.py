@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination of the list endpoints.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, models
+from app.pagination import InvalidCursor, encode_cursor
+
+MONDAY = datetime(2030, 6, 3, 9)
+
+
+def _seed(db, count=7):
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.flush()
+    # Inserted out of order, two of them at the same time
+    for hour in [5, 1, 3, 3, 0, 6, 2][:count]:
+        start = MONDAY + timedelta(hours=hour)
+        db.add(models.Booking(
+            user_id=user.id, room_id=room.id, start_time=start, end_time=start + timedelta(hours=1)
+        ))
+    db.commit()
+    return user.id, room.id
+
+
+def _walk(fetch):
+    items, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        items += page.items
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def test_pages_follow_start_time_then_id(db):
+    user_id, _ = _seed(db)
+
+    first = crud.get_user_bookings(db, user_id, limit=3)
+    bookings = _walk(lambda cursor: crud.get_user_bookings(db, user_id, limit=3, cursor=cursor))
+
+    assert len(first.items) == 3 and first.next_cursor
+    keys = [(b.start_time, b.id) for b in bookings]
+    assert keys == sorted(keys) and len(keys) == 7
+
+
+def test_last_page_has_no_cursor(db):
+    _seed(db, count=3)
+
+    assert crud.get_bookings(db, limit=3).next_cursor is None
+
+
+def test_inserted_rows_do_not_shift_later_pages(db):
+    user_id, room_id = _seed(db)
+    first = crud.get_bookings(db, limit=3)
+
+    # A booking before the cursor would make OFFSET repeat a row
+    db.add(models.Booking(
+        user_id=user_id, room_id=room_id, start_time=MONDAY - timedelta(hours=1), end_time=MONDAY
+    ))
+    db.commit()
+    rest = _walk(lambda cursor: crud.get_bookings(db, limit=3, cursor=cursor or first.next_cursor))
+
+    ids = [b.id for b in first.items + rest]
+    assert len(ids) == len(set(ids)) == 7
+
+
+def test_skip_is_still_supported(db):
+    _seed(db)
+
+    page = crud.get_bookings(db, skip=5, limit=3)
+
+    assert [b.start_time.hour for b in page.items] == [14, 15]
+
+
+def test_invalid_cursor(db):
+    _seed(db)
+
+    with pytest.raises(InvalidCursor):
+        crud.get_bookings(db, cursor="not-a-cursor")
+    with pytest.raises(InvalidCursor):
+        # A users cursor has one key, bookings need two
+        crud.get_bookings(db, cursor=encode_cursor([1]))
+
+
+@pytest.mark.parametrize("values", [[{}], ["1"], [True], [None]])
+def test_cursor_values_must_match_the_key_types(db, values):
+    with pytest.raises(InvalidCursor):
+        crud.get_users(db, cursor=encode_cursor(values))
+
+
+def test_cursor_datetimes_must_be_strings(db):
+    with pytest.raises(InvalidCursor):
+        crud.get_bookings(db, cursor=encode_cursor([5, 1]))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the instrumented connection pool.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import (
+    InstrumentedQueuePool, _async_engine_options, _async_url, pool_stats
+)
+
+
+def test_checkouts_overflow_and_timeouts_are_counted(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    pool = engine.pool
+
+    first = engine.connect()
+    second = engine.connect()
+    first.execute(text("SELECT 1"))
+    assert pool.checkedout() == 2
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    second.close()
+    first.close()
+    with engine.connect():
+        pass
+
+    metrics = pool.metrics.snapshot()
+    assert metrics["checkouts"] == 3
+    assert metrics["overflow_events"] == 1
+    assert metrics["timeouts"] == 1
+    assert metrics["max_checkout_ms"] >= 0
+    engine.dispose()
+
+
+def test_async_engines_are_instrumented_too(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(_async_url(url), **_async_engine_options(url))
+
+    async def connect():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(connect())
+    assert stats["pool_class"] == "InstrumentedAsyncAdaptedQueuePool"
+    assert stats["checkouts"] == 1
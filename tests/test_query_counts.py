@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Query budgets of the list and detail endpoints.
+
+Each endpoint is called through the API against a seeded database and may
+issue at most its budget of SQL statements, counting the current-user
+lookup. Relationships serialized by the response models must be loaded
+with the rows, not one lazy load per row.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.auth import create_access_token
+from app.database import get_async_db, get_async_read_db, get_db, get_read_db
+from app.main import app
+
+MONDAY = datetime(2030, 6, 3, 9)
+ADMIN_EMAIL = "budget-admin@example.com"
+
+# path -> (max statements, expected rows or None for a single object)
+BUDGETS = {
+    "/admin/bookings?limit=100": (2, 100),
+    "/admin/users?limit=100": (2, 31),
+    "/bookings/my-bookings": (2, 20),
+    "/classes/?limit=100": (2, 20),
+    "/classes/1": (2, None),
+    "/students/": (2, 20),
+    "/students/1": (2, None),
+    "/students/room/1": (2, 7),
+    "/auth/me/classes": (2, 20),
+    "/rooms/": (2, 3),
+}
+
+
+def _seed(db):
+    admin = models.User(email=ADMIN_EMAIL, hashed_password="x", full_name="Admin", is_admin=True)
+    users = [
+        models.User(email=f"user{n}@example.com", hashed_password="x", full_name=f"User {n}")
+        for n in range(30)
+    ]
+    rooms = [models.Room(name=f"Room {n}") for n in range(3)]
+    db.add_all([admin, *users, *rooms])
+    db.flush()
+
+    for n in range(100):
+        owner = admin if n < 20 else users[n % len(users)]
+        start = MONDAY + timedelta(hours=n)
+        db.add(models.Booking(
+            user_id=owner.id, room_id=rooms[n % 3].id,
+            start_time=start, end_time=start + timedelta(hours=1)
+        ))
+    for n in range(20):
+        start = MONDAY + timedelta(days=n)
+        db.add(models.Class(
+            room_id=rooms[n % 3].id, teacher_name="T", class_name=f"Class {n}",
+            start_time=start, end_time=start + timedelta(hours=1)
+        ))
+        db.add(models.Student(
+            name=f"Student {n}", email=ADMIN_EMAIL, teacher_name="T", room_id=rooms[n % 3].id,
+            weekday=n % 7, start_time="10:00", end_time="11:00"
+        ))
+    db.commit()
+
+
+class Api:
+    def __init__(self, client, headers, engines):
+        self.client = client
+        self.headers = headers
+        self.engines = engines
+
+    @contextmanager
+    def count_queries(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in self.engines:
+                event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def api(tmp_path):
+    path = tmp_path / "budget.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    models.Base.metadata.create_all(bind=sync_engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    with Session() as db:
+        _seed(db)
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides.update({
+        get_db: override_db,
+        get_read_db: override_db,
+        get_async_db: override_async_db,
+        get_async_read_db: override_async_db,
+    })
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': ADMIN_EMAIL})}"}
+    try:
+        yield Api(TestClient(app), headers, [sync_engine, async_engine.sync_engine])
+    finally:
+        app.dependency_overrides.clear()
+        sync_engine.dispose()
+        async_engine.sync_engine.dispose()
+
+
+@pytest.mark.parametrize("path", BUDGETS)
+def test_query_budget(api, path):
+    budget, rows = BUDGETS[path]
+
+    with api.count_queries() as statements:
+        response = api.client.get(path, headers=api.headers)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    if rows is not None:
+        assert len(body) == rows
+    assert len(statements) <= budget, "\n".join(statements)
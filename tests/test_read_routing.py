@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for routing reads to the replica.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app import crud, models
+from app.cache import availability_cache
+from app.database import ReadRouter, apply_sqlite_pragmas
+
+MONDAY = datetime(2030, 6, 3)
+
+
+def _request(method="GET", token=None, address="10.0.0.1"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({
+        "type": "http", "method": method, "path": "/", "headers": headers,
+        "client": (address, 1234),
+    })
+
+
+def test_reads_go_to_the_replica_until_the_client_writes():
+    router = ReadRouter(enabled=True, sticky_seconds=60)
+
+    assert router.use_replica(_request(token="a"))
+    router.record_write(_request("POST", token="a"))
+
+    assert not router.use_replica(_request(token="a"))
+    assert router.use_replica(_request(token="b", address="10.0.0.2"))
+    assert not router.use_replica(_request("POST", token="b", address="10.0.0.2"))
+
+    stats = router.stats()
+    assert (stats["replica_reads"], stats["primary_reads"], stats["sticky_reads"]) == (2, 1, 1)
+    assert stats["writes"] == 1
+
+
+def test_sticky_window_expires():
+    router = ReadRouter(enabled=True, sticky_seconds=0)
+    router.record_write(_request("POST", token="a"))
+
+    assert router.use_replica(_request(token="a"))
+    assert router.stats()["sticky_clients"] == 0
+
+
+def test_disabled_routing_reads_from_the_primary():
+    router = ReadRouter(enabled=False, sticky_seconds=60)
+
+    assert not router.use_replica(_request(token="a"))
+    assert router.stats()["primary_reads"] == 1
+
+
+def test_availability_on_a_read_only_replica(tmp_path):
+    path = tmp_path / "replica.db"
+    primary = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=primary)
+    with sessionmaker(bind=primary)() as db:
+        room = models.Room(name="Room")
+        db.add(room)
+        db.commit()
+        room_id = room.id
+
+    replica = create_engine(f"sqlite:///{path}")
+    apply_sqlite_pragmas(replica, {"query_only": "ON"})
+    db = sessionmaker(bind=replica, info={"replica": True})()
+    try:
+        # A write just happened: the result must not be cached
+        availability_cache.invalidate(room_id, [MONDAY.date()])
+        result = crud.get_availability_for_rooms(db, [room_id], MONDAY, MONDAY, 60)
+
+        assert result[0].slots and all(slot.is_available for slot in result[0].slots)
+        assert availability_cache.stats()["entries"] == 0
+        assert db.query(models.RoomOccupancy).count() == 0
+    finally:
+        db.close()
+        replica.dispose()
+        primary.dispose()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for recurring class expansion.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import conflicts, crud, models, recurrence, schemas
+
+MONDAY = datetime(2030, 6, 3)
+
+
+def _all_occurrences(start_time, end_time, rule, limit=400):
+    """Brute force: walk the series from its first occurrence"""
+    return recurrence.occurrences(start_time, end_time, rule, start_time, start_time + timedelta(days=limit))
+
+
+def test_patterns_are_parsed():
+    assert recurrence.parse_rule(None) == recurrence.Rule("WEEKLY")
+    assert recurrence.parse_rule("biweekly") == recurrence.Rule("WEEKLY", 2)
+    assert recurrence.parse_rule("RRULE:FREQ=MONTHLY;COUNT=3") == recurrence.Rule("MONTHLY", 1, 3)
+    assert recurrence.parse_rule("FREQ=DAILY;UNTIL=20300610").until == datetime(2030, 6, 10, 23, 59, 59, 999999)
+    for pattern in ("yearly", "FREQ=WEEKLY;BYDAY=MO", "FREQ=WEEKLY;INTERVAL=0", "FREQ=DAILY;UNTIL=tomorrow"):
+        with pytest.raises(ValueError):
+            recurrence.parse_rule(pattern)
+
+
+def test_only_the_window_is_expanded():
+    rule = recurrence.parse_rule("weekly")
+    found = recurrence.occurrences(
+        MONDAY.replace(hour=10), MONDAY.replace(hour=11), rule,
+        datetime(2035, 1, 1), datetime(2035, 1, 15)
+    )
+    assert found == [
+        (datetime(2035, 1, 1, 10), datetime(2035, 1, 1, 11)),
+        (datetime(2035, 1, 8, 10), datetime(2035, 1, 8, 11)),
+    ]
+
+
+def test_monthly_series_skip_missing_days_and_respect_count():
+    rule = recurrence.parse_rule("FREQ=MONTHLY;COUNT=4")
+    start = datetime(2030, 1, 31, 18)
+    found = _all_occurrences(start, start + timedelta(hours=1), rule)
+    assert [occurrence.date().isoformat() for occurrence, _ in found] == [
+        "2030-01-31", "2030-03-31", "2030-05-31", "2030-07-31"
+    ]
+
+
+def test_windows_match_the_full_expansion():
+    rng = random.Random(99)
+    for pattern in ("daily", "weekly", "biweekly", "monthly", "FREQ=WEEKLY;COUNT=10",
+                    "FREQ=MONTHLY;INTERVAL=2;UNTIL=20310101", "FREQ=MONTHLY;COUNT=5"):
+        rule = recurrence.parse_rule(pattern)
+        start = datetime(2030, 1, rng.randint(1, 31), rng.randint(8, 20))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+        everything = _all_occurrences(start, end, rule)
+        for _ in range(30):
+            window_start = start + timedelta(hours=rng.randint(-100, 8000))
+            window_end = window_start + timedelta(hours=rng.randint(1, 2000))
+            expected = [
+                (s, e) for s, e in everything if s < window_end and e > window_start
+            ]
+            assert recurrence.occurrences(start, end, rule, window_start, window_end) == expected, pattern
+
+
+def _weekly_class(db):
+    room = models.Room(name="Room")
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    db.add_all([room, user])
+    db.commit()
+    db_class = crud.create_class(db, schemas.ClassCreate(
+        room_id=room.id, teacher_name="T", class_name="C",
+        start_time=MONDAY.replace(hour=10), end_time=MONDAY.replace(hour=11),
+        is_recurring=True, recurrence_pattern="weekly"
+    ))
+    return room.id, user.id, db_class
+
+
+def test_availability_and_conflicts_see_later_occurrences(db):
+    room_id, user_id, db_class = _weekly_class(db)
+    later = MONDAY + timedelta(weeks=30)
+
+    slots = crud.get_available_slots_with_classes(db, room_id, later, 60)
+    assert [s.start_time.hour for s in slots if not s.is_available] == [10]
+
+    found = conflicts.find_conflicts(db, room_id, later.replace(hour=9), later.replace(hour=12))
+    assert [(c.kind, c.id, c.start_time) for c in found] == [
+        ("class", db_class.id, later.replace(hour=10))
+    ]
+    assert crud.create_booking(db, schemas.BookingCreate(
+        room_id=room_id, start_time=later.replace(hour=10, minute=30),
+        end_time=later.replace(hour=11, minute=30)
+    ), user_id) is None
+
+
+def test_recurring_class_writes_refresh_stored_availability(db):
+    room = models.Room(name="Room")
+    db.add(room)
+    db.commit()
+    later = MONDAY + timedelta(weeks=3)
+    crud.get_available_slots_with_classes(db, room.id, later, 60)
+
+    db_class = crud.create_class(db, schemas.ClassCreate(
+        room_id=room.id, teacher_name="T", class_name="C",
+        start_time=MONDAY.replace(hour=15), end_time=MONDAY.replace(hour=16),
+        is_recurring=True
+    ))
+    slots = crud.get_available_slots_with_classes(db, room.id, later, 60)
+    assert [s.start_time.hour for s in slots if not s.is_available] == [15]
+
+    crud.delete_class(db, db_class.id)
+    slots = crud.get_available_slots_with_classes(db, room.id, later, 60)
+    assert all(s.is_available for s in slots)
+
+
+def test_new_series_colliding_with_a_later_booking_is_rejected(db):
+    room_id, user_id, _ = _weekly_class(db)
+    booking = crud.create_booking(db, schemas.BookingCreate(
+        room_id=room_id, start_time=(MONDAY + timedelta(weeks=5, days=1)).replace(hour=14),
+        end_time=(MONDAY + timedelta(weeks=5, days=1)).replace(hour=15)
+    ), user_id)
+    assert booking is not None
+
+    assert crud.create_class(db, schemas.ClassCreate(
+        room_id=room_id, teacher_name="T", class_name="C",
+        start_time=(MONDAY + timedelta(days=1)).replace(hour=14),
+        end_time=(MONDAY + timedelta(days=1)).replace(hour=15),
+        is_recurring=True, recurrence_pattern="weekly"
+    )) is None
+
+
+def test_classes_by_room_lists_occurrences(db):
+    room_id, _, db_class = _weekly_class(db)
+
+    listed = crud.get_classes_by_room(
+        db, room_id, MONDAY + timedelta(weeks=2), MONDAY + timedelta(weeks=4)
+    )
+
+    assert [(c.id, c.start_time) for c in listed] == [
+        (db_class.id, (MONDAY + timedelta(weeks=2)).replace(hour=10)),
+        (db_class.id, (MONDAY + timedelta(weeks=3)).replace(hour=10)),
+    ]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite tuning profile.
+"""
+
+from sqlalchemy import create_engine, text
+
+from app.database import apply_sqlite_pragmas, sqlite_pragmas
+
+
+def test_profile_is_applied_to_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+
+    for _ in range(2):
+        with engine.connect() as connection:
+            read = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            assert read("journal_mode") == "wal"
+            assert read("synchronous") == 1  # NORMAL
+            assert read("busy_timeout") == 5000
+            assert read("temp_store") == 2  # MEMORY
+            assert read("cache_size") == -64000
+        engine.dispose()
+
+
+def test_default_engine_keeps_rollback_journal(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
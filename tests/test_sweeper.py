@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the sweep marking ended bookings and classes completed.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import conflicts, models, sweeper
+from app.recurrence import series_end
+
+NOW = datetime(2030, 6, 3, 12)  # A Monday
+
+
+def _seed(db):
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.flush()
+    for hours, status in [(-5, "confirmed"), (-3, "confirmed"), (-2, "cancelled"), (-1, "confirmed"), (2, "confirmed")]:
+        start = NOW + timedelta(hours=hours)
+        db.add(models.Booking(
+            user_id=user.id, room_id=room.id, status=status,
+            start_time=start, end_time=start + timedelta(minutes=30)
+        ))
+    start = NOW - timedelta(days=28)
+    for name, pattern in [("Single", None), ("Ended", "FREQ=WEEKLY;COUNT=2"), ("Open", "weekly")]:
+        db.add(models.Class(
+            room_id=room.id, teacher_name="T", class_name=name, status="scheduled",
+            start_time=start, end_time=start + timedelta(hours=1),
+            is_recurring=pattern is not None, recurrence_pattern=pattern
+        ))
+    db.commit()
+    return room.id
+
+
+def _statuses(db, model, order):
+    return [row.status for row in db.query(model).order_by(order)]
+
+
+def test_ended_bookings_are_completed_in_batches(db):
+    _seed(db)
+
+    report = sweeper.run_sweep(db, batch_size=2, now=NOW)
+
+    assert report["bookings"] == 3
+    assert _statuses(db, models.Booking, models.Booking.start_time) == [
+        "completed", "completed", "cancelled", "completed", "confirmed"
+    ]
+    assert sweeper.run_sweep(db, now=NOW)["bookings"] == 0
+
+
+def test_max_batches_bounds_a_run(db):
+    _seed(db)
+
+    assert sweeper.run_sweep(db, batch_size=2, max_batches=1, now=NOW)["bookings"] == 2
+    assert sweeper.run_sweep(db, batch_size=2, now=NOW)["bookings"] == 1
+
+
+def test_recurring_classes_wait_for_their_series_to_end(db):
+    _seed(db)
+
+    report = sweeper.run_sweep(db, now=NOW)
+
+    assert report["classes"] == 2
+    statuses = {c.class_name: c.status for c in db.query(models.Class)}
+    assert statuses == {"Single": "completed", "Ended": "completed", "Open": "scheduled"}
+
+
+def test_open_series_still_blocks_the_room(db):
+    room_id = _seed(db)
+    sweeper.run_sweep(db, now=NOW)
+
+    found = conflicts.find_conflicts(db, room_id, NOW - timedelta(hours=1), NOW + timedelta(hours=3))
+
+    # The open weekly class and the future booking; completed rows are ignored
+    assert [conflict.kind for conflict in found] == ["class", "booking"]
+
+
+def test_series_end():
+    start = datetime(2030, 1, 31, 10)
+    end = start + timedelta(hours=1)
+
+    assert series_end(start, end, "FREQ=WEEKLY;COUNT=3") == datetime(2030, 2, 14, 11)
+    # Months without a 31st are skipped, not counted
+    assert series_end(start, end, "FREQ=MONTHLY;COUNT=3") == datetime(2030, 5, 31, 11)
+    assert series_end(start, end, "FREQ=DAILY;UNTIL=20300202") == datetime(2030, 2, 2, 11)
+    assert series_end(start, end, "weekly") is None
+
+
+def test_rules_out_of_bounds_do_not_break_the_sweep(db):
+    room_id = _seed(db)
+    start = NOW - timedelta(days=28)
+    db.add(models.Class(
+        room_id=room_id, teacher_name="T", class_name="Forever", status="scheduled",
+        start_time=start, end_time=start + timedelta(hours=1),
+        is_recurring=True, recurrence_pattern="FREQ=WEEKLY;UNTIL=99991231"
+    ))
+    db.commit()
+
+    assert sweeper.run_sweep(db, now=NOW)["classes"] == 2
+    assert db.query(models.Class).filter_by(class_name="Forever").one().status == "scheduled"
+
+
+def test_series_end_does_not_walk_the_series():
+    start = datetime(2030, 1, 1, 10)
+    end = start + timedelta(hours=1)
+
+    assert series_end(start, end, "FREQ=WEEKLY;COUNT=10000") == end + timedelta(weeks=9999)
+    assert series_end(start, end, "FREQ=DAILY;UNTIL=20991231") == datetime(2099, 12, 31, 11)
+    assert series_end(start, end, "FREQ=MONTHLY;INTERVAL=5;UNTIL=20300901") == datetime(2030, 6, 1, 11)
+    # Ended before its first occurrence
+    assert series_end(start, end, "FREQ=WEEKLY;UNTIL=20291231") == end
+    for pattern in ("FREQ=WEEKLY;UNTIL=99991231", "FREQ=DAILY;COUNT=10001"):
+        with pytest.raises(ValueError):
+            series_end(start, end, pattern)
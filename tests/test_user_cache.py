@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the cache of authenticated users.
+"""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from app import auth, crud, models, schemas
+from app.auth import create_access_token, get_current_user, user_cache
+
+
+@pytest.fixture
+def user(db):
+    db_user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    db.add(db_user)
+    db.commit()
+    return db_user
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    listener = lambda *args: executed.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+def _credentials(email):
+    return HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": email})
+    )
+
+
+def test_repeated_lookups_skip_the_database(db, user, statements):
+    email = "a@example.com"
+    first = get_current_user(_credentials(email), db)
+    second = get_current_user(_credentials(email), db)
+
+    assert len(statements) == 1
+    assert (second.id, second.email, second.is_active) == (first.id, first.email, True)
+    # Every hit is a fresh object, not shared between requests
+    assert second is not get_current_user(_credentials(email), db)
+    assert second.hashed_password is None
+    assert user_cache.stats()["hits"] == 2
+
+
+def test_update_user_invalidates_the_entry(db, user):
+    credentials = _credentials(user.email)
+    get_current_user(credentials, db)
+
+    crud.update_user(db, user.id, schemas.UserUpdate(is_active=False))
+
+    assert get_current_user(credentials, db).is_active is False
+    assert user_cache.stats()["invalidations"] == 1
+
+
+def test_a_row_read_before_an_update_is_not_cached(db, user):
+    generation = user_cache.generation()
+    stale = db.query(models.User).filter(models.User.email == user.email).first()
+
+    user_cache.invalidate(user.email)
+    user_cache.put(stale, generation)
+
+    assert user_cache.get(user.email) is None
+
+
+def test_unknown_users_are_not_cached(db, user):
+    with pytest.raises(HTTPException):
+        get_current_user(_credentials("nobody@example.com"), db)
+
+    assert user_cache.stats()["entries"] == 0
+
+
+def test_entries_expire_and_the_cache_is_bounded(db, user, monkeypatch):
+    cache = auth.UserCache(max_entries=1, ttl_seconds=60)
+    other = models.User(email="b@example.com", hashed_password="x", full_name="B")
+    db.add(other)
+    db.commit()
+
+    cache.put(user, cache.generation())
+    cache.put(other, cache.generation())
+    assert cache.get(user.email) is None
+    assert cache.stats()["evictions"] == 1
+
+    now = auth.time.monotonic()
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now + 61)
+    assert cache.get(other.email) is None
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized utilization heatmap.
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud, models
+from app.routers import admin
+from benchmark_utilization import naive_utilization, seed, vectorized_utilization
+
+
+def test_vectorized_heatmap_matches_per_day_loop(db):
+    first_day = datetime(2030, 1, 7)
+    room_ids = seed(db, first_day, days=14, rooms=2)
+
+    assert vectorized_utilization(db, room_ids, first_day, 14) == \
+        naive_utilization(db, room_ids, first_day, 14)
+
+
+def test_overnight_bookings_count_on_both_days(db):
+    user = models.User(email="u@example.com", hashed_password="x", full_name="U")
+    room = models.Room(name="Room")
+    db.add_all([user, room])
+    db.commit()
+    monday = datetime(2030, 1, 7)
+    db.add(models.Booking(
+        user_id=user.id, room_id=room.id,
+        start_time=monday.replace(hour=20), end_time=monday.replace(day=8, hour=10)
+    ))
+    db.commit()
+
+    (heatmap,) = crud.get_utilization(db, [room.id], monday, 2)
+
+    assert [(d.open_minutes, d.occupied_minutes, d.free_minutes) for d in heatmap.days] == [
+        (720, 60, 660), (720, 60, 660)
+    ]
+    assert heatmap.days[0].utilization == 60 / 720
+
+
+def test_heatmap_rooms_are_capped(db, monkeypatch):
+    monkeypatch.setattr(admin, "MAX_UTILIZATION_ROOMS", 1)
+    rooms = [models.Room(name="A"), models.Room(name="B")]
+    db.add_all(rooms)
+    db.commit()
+    start = datetime(2030, 6, 3).date()
+
+    assert len(admin.read_utilization(start, days=1, room_ids=[rooms[0].id], db=db, admin_user=None)) == 1
+    for room_ids in ([room.id for room in rooms], None):
+        with pytest.raises(HTTPException) as error:
+            admin.read_utilization(start, days=1, room_ids=room_ids, db=db, admin_user=None)
+        assert error.value.status_code == 400
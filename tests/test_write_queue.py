@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-room write queue.
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.models import Base
+from app.write_queue import RoomWriteQueue
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'queue.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _writer(queue, Session, room_id, name, results, gate=None):
+    def stage(db):
+        if gate is not None:
+            gate.wait(timeout=10)
+        room = models.Room(name=name)
+        db.add(room)
+        return room
+
+    def run():
+        with Session() as db:
+            results[name] = queue.submit(db, room_id, stage)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_for_depth(queue, room_id, depth):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        rooms = queue.stats()["rooms"]
+        if room_id in rooms and rooms[room_id]["queue_depth"] >= depth:
+            return
+        time.sleep(0.01)
+    raise AssertionError("writes did not queue up")
+
+
+def test_queued_writes_are_committed_in_one_batch(Session):
+    queue = RoomWriteQueue(max_batch=32)
+    results = {}
+    gate = threading.Event()
+
+    threads = [_writer(queue, Session, 1, "first", results, gate)]
+    time.sleep(0.05)
+    threads += [_writer(queue, Session, 1, f"queued {n}", results) for n in range(5)]
+    _wait_for_depth(queue, 1, 5)
+    gate.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    stats = queue.stats()["rooms"][1]
+    assert stats["writes"] == 6
+    assert stats["batches"] == 2
+    assert stats["max_queue_depth"] >= 5
+    assert stats["queue_depth"] == 0
+    assert all(room.id is not None for room in results.values())
+    with Session() as db:
+        assert db.query(models.Room).count() == 6
+
+
+def test_rooms_do_not_wait_for_each_other(Session):
+    queue = RoomWriteQueue()
+    gate = threading.Event()
+
+    def stage(db):
+        room = models.Room(name="Room")
+        db.add(room)
+        return room
+
+    def slow_submit():
+        with Session() as db:
+            # Room 1 stays busy after its commit, until the gate opens
+            queue.submit(db, 1, stage, lambda db, room: gate.wait(timeout=10))
+    slow = threading.Thread(target=slow_submit)
+    slow.start()
+    time.sleep(0.05)
+
+    results = {}
+    queued = _writer(queue, Session, 1, "room 1", results)
+    _wait_for_depth(queue, 1, 1)
+    with Session() as db:
+        assert queue.submit(db, 2, stage) is not None
+
+    assert "room 1" not in results
+    gate.set()
+    slow.join(timeout=10)
+    queued.join(timeout=10)
+    assert results["room 1"] is not None